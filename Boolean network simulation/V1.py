@@ -1,8 +1,9 @@
 import numpy as np
-import random
-import itertools
 
-# 이 코드에서의 문제점!! 같은 attractor을 구분해내지 못한다
+from logic_compiler import compile_logic
+from initial_states import initial_state_blocks
+
+# 같은 attractor가 회전된 순서로 발견되는 문제
 
 # [0 0 0]
 # [0 0 1]
@@ -12,49 +13,27 @@ import itertools
 # [0 1 0]
 # [0 0 0]
 # [0 0 1]
-# [0 1 1] 은 같은 attractor 인데...
-
-def make_initial_array(n):
-
-    # 용량 = 4라고 해보자
-    max_capacity = 4
-    if n < max_capacity:
-        # 모든 가능한 초기 상태
-        all_initial_states = np.array(list(itertools.product([0, 1], repeat=n)))
-    
-    else:
-        # 용량 초과의 경우 무작위 샘플링
-        # 최대 10개의 초기 상태만 쓴다고 가정
-        all_initial_states = np.zeros((10, n), dtype=int)
-        sampled_indices = random.sample(range(2**n), 10)
-            
-        for i, idx in enumerate(sampled_indices):
-            # idx를 이진수로 변환하여 상태 설정
-            binary = format(idx, f'0{n}b')
-            all_initial_states[i] = np.array([int(bit) for bit in binary])
-
-    return all_initial_states
+# [0 1 1] 은 같은 attractor
 
+# -> attractor_key로 가장 작은 state부터 시작하도록 회전시킨 (canonical) cycle을 써서 하나로 합침
 
 def update_state(n, network_logic, current_state):
 
-    # 4번 줄: replace, eval 함수를 이용해서,
-    # 네트워크 로직에 임시배열, 여기서는 current_state를 넣고
+    # 4번 줄: 네트워크 로직에 임시배열, 여기서는 current_state를 넣고
     # 다음 상태, 여기서는 next_state 노드값 배열을 구함
+    # 로직 문자열은 처음 한 번만 NumPy bitwise 프로그램으로 컴파일됨 (logic_compiler)
+    # (매 step마다 replace, eval을 반복하지 않음)
 
-    next_state = np.zeros(n, dtype=int)
+    return compile_logic(network_logic)(current_state)
 
-    # 각 노드의 다음 상태 계산
-    for i in range(n):
-        # 로직 문자열에서, 문자로 되어있는 걸 숫자로 치환
-        logic = network_logic[i]
-        for j in range(n):
-            logic = logic.replace(f'x[{j}]', str(current_state[j]))
-        
-        # 로직 평가
-        next_state[i] = int(eval(logic))
 
-    return next_state
+def attractor_key(attractor):
+
+    # cycle의 state들 중 가장 작은 state부터 시작하도록 회전 (minimal rotation)
+    # cycle 안의 state는 모두 다르므로, 같은 cycle이면 시작점과 관계없이 같은 key가 됨
+    cycle = [tuple(int(v) for v in state) for state in attractor]
+    start = cycle.index(min(cycle))
+    return tuple(cycle[start:] + cycle[:start])
 
 
 def find_attractor(n, network_logic, initial_state):
@@ -64,59 +43,108 @@ def find_attractor(n, network_logic, initial_state):
     tmp_array = initial_state.copy()
     # 3번 줄: Trajectory라는 저장공간, 그 첫칸에 한 줄의 임시배열을 저장
     trajectory = [initial_state.copy()]
+    # trajectory의 각 state가 몇 번째 칸에 있는지 (state -> index), hash로 O(1) 확인
+    trajectory_index = {initial_state.tobytes(): 0}
     
     while True:
         # 4번 줄: 네트워크 로직에 임시배열을 넣고 다음 상태의 노드값 배열을 구함
-        next_state = update_state(n, network_logic, tmp_array)
+        next_state = update_state(n, network_logic, tmp_array).astype(initial_state.dtype)
 
-        # 5번 줄: 얻어진 노드값 배열이 trajectory 저장공간 내에 이미 존재하는지 비교
-        for i, state in enumerate(trajectory):
-            if np.array_equal(next_state, state):
-                # 6번 줄: 이미 존재함 -> attractor로 분류
-                return trajectory[i:]
+        # 5번 줄: 얻어진 노드값 배열이 trajectory 저장공간 내에 이미 존재하는지 확인
+        i = trajectory_index.get(next_state.tobytes())
+        if i is not None:
+            # 6번 줄: 이미 존재함 -> attractor로 분류
+            return trajectory[i:]
         
-        # 6번 줄: trajectory array를 모두 돌렸는데도 없다면,
+        # 6번 줄: trajectory에 없다면,
         # 임시배열에 덮어씌우고,
         # trajectory의 다음 공간에 저장, 즉 append 하고,
         # 다시 4번 줄로 (while True 구문이라 계속 update_state 함수 수행할 것)
+        trajectory_index[next_state.tobytes()] = len(trajectory)
         trajectory.append(next_state.copy())
         tmp_array = next_state.copy()
 
 
-def run_simulation(n, network_logic):
+def find_attractor_memo(n, network_logic, initial_state, state_labels):
+
+    # find_attractor와 같지만, 이전 initial state들이 이미 지나간 state (state_labels에 있는 state)를
+    # 만나면 그 state의 attractor label을 그대로 쓰고 바로 멈춤
+    # 반환: (이번에 새로 지나간 state들의 key, 만난 label 또는 None, 새 attractor 또는 None)
+    trajectory = [initial_state.copy()]
+    trajectory_index = {}
+    tmp_array = initial_state.copy()
+    
+    while True:
+        key = tmp_array.tobytes()
+        label = state_labels.get(key)
+        if label is not None:
+            # 이미 label이 붙은 state -> 그 attractor로 감
+            return list(trajectory_index), label, None
+        i = trajectory_index.get(key)
+        if i is not None:
+            # 이번 trajectory 안에서 cycle 발견 -> 새 attractor 후보
+            return list(trajectory_index), None, trajectory[i:-1]
+        
+        trajectory_index[key] = len(trajectory) - 1
+        tmp_array = update_state(n, network_logic, tmp_array).astype(initial_state.dtype)
+        trajectory.append(tmp_array.copy())
+
 
-    # 1번 줄: N개의 노드를 가진 네트워크에 대하여 N by 𝟐^𝑵의 배열을 만들고,
-    # 0과 1을 규칙적으로 채워 넣어 모든 초기조건을 포함한 배열을 제작 (용량 초과의 경우 무작위 샘플링)
-    initial_states = make_initial_array(n)
+def run_simulation(n, network_logic, memoize=False, max_states=2**12):
+
+    # memoize=True 이면 지나간 모든 state에 attractor label을 저장해두고,
+    # 다음 initial state의 trajectory가 label이 붙은 state를 만나면 바로 멈춤
+    # (계산량이 샘플 수 x transient 길이가 아니라 지나간 서로 다른 state 수에 비례)
+
+    # 1번 줄: N개의 노드를 가진 네트워크에 대하여 모든 초기조건을 block 단위로 만듦
+    # (2^N이 max_states보다 크면 max_states개를 무작위 샘플링, initial_states.py)
+    # 2^N x N 배열을 한꺼번에 만들지 않음
+    initial_states = (state for block in initial_state_blocks(n, max_states) for state in block)
 
     # 7번 줄: Attractor 저장공간 및 basin size 저장배열을 만들고,
     attractor_save = []
     basin_sizes = []
+    # attractor_key -> attractor 저장공간의 index
+    attractor_index = {}
+    # (memoize) 지나간 state -> attractor label
+    state_labels = {}
     
     # 10번 줄: 모든 초기 조건에 대하여 반복
     # 2번 줄: 제작한 배열을 한 줄 읽어와 임시배열로 사용
     for initial_state in initial_states:
 
+        if memoize:
+            visited, label, attractor = find_attractor_memo(n, network_logic, initial_state, state_labels)
+            if label is None:
+                label = attractor_index.get(attractor_key(attractor))
+                if label is None:
+                    label = len(attractor_save)
+                    key = attractor_key(attractor)
+                    attractor_index[key] = label
+                    attractor_save.append([np.array(state) for state in key])
+                    basin_sizes.append(0)
+            for state_key in visited:
+                state_labels[state_key] = label
+            basin_sizes[label] += 1
+            continue
+
         attractor = find_attractor(n, network_logic, initial_state)
         
-        # attractor를 튜플 형태로 변환 (해시 가능하게)
-        attractor_tuple = tuple(map(tuple, attractor))
+        # attractor를 canonical cycle (튜플 형태)로 변환 (해시 가능하게)
+        key = attractor_key(attractor)
         
         # 8번 줄: 다음 attractor가 구해지면,
         # 해당 attractor가 이미 attractor 저장공간에 존재하는지 확인
-        found = False
-        for i, existing_attractor in enumerate(attractor_save):
-            existing_tuple = tuple(map(tuple, existing_attractor))
-            if existing_tuple == attractor_tuple:
-                # 9번 줄: 이미 존재한다면 해당 attractor의 basin size 저장배열 값을 +1
-                basin_sizes[i] += 1
-                found = True
-                break
-        
-        # 9번 줄: 존재하지 않는다면 다음 attractor 저장공간에 저장
-        # basin size 저장배열에 1을 입력 후 2번 줄로
-        if not found:
-            attractor_save.append(attractor)
+        i = attractor_index.get(key)
+        if i is not None:
+            # 9번 줄: 이미 존재한다면 해당 attractor의 basin size 저장배열 값을 +1
+            basin_sizes[i] += 1
+        else:
+            # 9번 줄: 존재하지 않는다면 다음 attractor 저장공간에 저장
+            # basin size 저장배열에 1을 입력 후 2번 줄로
+            # (저장은 canonical 순서로)
+            attractor_index[key] = len(attractor_save)
+            attractor_save.append([np.array(state) for state in key])
             basin_sizes.append(1)
 
 
@@ -126,23 +154,25 @@ def run_simulation(n, network_logic):
 
 
 
-now_logic = [
-    'x[0] and not x[2]',  # A*= A and not C
-    'x[0] or x[2]',       # B*= A or C
-    'not x[1]'            # C*= not B
-]
+# V1_notion.py에서 attractor_key를 import할 때는 실행되지 않도록
+if __name__ == "__main__":
+    now_logic = [
+        'x[0] and not x[2]',  # A*= A and not C
+        'x[0] or x[2]',       # B*= A or C
+        'not x[1]'            # C*= not B
+    ]
 
-attractor_save, basin_sizes = run_simulation(3, now_logic)
+    attractor_save, basin_sizes = run_simulation(3, now_logic)
 
 
 
-print(f"총 {len(attractor_save)}개의 attractor 발견")
+    print(f"총 {len(attractor_save)}개의 attractor 발견")
 
-for i, attractor in enumerate(attractor_save):
-    print(f"\nAttractor {i+1} (Basin Size: {basin_sizes[i]}):")
-    if len(attractor) == 1:
-        print(f"  Point attractor: {attractor[0]}")
-    else:
-        print(f"  Cycle attractor (길이: {len(attractor)}):")
-        for state in attractor:
-            print(f"    {state}")
\ No newline at end of file
+    for i, attractor in enumerate(attractor_save):
+        print(f"\nAttractor {i+1} (Basin Size: {basin_sizes[i]}):")
+        if len(attractor) == 1:
+            print(f"  Point attractor: {attractor[0]}")
+        else:
+            print(f"  Cycle attractor (길이: {len(attractor)}):")
+            for state in attractor:
+                print(f"    {state}")
@@ -2,6 +2,9 @@ import numpy as np
 import random
 import itertools
 
+from logic_compiler import compile_logic
+from V1 import attractor_key
+
 class BooleanNetworkSimulation:
     def __init__(self, network_logic, num_nodes, max_samples=None):
         """
@@ -18,10 +21,13 @@ class BooleanNetworkSimulation:
             초기조건 샘플링 개수 (None이면 모든 초기조건 사용)
         """
         self.network_logic = network_logic
+        self.update = compile_logic(network_logic)  # 로직은 한 번만 컴파일
         self.num_nodes = num_nodes
         self.max_samples = max_samples
         self.attractors = []
         self.basin_sizes = []
+        # attractor_key (가장 작은 state부터 시작하도록 회전시킨 cycle) -> attractors의 index
+        self.attractor_index = {}
         
     def generate_initial_states(self):
         """
@@ -66,18 +72,9 @@ class BooleanNetworkSimulation:
         numpy.ndarray
             다음 상태 (shape: num_nodes)
         """
-        next_state = np.zeros(self.num_nodes, dtype=int)
         print(f"현재 state: {state}")
-        # 각 노드의 다음 상태 계산
-        for i in range(self.num_nodes):
-            # 로직 문자열에서 x[j]를 state[j]로 치환
-            logic = self.network_logic[i]
-            for j in range(self.num_nodes):
-                logic = logic.replace(f'x[{j}]', str(state[j]))
-            
-            # 로직 평가
-            next_state[i] = int(eval(logic))
-            # print(f"{i}번째: {logic}")
+        # 컴파일된 로직으로 모든 노드의 다음 상태를 한 번에 계산
+        next_state = self.update(state)
 
         print(f"다음 state: {next_state}")
         return next_state
@@ -115,10 +112,54 @@ class BooleanNetworkSimulation:
             trajectory.append(next_state.copy())
             current_state = next_state.copy()
     
-    def run_simulation(self):
+    def find_attractor_memo(self, initial_state, state_labels):
+        """
+        find_attractor와 같지만, 이전 초기 상태들이 이미 지나간 상태를 만나면
+        그 상태의 attractor label을 쓰고 바로 멈춤
+        
+        Parameters:
+        -----------
+        initial_state : numpy.ndarray
+            초기 상태 (shape: num_nodes)
+        state_labels : dict
+            지나간 상태 (bytes) -> attractor index
+        
+        Returns:
+        --------
+        tuple
+            (visited, label, attractor)
+            visited: 이번에 새로 지나간 상태들의 key 리스트
+            label: 만난 상태의 attractor index (새 cycle을 찾았으면 None)
+            attractor: 새로 찾은 cycle (label을 만났으면 None)
+        """
+        trajectory = [initial_state.copy()]
+        trajectory_index = {}
+        current_state = initial_state.copy()
+        
+        while True:
+            key = current_state.tobytes()
+            label = state_labels.get(key)
+            if label is not None:
+                return list(trajectory_index), label, None
+            i = trajectory_index.get(key)
+            if i is not None:
+                return list(trajectory_index), None, trajectory[i:-1]
+            
+            trajectory_index[key] = len(trajectory) - 1
+            current_state = self.update(current_state).astype(initial_state.dtype)
+            trajectory.append(current_state.copy())
+    
+    def run_simulation(self, memoize=False):
         """
         Boolean Network Simulation 실행
         
+        Parameters:
+        -----------
+        memoize : bool
+            True이면 지나간 모든 상태에 attractor label을 저장하고,
+            이후 초기 상태의 trajectory가 label이 있는 상태를 만나면 바로 멈춤
+            (계산량이 초기 상태 수 x transient 길이 대신 서로 다른 상태 수에 비례)
+        
         Returns:
         --------
         tuple
@@ -130,28 +171,31 @@ class BooleanNetworkSimulation:
 
         print(f"첫 state: {initial_states}")
         
+        state_labels = {}
         for initial_state in initial_states:
-            attractor = self.find_attractor(initial_state)
-            
-            # attractor를 튜플 형태로 변환 (해시 가능하게)
-            attractor_tuple = tuple(map(tuple, attractor))
-            
-            # 이미 발견된 attractor인지 확인
-            found = False
-            for i, existing_attractor in enumerate(self.attractors):
-                existing_tuple = tuple(map(tuple, existing_attractor))
-                if existing_tuple == attractor_tuple:
-                    self.basin_sizes[i] += 1
-                    found = True
-                    break
-            
-            # 새로운 attractor인 경우 추가
-            if not found:
-                self.attractors.append(attractor)
-                self.basin_sizes.append(1)
-        
-            print(f"attractors: {self.attractors}")
-            print(f"basin size: {self.basin_sizes}")
+            if memoize:
+                visited, label, attractor = self.find_attractor_memo(initial_state, state_labels)
+            else:
+                label, attractor = None, self.find_attractor(initial_state)
+
+            if label is None:
+                # 회전된 같은 cycle은 같은 key가 되므로 두 mode 모두 하나의 attractor로 합침 (dict로 바로 찾음)
+                key = attractor_key(attractor)
+                label = self.attractor_index.get(key)
+                if label is None:
+                    # 새로운 attractor는 canonical 순서로 저장
+                    label = len(self.attractors)
+                    self.attractor_index[key] = label
+                    self.attractors.append([np.array(state) for state in key])
+                    self.basin_sizes.append(0)
+            self.basin_sizes[label] += 1
+
+            if memoize:
+                for state_key in visited:
+                    state_labels[state_key] = label
+            else:
+                print(f"attractors: {self.attractors}")
+                print(f"basin size: {self.basin_sizes}")
 
         return self.attractors, self.basin_sizes
     
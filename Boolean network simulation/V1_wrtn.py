@@ -21,6 +21,8 @@ SAMPLE_SIZE = 50  # 샘플링할 경우 사용할 초기 상태 개수 (원하
 # replace와 eval을 사용하여 old_state 에 기반한 next_state를 생성
 # network_logic_str 에서 "old_state" 문자열을 그대로 사용함.
 network_logic_str = "next_state = [s ^ 1 for s in old_state]"
+# 로직 문자열은 한 번만 compile 해두고, update_state에서는 compile된 code를 실행만 함
+network_logic_code = compile(network_logic_str, '<network_logic>', 'exec')
 
 # ------------------------------
 # Step 2. Generate Initial Conditions Array
@@ -61,11 +63,9 @@ def update_state(old_state):
     network_logic_str을 이용하여 old_state에 대한 next_state 계산
     replace 및 eval 사용 -> 안전한 환경 제공을 위해 별도의 dictionary 사용
     """
-    # 로직 문자열 준비. 여기서는 별도의 변환은 없으므로 그대로 사용.
-    logic_str = network_logic_str
     # eval 실행: 전역 네임스페이스 대신 제한된 로컬 네임스페이스 사용
     local_dict = {'old_state': old_state}
-    exec(logic_str, {}, local_dict)  # exec로 network_logic_str 실행
+    exec(network_logic_code, {}, local_dict)  # 미리 compile한 network_logic_str 실행
     next_state = local_dict['next_state']
     # 결과가 올바른 길이인지 확인
     if len(next_state) != len(old_state):
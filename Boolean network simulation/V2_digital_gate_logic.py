@@ -1,50 +1,18 @@
 import numpy as np
 import networkx as nx
-import itertools
-import random
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+from functional_graph import functional_graph_attractors
+from logic_compiler import compile_logic
+from initial_states import initial_state_blocks, index_to_states, states_to_index
+import stg_plot
 
-# Weighted sum logic은 아직 하지 못함
-
-
-state_transitions = {} # 각 초기조건의 다음 state를 dictionary 형태로 저장
-stg = nx.DiGraph()
-
-attractor_save = []
-basin = {}
+# 이 노드 수까지는 지나간 state를 2^N bit bitmap으로 기록 (최대 512 MiB, np.zeros라서 실제로 쓴 page만 메모리를 차지)
+BITMAP_NODES = 32
 
 
-
-def make_initial_array(n):
-
-    max_capacity = 14
-    if n < max_capacity:
-        all_initial_states = np.array(list(itertools.product([0, 1], repeat=n)))
-    
-    else:
-        all_initial_states = np.zeros((10000, n), dtype=int)
-        sampled_indices = random.sample(range(2**n), 10000)
-            
-        for i, idx in enumerate(sampled_indices):
-            binary = format(idx, f'0{n}b')
-            all_initial_states[i] = np.array([int(bit) for bit in binary])
-
-    return all_initial_states
-
-
-def update_state(n, network_logic, current_state):
-
-    next_state = np.zeros(n, dtype=int)
-
-    for i in range(n):
-        logic = network_logic[i]
-        for j in range(n):
-            logic = logic.replace(f'x[{j}]', str(current_state[j]))
-        
-        next_state[i] = int(eval(logic))
-
-    return next_state
+# Weighted sum logic은 아직 하지 못함
 
 
 def state_to_str(state):
@@ -58,131 +26,269 @@ def str_to_state(state_str):
     return np.array([int(bit) for bit in state_str])
 
 
-def make_STG(n, network_logic):
-
-    # STG 만들기
-
-    # 1번 줄: N개의 노드를 가진 네트워크에 대하여 N by 𝟐^𝑵의 배열을 만들고,
-    # 0과 1을 규칙적으로 채워 넣어 모든 초기조건을 포함한 배열을 제작 (용량 초과의 경우 무작위 샘플링)
-    initial_states = make_initial_array(n)
-
-    # 2번 줄: 각 초기조건의 다음 state를 dictionary 형태로 저장함
-    for state in initial_states:
-        state_str = state_to_str(state)
-        next_state = update_state(n, network_logic, state)
-        next_state_str = state_to_str(next_state)
+class _VisitedStates:
+    """
+    샘플링할 때 지나간 state index 기록
+    노드가 BITMAP_NODES개 이하면 bitmap, 그보다 많으면 (bitmap을 만들 수 없으므로) set
+    """
+    def __init__(self, num_nodes):
+        self.bitmap = np.zeros(2**num_nodes // 8 + 1, dtype=np.uint8) if num_nodes <= BITMAP_NODES else None
+        self.seen = set()
+
+    def add(self, states):
+        """
+        states 중 처음 보는 state만 (중복 없이) 반환하고 기록
+        """
+        states = np.unique(states)
+        if self.bitmap is None:
+            states = states[np.array([x not in self.seen for x in states.tolist()], dtype=bool)]
+            self.seen.update(states.tolist())
+            return states
+        byte = (states >> np.uint64(3)).astype(np.int64)
+        bit = np.left_shift(np.uint8(1), (states & np.uint64(7)).astype(np.uint8))
+        new = (self.bitmap[byte] & bit) == 0
+        np.bitwise_or.at(self.bitmap, byte[new], bit[new])
+        return states[new]
+
+
+class BooleanNetworkSimulation:
+    def __init__(self, network_logic, num_nodes, max_states=2**16, seed=None):
+        """
+        Digital gate logic Boolean network simulation
+        모든 결과를 instance 안에 저장하므로, 여러 네트워크를 한 process에서 (또는 동시에) 돌려도 섞이지 않음
+
+        state는 정수 index (format(idx, f'0{n}b')가 state 문자열)로 저장하고,
+        STG는 dict / networkx 대신 배열로 저장
+        - states : 지나간 state들의 index (정렬됨)
+        - successors : 각 state의 다음 state가 states의 몇 번째인지
+        - attractor_ids : 각 state가 도달하는 attractor 번호
+
+        Parameters:
+        -----------
+        network_logic : list of str
+            각 노드의 상태 전이 로직을 담은 리스트
+            예: ['x[0] and not x[2]', 'x[0] or x[2]', 'not x[1]']
+        num_nodes : int
+            네트워크의 노드 개수 (64개 이하)
+        max_states : int
+            초기 상태 수 상한 (2^num_nodes가 이보다 크면 샘플링)
+        seed : int, optional
+            샘플링 seed
+        """
+        if num_nodes > 64:
+            raise ValueError(f"state index는 64개 이하의 노드만 지원합니다: {num_nodes}")
+        self.network_logic = network_logic
+        self.num_nodes = num_nodes
+        self.max_states = max_states
+        self.seed = seed
+        self.states = np.zeros(0, dtype=np.uint64)
+        self.successors = np.zeros(0, dtype=np.int64)
+        self.attractor_ids = np.zeros(0, dtype=np.int64)
+        self.attractors = []         # 각 attractor의 state index 배열 (update 순서)
+        self.basin_sizes = np.zeros(0, dtype=np.int64)
+
+    def update_state(self, states):
+        """
+        state index들의 다음 state index를 한 번에 계산
+
+        Parameters:
+        -----------
+        states : numpy.ndarray
+            state index 배열 (uint64)
+        """
+        # 로직 문자열은 처음 한 번만 NumPy bitwise 프로그램으로 컴파일됨 (logic_compiler)
+        update = compile_logic(self.network_logic)
+        return states_to_index(update(index_to_states(states, self.num_nodes)))
+
+    def build_state_transition_graph(self):
+        """
+        State Transition Graph 구축
+        모든 state를 볼 수 있으면 (2^N <= max_states) state i의 다음 state index가 곧 successors[i]
+        샘플링하면 초기 상태들에서 시작해서 새 state가 없을 때까지 다음 state를 따라감
+        (샘플링한 경우에도 attractor를 놓치지 않음)
+        """
+        blocks = initial_state_blocks(self.num_nodes, self.max_states, seed=self.seed)
+        if 2**self.num_nodes <= self.max_states:
+            # block은 0, 1, 2, ... 순서
+            self.states = np.arange(2**self.num_nodes, dtype=np.uint64)
+            self.successors = np.concatenate([self.update_state(states_to_index(block))
+                                              for block in blocks]).astype(np.int64)
+            return
+
+        visited = _VisitedStates(self.num_nodes)
+        states, successors = [], []
+        for block in blocks:
+            frontier = visited.add(states_to_index(block))
+            while frontier.size:
+                next_states = self.update_state(frontier)
+                states.append(frontier)
+                successors.append(next_states)
+                frontier = visited.add(next_states)
+
+        states = np.concatenate(states)
+        successors = np.concatenate(successors)
+        order = np.argsort(states)
+        self.states = states[order]
+        self.successors = np.searchsorted(self.states, successors[order])
+
+    def find_attractors(self):
+        """
+        STG에서 attractor 찾기
+        synchronous update라 모든 state의 다음 state가 하나뿐이므로 (functional graph),
+        successor 배열에서 cycle과 각 state의 attractor 번호를 한 번에 구함
+        """
+        cycles, self.attractor_ids = functional_graph_attractors(self.successors)
+        self.attractors = [self.states[cycle] for cycle in cycles]
+        self.basin_sizes = np.bincount(self.attractor_ids, minlength=len(cycles))
+
+    def run_simulation(self):
+        """
+        Boolean Network Simulation 실행
+
+        Returns:
+        --------
+        tuple
+            (attractors, basin_sizes)
+            attractors: 각 attractor의 state 문자열 리스트
+            basin_sizes: 각 attractor의 basin size
+        """
+        self.build_state_transition_graph()
+        self.find_attractors()
+        return self.attractor_strings(), self.basin_sizes.tolist()
+
+    def state_strings(self, states):
+        return [format(int(x), f'0{self.num_nodes}b') for x in states]
+
+    def attractor_strings(self):
+        return [self.state_strings(attractor) for attractor in self.attractors]
+
+    def basin(self, i):
+        """
+        i번째 attractor의 basin에 속하는 state 문자열들
+        """
+        return self.state_strings(self.states[self.attractor_ids == i])
+
+    def to_networkx(self):
+        """
+        그림을 그리기 위해 STG를 networkx DiGraph로 변환
+        """
+        names = self.state_strings(self.states)
+        stg = nx.DiGraph()
+        stg.add_nodes_from(names)
+        stg.add_edges_from((names[i], names[j]) for i, j in enumerate(self.successors))
+        return stg
+
+    def draw_STG(self, save_path=None, mode=None, show=None, max_nodes=500):
+        """
+        STG 그리기
+
+        Parameters:
+        -----------
+        save_path : str, optional
+            그림 저장 경로 (주어지면 plt.show()로 멈추지 않음)
+        mode : str, optional
+            'full' : 모든 state와 label (작은 STG용)
+            'summary' : attractor마다 basin 요약 (stg_plot.plot_basin_summary)
+            'sample' : 일부 state와 attractor까지의 경로만 (stg_plot.plot_sampled_stg)
+            None이면 state가 stg_plot.FULL_PLOT_STATES개 이하일 때 'full', 아니면 'summary'
+        show : bool, optional
+            None이면 save_path가 없을 때만 plt.show()
+        max_nodes : int
+            'sample'에서 그릴 state 수
+        """
+        if mode is None:
+            mode = 'full' if len(self.states) <= stg_plot.FULL_PLOT_STATES else 'summary'
+        names = [' -> '.join(attractor) for attractor in self.attractor_strings()]
+        attractor_states = [np.searchsorted(self.states, attractor) for attractor in self.attractors]
+        if mode == 'summary':
+            summary = stg_plot.basin_summary(self.successors, self.attractor_ids, attractor_states)
+            stg_plot.plot_basin_summary(summary, names, save_path=save_path, show=show)
+            return
+        if mode == 'sample':
+            stg_plot.plot_sampled_stg(self.successors, self.attractor_ids, attractor_states,
+                                      self.state_strings(self.states), max_nodes, save_path=save_path, show=show)
+            return
+
+        stg = self.to_networkx()
+        fig = plt.figure(figsize=(12, 12))
+        
+        # 노드 위치 계산
+        pos = nx.spring_layout(stg, seed=42)
+        
+        # 일반 노드 그리기
+        nx.draw_networkx_nodes(stg, pos, node_color='lightblue', node_size=10)
+        
+        # Attractor 노드 강조
+        attractor_nodes = []
+        for attractor in self.attractor_strings():
+            attractor_nodes.extend(attractor)
+        
+        nx.draw_networkx_nodes(stg, pos, nodelist=attractor_nodes, 
+                                node_color='red', node_size=20)
         
-        # 각 초기조건의 다음 state 저장, dictionary 형태로
-        state_transitions[state_str] = next_state_str
+        # 에지 그리기
+        nx.draw_networkx_edges(stg, pos, arrows=True)
         
-        # STG에 node 및 edge 추가
-        stg.add_node(state_str)
-        stg.add_node(next_state_str)
-        stg.add_edge(state_str, next_state_str)
-
-
-def find_attractors():
-
-    # 4번 줄: STG에서 cycle을 구성하는 노드를 모두 구함
-    # networkx의 simple_cycles 함수 이용
-    cycles = list(nx.simple_cycles(stg))
-    
-    # 크기가 1인 cycle은 fixed point attractor, 크기가 2 이상인 cycle은 cyclic attractor
-    for cycle in cycles:
-        if len(cycle) == 1:
-            attractor_save.append(("point", cycle))
-            attractor_key = f"point: {'->'.join(cycle)}"
-        else:
-            attractor_save.append(("cyclic", cycle))
-            attractor_key = f"cyclic: {'->'.join(cycle)}"
-
-        # attradtor_key를 가지고, basin dict를 만듦
-        # basin은 일단 비어있는 list로 두기
-        basin[attractor_key] = []
-
-
-def find_basin():
-    
-    # 모든 노드에 대해 어떤 attractor에 도달할 수 있는지 확인
-    for node in stg.nodes():
-        for attractor_type, attractor in attractor_save:
-            attractor_key = f"{attractor_type}: {'->'.join(attractor)}"
-            try:
-                # 노드에서 attractor의 첫 번째 노드로 가는 경로가 있는지 확인
-                nx.shortest_path(stg, node, attractor[0])
-                # 경로가 있으면 해당 attractor의 basin size 증가
-                basin[attractor_key].append(node)
-                # 하나의 attractor에 도달할 수 있으면 다음 노드로 넘어감
-                break
-            except:
-                # 경로가 없으면 다음 attractor 확인
-                pass
-
-
-def draw_STG(save_path=None):
-
-    plt.figure(figsize=(12, 12))
-    
-    # 노드 위치 계산
-    pos = nx.spring_layout(stg, seed=42)
-    
-    # 일반 노드 그리기
-    nx.draw_networkx_nodes(stg, pos, node_color='lightblue', node_size=10)
-    
-    # Attractor 노드 강조
-    attractor_nodes = []
-    for _, attractor in attractor_save:
-        attractor_nodes.extend(attractor)
-    
-    nx.draw_networkx_nodes(stg, pos, nodelist=attractor_nodes, 
-                            node_color='red', node_size=20)
-    
-    # 에지 그리기
-    nx.draw_networkx_edges(stg, pos, arrows=True)
-    
-    # 노드 레이블 그리기
-    nx.draw_networkx_labels(stg, pos, font_size=10)
-    
-    plt.title("State Transition Graph")
-    plt.axis('off')
-    
-    if save_path:
-        plt.savefig(save_path)
-    
-    plt.show()
-
-def run_simulation(n, network_logic):
-
-    # State Transition Graph 구축
-    make_STG(n, network_logic)
-    
-    # Attractor 찾기
-    find_attractors()
-    
-    # Basin 찾기
-    find_basin()
-    
-
-def print_results():
-
-    print(f"총 {len(attractor_save)}개의 attractor 발견")
-    
-    for i, (attractor_type, attractor) in enumerate(attractor_save):
-        attractor_key = f"{attractor_type}: {'->'.join(attractor)}"
-        basins = basin.get(attractor_key, 0)
-        basin_size = len(basins)
+        # 노드 레이블 그리기
+        nx.draw_networkx_labels(stg, pos, font_size=10)
         
-        if attractor_type == "fixed_point":
-            state_array = str_to_state(attractor[0])
-            print(f"\nPoint Attractor {i+1} (Basin Size: {basin_size}):")
-            print(f"  State: {attractor[0]} = {state_array}")
-            print(f"basins: {basins}")
-        else:
-            print(f"\nCyclic Attractor {i+1} (길이: {len(attractor)}, Basin Size: {basin_size}):")
-            for state_str in attractor:
-                state_array = str_to_state(state_str)
-                print(f"  State: {state_str} = {state_array}")
-            print(f"basins: {basins}")
+        plt.title("State Transition Graph")
+        plt.axis('off')
+        
+        stg_plot.finish_figure(fig, save_path, save_path is None if show is None else show)
+
+    def print_results(self):
+
+        print(f"총 {len(self.attractors)}개의 attractor 발견")
+        
+        for i, attractor in enumerate(self.attractor_strings()):
+            basins = self.basin(i)
+            basin_size = len(basins)
+            
+            if len(attractor) == 1:
+                state_array = str_to_state(attractor[0])
+                print(f"\nPoint Attractor {i+1} (Basin Size: {basin_size}):")
+                print(f"  State: {attractor[0]} = {state_array}")
+                print(f"basins: {basins}")
+            else:
+                print(f"\nCyclic Attractor {i+1} (길이: {len(attractor)}, Basin Size: {basin_size}):")
+                for state_str in attractor:
+                    state_array = str_to_state(state_str)
+                    print(f"  State: {state_str} = {state_array}")
+                print(f"basins: {basins}")
+
+
+def _run_network(args):
+    network_logic, num_nodes, max_states, seed = args
+    return BooleanNetworkSimulation(network_logic, num_nodes, max_states, seed).run_simulation()
+
+
+def run_networks(networks, max_states=2**16, seed=None, max_workers=None, use_threads=False):
+    """
+    서로 독립적인 여러 네트워크를 process (또는 thread) pool에서 동시에 시뮬레이션
+
+    Parameters:
+    -----------
+    networks : list of list of str
+        네트워크 로직 리스트 (노드 개수는 로직 길이)
+    max_states : int
+        네트워크마다 초기 상태 수 상한
+    seed : int, optional
+        샘플링 seed
+    max_workers : int, optional
+        worker 수 (None이면 CPU 수)
+    use_threads : bool
+        True이면 ThreadPoolExecutor 사용
+
+    Returns:
+    --------
+    list
+        네트워크마다 run_simulation()의 결과 (attractors, basin_sizes), 입력 순서대로
+    """
+    tasks = [(network_logic, len(network_logic), max_states, seed) for network_logic in networks]
+    executor = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+    with executor(max_workers=max_workers) as pool:
+        return list(pool.map(_run_network, tasks))
 
 
 # A*= A and not C
@@ -208,6 +314,14 @@ network_logic_2 = [
     'x[3]'
 ]
 
-run_simulation(5, network_logic_2)
-print_results()
-draw_STG()
+if __name__ == "__main__":
+    sim = BooleanNetworkSimulation(network_logic_2, num_nodes=5)
+    sim.run_simulation()
+    sim.print_results()
+
+    # 여러 네트워크를 동시에 시뮬레이션
+    for network_logic, (attractors, basin_sizes) in zip([network_logic_1, network_logic_2],
+                                                        run_networks([network_logic_1, network_logic_2])):
+        print(f"\n{network_logic}: attractors {attractors}, basin sizes {basin_sizes}")
+
+    sim.draw_STG()
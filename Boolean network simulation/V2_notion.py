@@ -1,3 +1,4 @@
+import os
 import numpy as np
 import networkx as nx
 import itertools
@@ -5,6 +6,11 @@ import random
 import matplotlib.pyplot as plt
 from collections import defaultdict
 
+from logic_compiler import compile_logic
+from initial_states import index_to_states, states_to_index
+from functional_graph import functional_graph_attractors_chunked
+import stg_plot
+
 class BooleanNetworkSimulation:
     def __init__(self, network_logic, num_nodes, max_samples=None):
         """
@@ -21,12 +27,15 @@ class BooleanNetworkSimulation:
             초기조건 샘플링 개수 (None이면 모든 초기조건 사용)
         """
         self.network_logic = network_logic
+        self.update = compile_logic(network_logic)  # 로직은 한 번만 컴파일
         self.num_nodes = num_nodes
         self.max_samples = max_samples
         self.state_transitions = {}  # Dictionary to store state transitions
         self.stg = nx.DiGraph()      # State Transition Graph
         self.attractors = []         # List to store attractors
         self.basin_sizes = {}        # Dictionary to store basin sizes
+        self.successors = None       # run_simulation(mmap_dir=...)의 successor 배열
+        self.attractor_ids = None    # run_simulation(mmap_dir=...)의 각 state의 attractor 번호
         
     def generate_initial_states(self):
         """
@@ -63,26 +72,15 @@ class BooleanNetworkSimulation:
         Parameters:
         -----------
         state : numpy.ndarray
-            현재 상태 (shape: num_nodes)
+            현재 상태 (shape: num_nodes 또는 num_states x num_nodes)
         
         Returns:
         --------
         numpy.ndarray
-            다음 상태 (shape: num_nodes)
+            다음 상태 (입력과 같은 shape)
         """
-        next_state = np.zeros(self.num_nodes, dtype=int)
-        
-        # 각 노드의 다음 상태 계산
-        for i in range(self.num_nodes):
-            # 로직 문자열에서 x[j]를 state[j]로 치환
-            logic = self.network_logic[i]
-            for j in range(self.num_nodes):
-                logic = logic.replace(f'x[{j}]', str(state[j]))
-            
-            # 로직 평가
-            next_state[i] = int(eval(logic))
-            
-        return next_state
+        # 컴파일된 로직으로 모든 노드의 다음 상태를 한 번에 계산
+        return self.update(state)
     
     def state_to_str(self, state):
         """
@@ -123,10 +121,10 @@ class BooleanNetworkSimulation:
         # 초기 상태 생성
         initial_states = self.generate_initial_states()
         
-        # 모든 초기 상태에 대해 다음 상태 계산 및 그래프에 추가
-        for state in initial_states:
+        # 모든 초기 상태의 다음 상태를 한 번에 계산한 뒤 그래프에 추가
+        next_states = self.update_state(initial_states)
+        for state, next_state in zip(initial_states, next_states):
             state_str = self.state_to_str(state)
-            next_state = self.update_state(state)
             next_state_str = self.state_to_str(next_state)
             
             # 상태 전이 저장
@@ -137,6 +135,46 @@ class BooleanNetworkSimulation:
             self.stg.add_node(next_state_str)
             self.stg.add_edge(state_str, next_state_str)
     
+    def build_successor_array(self, mmap_dir, chunk_size=2**20):
+        """
+        모든 2^N개 상태의 다음 상태를 chunk 단위로 계산해서 디스크의 memory-mapped 배열에 저장
+        (state_transitions dict와 networkx 그래프를 만들지 않음)
+        successors[i] = 상태 i (format(i, f'0{N}b'))의 다음 상태 index
+        
+        Parameters:
+        -----------
+        mmap_dir : str
+            successor 배열 (successors.npy)과 attractor 계산용 배열을 저장할 디렉토리
+        chunk_size : int
+            한 번에 계산하는 상태 수
+        """
+        if self.num_nodes > 64:
+            raise ValueError(f"state index는 64개 이하의 노드만 지원합니다: {self.num_nodes}")
+        os.makedirs(mmap_dir, exist_ok=True)
+        total_states = 2**self.num_nodes
+        dtype = np.uint32 if self.num_nodes <= 32 else np.uint64
+        self.successors = np.lib.format.open_memmap(os.path.join(mmap_dir, 'successors.npy'), mode='w+',
+                                                    dtype=dtype, shape=(total_states,))
+        for start in range(0, total_states, chunk_size):
+            states = index_to_states(np.arange(start, min(start + chunk_size, total_states), dtype=np.uint64), self.num_nodes)
+            self.successors[start:start + len(states)] = states_to_index(self.update(states))
+        self.successors.flush()
+    
+    def find_attractors_mmap(self, mmap_dir, chunk_size=2**20):
+        """
+        build_successor_array로 만든 successor 배열에서 attractor와 basin size 계산
+        (functional graph, 모든 계산이 chunk 단위로 mmap 위에서 진행됨)
+        각 상태의 attractor 번호는 self.attractor_ids (mmap)에 저장
+        """
+        cycles, self.attractor_ids, basin_sizes = functional_graph_attractors_chunked(
+            self.successors, mmap_dir, chunk_size)
+        
+        for cycle, basin_size in zip(cycles, basin_sizes):
+            attractor = [format(int(x), f'0{self.num_nodes}b') for x in cycle]
+            attractor_type = "fixed_point" if len(attractor) == 1 else "cyclic"
+            self.attractors.append((attractor_type, attractor))
+            self.basin_sizes[f"{attractor_type}:{'->'.join(attractor)}"] = int(basin_size)
+    
     def find_attractors(self):
         """
         STG에서 attractor 찾기
@@ -178,16 +216,47 @@ class BooleanNetworkSimulation:
                     # 경로가 없으면 다음 attractor 확인
                     continue
     
-    def plot_state_transition_graph(self, save_path=None):
+    def plot_state_transition_graph(self, save_path=None, mode=None, show=None, max_nodes=500):
         """
         State Transition Graph 시각화
         
         Parameters:
         -----------
         save_path : str, optional
-            그래프 이미지 저장 경로
+            그래프 이미지 저장 경로 (주어지면 plt.show()로 멈추지 않음)
+        mode : str, optional
+            'full' : 모든 state와 label (작은 STG용)
+            'summary' : attractor마다 basin 요약 (stg_plot.plot_basin_summary)
+            'sample' : 일부 state와 attractor까지의 경로만 (stg_plot.plot_sampled_stg)
+            None이면 state가 stg_plot.FULL_PLOT_STATES개 이하일 때 'full', 아니면 'summary'
+            (mmap_dir로 실행한 경우에는 'full'을 쓸 수 없음)
+        show : bool, optional
+            None이면 save_path가 없을 때만 plt.show()
+        max_nodes : int
+            'sample'에서 그릴 state 수
         """
-        plt.figure(figsize=(12, 12))
+        show = save_path is None if show is None else show
+        attractors = [attractor for _, attractor in self.attractors]
+        if self.successors is not None:
+            # build_successor_array로 만든 배열 (state index = 상태 문자열의 이진수 값)
+            succ, labels = self.successors, self.attractor_ids
+            names = None
+            attractor_states = [np.array([int(x, 2) for x in attractor]) for attractor in attractors]
+        else:
+            names, succ, labels = stg_plot.arrays_from_stg(self.stg, attractors)
+            index = {name: i for i, name in enumerate(names)}
+            attractor_states = [np.array([index[x] for x in attractor]) for attractor in attractors]
+        if mode is None:
+            mode = 'full' if len(succ) <= stg_plot.FULL_PLOT_STATES and self.successors is None else 'summary'
+        if mode == 'summary':
+            summary = stg_plot.basin_summary(succ, labels, attractor_states)
+            stg_plot.plot_basin_summary(summary, [' -> '.join(x) for x in attractors], save_path=save_path, show=show)
+            return
+        if mode == 'sample':
+            stg_plot.plot_sampled_stg(succ, labels, attractor_states, names, max_nodes, save_path=save_path, show=show)
+            return
+        
+        fig = plt.figure(figsize=(12, 12))
         
         # 노드 위치 계산
         pos = nx.spring_layout(self.stg, seed=42)
@@ -212,20 +281,30 @@ class BooleanNetworkSimulation:
         plt.title("State Transition Graph")
         plt.axis('off')
         
-        if save_path:
-            plt.savefig(save_path)
-        
-        plt.show()
+        stg_plot.finish_figure(fig, save_path, show)
     
-    def run_simulation(self):
+    def run_simulation(self, mmap_dir=None, chunk_size=2**20):
         """
         Boolean Network Simulation 실행
         
+        Parameters:
+        -----------
+        mmap_dir : str, optional
+            주어지면 모든 2^N개 상태에 대해 STG를 networkx 대신 디스크의 successor 배열로 만들고
+            (build_successor_array), attractor와 basin도 그 위에서 계산 (max_samples는 사용하지 않음)
+        chunk_size : int
+            mmap_dir을 쓸 때 한 번에 처리하는 상태 수
+        
         Returns:
         --------
         tuple
             (attractors, basin_sizes)
         """
+        if mmap_dir is not None:
+            self.build_successor_array(mmap_dir, chunk_size)
+            self.find_attractors_mmap(mmap_dir, chunk_size)
+            return self.attractors, self.basin_sizes
+        
         # State Transition Graph 구축
         self.build_state_transition_graph()
         
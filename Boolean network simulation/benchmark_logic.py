@@ -0,0 +1,65 @@
+"""
+update_state 속도 비교 (steps/second)
+
+1. 기존 방식: 매 step, 매 노드마다 str.replace + eval
+2. 컴파일된 로직 (logic_compiler), state 하나씩
+3. 컴파일된 로직, 모든 state를 한 번에 (batch)
+
+usage : python benchmark_logic.py [num_nodes] [num_states]
+"""
+
+import sys
+import time
+import random
+
+import numpy as np
+
+from logic_compiler import compile_logic
+
+
+def update_state_eval(n, network_logic, current_state):
+    # 기존 V1 / V2의 update_state
+    next_state = np.zeros(n, dtype=int)
+    for i in range(n):
+        logic = network_logic[i]
+        for j in range(n):
+            logic = logic.replace(f'x[{j}]', str(current_state[j]))
+        next_state[i] = int(eval(logic))
+    return next_state
+
+
+def random_logic(n, seed=0):
+    # 노드마다 입력 3개짜리 임의의 and / or / not 로직
+    rng = random.Random(seed)
+    network_logic = []
+    for _ in range(n):
+        a, b, c = rng.sample(range(n), 3)
+        op1, op2 = rng.choice(['and', 'or']), rng.choice(['and', 'or'])
+        neg = rng.choice(['', 'not '])
+        network_logic.append(f'( x[{a}] {op1} {neg}x[{b}] ) {op2} x[{c}]')
+    return network_logic
+
+
+def steps_per_second(func, states):
+    start = time.time()
+    results = func(states)
+    return len(states) / (time.time() - start), results
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    num_states = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    network_logic = random_logic(n)
+    states = np.random.default_rng(0).integers(0, 2, size=(num_states, n), dtype=np.uint8)
+    update = compile_logic(network_logic)
+
+    rate_eval, ref = steps_per_second(lambda S: np.array([update_state_eval(n, network_logic, s) for s in S]), states)
+    rate_single, single = steps_per_second(lambda S: np.array([update(s) for s in S]), states)
+    rate_batch, batch = steps_per_second(update, states)
+
+    assert (ref == single).all() and (ref == batch).all()
+    print(f'{n} nodes, {num_states} states')
+    print(f'replace + eval      : {rate_eval:12.0f} steps/s')
+    print(f'compiled, per state : {rate_single:12.0f} steps/s (x{rate_single / rate_eval:.0f})')
+    print(f'compiled, batch     : {rate_batch:12.0f} steps/s (x{rate_batch / rate_eval:.0f})')
@@ -0,0 +1,32 @@
+"""
+functional graph (synchronous STG) attractor finder
+
+Is_It_Fatal_To_Remove_One_Node/modules/functionalGraph.py를 파일 경로로 직접 불러옴
+(sys.path에 다른 프로젝트 폴더를 추가하고 'modules'라는 일반적인 이름의 패키지로 import하면
+ 실행 위치에 따라 달라지고, 같은 이름의 다른 모듈을 가리거나 가려질 수 있음)
+"""
+
+import os
+import sys
+import importlib.util
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                    'Is_It_Fatal_To_Remove_One_Node', 'modules', 'functionalGraph.py')
+# 다른 모듈과 겹치지 않는 이름으로 등록 (ProcessPoolExecutor에서 pickle할 때도 이 이름을 씀)
+MODULE_NAME = 'boolean_network_functional_graph'
+
+
+def _load():
+    if MODULE_NAME in sys.modules:
+        return sys.modules[MODULE_NAME]
+    spec = importlib.util.spec_from_file_location(MODULE_NAME, PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_module = _load()
+functional_graph_attractors = _module.functional_graph_attractors
+functional_graph_attractors_chunked = _module.functional_graph_attractors_chunked
+successor_array = _module.successor_array
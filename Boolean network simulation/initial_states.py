@@ -0,0 +1,109 @@
+"""
+초기 상태 생성기
+
+N개 노드의 2^N개 초기 상태를 한꺼번에 배열로 만들지 않고,
+block_size개씩 (shape: block_size x N, dtype uint8) 필요할 때마다 만들어서 넘겨줌
+
+- 2^N <= max_states (시간 예산) 이면 모든 초기 상태를 순서대로 (000..., 000...1, ...)
+- 그보다 크면 서로 다른 초기 상태 max_states개를 무작위 샘플링
+- 한 번에 메모리에 있는 상태는 block_size개 (메모리 예산)
+"""
+
+import numpy as np
+
+# 한 번에 시뮬레이션할 수 있는 초기 상태 수 (기본 시간 예산)
+MAX_STATES = 2**20
+# 한 block의 상태 수 (기본 메모리 예산, 25개 노드면 block 하나에 약 1.6 MB)
+BLOCK_SIZE = 2**16
+
+
+def index_to_states(indices, n):
+    """
+    정수 index를 이진수 상태 배열로 변환 (format(idx, f'0{n}b')와 같은 순서, 첫 노드가 최상위 bit)
+
+    Parameters:
+    -----------
+    indices : numpy.ndarray
+        상태 index (0 ~ 2^n - 1)
+    n : int
+        노드 개수
+
+    Returns:
+    --------
+    numpy.ndarray
+        상태 배열 (shape: len(indices) x n, dtype uint8)
+    """
+    shifts = np.arange(n - 1, -1, -1, dtype=np.uint64)
+    return ((np.asarray(indices, dtype=np.uint64)[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+def states_to_index(states):
+    """
+    index_to_states의 역변환: 상태 배열 (shape: num_states x n, n <= 64)을 정수 index로 변환
+    """
+    states = np.atleast_2d(states)
+    shifts = np.arange(states.shape[1] - 1, -1, -1, dtype=np.uint64)
+    return (states.astype(np.uint64) << shifts).sum(axis=1, dtype=np.uint64)
+
+
+def sample_indices(n, num_states, seed=None):
+    """
+    서로 다른 상태 index num_states개를 무작위로 뽑음 (n <= 64)
+    """
+    rng = np.random.default_rng(seed)
+    total_states = 2**n
+    if num_states > total_states // 2:
+        # 전체 상태 공간의 절반 이상이면 permutation에서 앞부분을 씀
+        return rng.permutation(total_states)[:num_states].astype(np.uint64)
+    high = np.iinfo(np.uint64).max if n == 64 else total_states - 1
+    indices = np.unique(rng.integers(0, high, size=num_states, dtype=np.uint64, endpoint=True))
+    while len(indices) < num_states:
+        more = rng.integers(0, high, size=num_states - len(indices), dtype=np.uint64, endpoint=True)
+        indices = np.union1d(indices, more)
+    # unique가 정렬한 순서를 다시 섞음
+    return rng.permutation(indices)[:num_states]
+
+
+def initial_state_blocks(n, max_states=MAX_STATES, block_size=BLOCK_SIZE, seed=None):
+    """
+    초기 상태를 block 단위로 만들어주는 generator
+
+    Parameters:
+    -----------
+    n : int
+        노드 개수
+    max_states : int
+        초기 상태 수 상한 (2^n이 이보다 크면 샘플링)
+    block_size : int
+        block 하나의 상태 수
+    seed : int, optional
+        샘플링 seed
+
+    Yields:
+    -------
+    numpy.ndarray
+        초기 상태 block (shape: <= block_size x n, dtype uint8)
+    """
+    if n > 64:
+        # index로 표현할 수 없으므로 bit를 직접 샘플링 (중복 가능성은 무시할 만큼 작음)
+        rng = np.random.default_rng(seed)
+        for start in range(0, max_states, block_size):
+            yield rng.integers(0, 2, size=(min(block_size, max_states - start), n), dtype=np.uint8)
+        return
+
+    if 2**n <= max_states:
+        # 모든 초기 상태를 block 단위로 생성
+        for start in range(0, 2**n, block_size):
+            yield index_to_states(np.arange(start, min(start + block_size, 2**n), dtype=np.uint64), n)
+        return
+
+    indices = sample_indices(n, max_states, seed)
+    for start in range(0, max_states, block_size):
+        yield index_to_states(indices[start:start + block_size], n)
+
+
+def num_initial_states(n, max_states=MAX_STATES):
+    """
+    initial_state_blocks가 만드는 전체 초기 상태 수
+    """
+    return min(2**n, max_states)
@@ -0,0 +1,174 @@
+"""
+네트워크 로직 문자열을 한 번만 파싱해서 NumPy bitwise 프로그램으로 컴파일
+
+예: ['x[0] and not x[2]', 'x[0] or x[2]', 'not x[1]']
+-> and는 &, or는 |, not은 ~ 로 바꾸고, x[j]는 모든 state의 j번째 노드 값(bool 배열)이 됨
+   (산술 연산과 비교 (예: 'x[0] + x[1] > 1')는 정수 배열로 계산, 결과는 eval처럼 0이 아니면 1)
+-> 한 번의 호출로 여러 state (shape: num_states x num_nodes)의 다음 state를 한꺼번에 계산
+"""
+
+import ast
+from functools import lru_cache
+
+import numpy as np
+
+
+class _ToBitwise:
+    """
+    Boolean 식의 ast를 NumPy 배열에 대한 식으로 변환
+    x[j]는 bool 배열이고, and / or / not은 bitwise 연산 (& / | / ~)으로 바꿈
+    산술 연산 (+, -, * 등)은 bool 배열끼리 계산하면 eval과 결과가 달라지므로 (True + True가 True)
+    정수 배열로 계산하고, not의 피연산자나 노드의 결과로 쓰일 때 bool (0이 아니면 True)로 바꿈
+    (정수가 섞인 and / or는 eval처럼 피연산자의 값을 돌려줌)
+
+    visit는 (변환된 식, bool 배열인지)를 반환
+    """
+    def visit(self, node):
+        method = getattr(self, 'visit_' + type(node).__name__, None)
+        if method is None:
+            raise ValueError(f"로직에 사용할 수 없는 식입니다: {ast.unparse(node)}")
+        return method(node)
+
+    @staticmethod
+    def to_bool(expr, is_bool):
+        if is_bool:
+            return expr
+        return ast.Compare(left=expr, ops=[ast.NotEq()], comparators=[ast.Constant(value=0)])
+
+    @staticmethod
+    def to_int(expr, is_bool):
+        if not is_bool:
+            return expr
+        if isinstance(expr, ast.Constant):
+            return ast.Constant(value=int(expr.value))
+        return ast.Call(func=ast.Name(id='_int', ctx=ast.Load()), args=[expr], keywords=[])
+
+    def visit_BoolOp(self, node):
+        values = [self.visit(value) for value in node.values]
+        if all(is_bool for _, is_bool in values):
+            op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+            expr = values[0][0]
+            for value, _ in values[1:]:
+                expr = ast.BinOp(left=expr, op=op, right=value)
+            return expr, True
+        # 정수가 섞이면 eval처럼 값을 돌려줌 (a or b는 a가 0이 아니면 a, 아니면 b)
+        expr = self.to_int(*values[-1])
+        for value in reversed(values[:-1]):
+            value = self.to_int(*value)
+            first, second = (value, expr) if isinstance(node.op, ast.Or) else (expr, value)
+            expr = ast.Call(func=ast.Name(id='_where', ctx=ast.Load()),
+                            args=[self.to_bool(value, False), first, second], keywords=[])
+        return expr, False
+
+    def visit_UnaryOp(self, node):
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            operand = self.to_bool(*operand)
+            if isinstance(operand, ast.Constant):
+                return ast.Constant(value=not operand.value), True
+            return ast.UnaryOp(op=ast.Invert(), operand=operand), True
+        # -, +, ~ 는 정수로 계산 (eval에서 ~1은 -2)
+        return ast.UnaryOp(op=node.op, operand=self.to_int(*operand)), False
+
+    def visit_BinOp(self, node):
+        left, right = self.visit(node.left), self.visit(node.right)
+        if isinstance(node.op, (ast.BitAnd, ast.BitOr, ast.BitXor)) and left[1] and right[1]:
+            # 0/1끼리의 &, |, ^ 는 bool 배열로 계산해도 같음
+            return ast.BinOp(left=left[0], op=node.op, right=right[0]), True
+        return ast.BinOp(left=self.to_int(*left), op=node.op, right=self.to_int(*right)), False
+
+    def visit_Compare(self, node):
+        # a < b < c 는 배열에서 쓸 수 없으므로 (a < b) & (b < c)
+        operands = [self.to_int(*self.visit(value)) for value in [node.left] + node.comparators]
+        comparisons = [ast.Compare(left=left, ops=[op], comparators=[right])
+                       for left, op, right in zip(operands, node.ops, operands[1:])]
+        expr = comparisons[0]
+        for comparison in comparisons[1:]:
+            expr = ast.BinOp(left=expr, op=ast.BitAnd(), right=comparison)
+        return expr, True
+
+    def visit_Subscript(self, node):
+        # x[j] (인덱스는 _compile_expr에서 확인)
+        return node, True
+
+    def visit_Constant(self, node):
+        # 상수 0/1은 bool로 바꿔야 ~ 가 올바르게 동작함, 다른 정수는 산술 연산에만 쓰임
+        if isinstance(node.value, (bool, int)) and node.value in (0, 1):
+            return ast.Constant(value=bool(node.value)), True
+        if isinstance(node.value, int):
+            return node, False
+        raise ValueError(f"로직에 사용할 수 없는 상수입니다: {node.value!r}")
+
+    def visit_Name(self, node):
+        # x[j] 밖에서 쓰인 이름
+        raise ValueError(f"로직에는 x[j]만 사용할 수 있습니다: {node.id}")
+
+
+def _int(value):
+    return np.asarray(value, dtype=np.int64)
+
+
+def _where(condition, a, b):
+    return np.where(condition, a, b)
+
+
+def _compile_expr(logic, num_nodes):
+    tree = ast.parse(logic.strip(), mode='eval')
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Subscript):
+            index = node.slice
+            if not (isinstance(node.value, ast.Name) and node.value.id == 'x'
+                    and isinstance(index, ast.Constant) and isinstance(index.value, int)
+                    and 0 <= index.value < num_nodes):
+                raise ValueError(f"노드 인덱스가 올바르지 않습니다: {logic}")
+    return _ToBitwise.to_bool(*_ToBitwise().visit(tree.body))
+
+
+@lru_cache(maxsize=None)
+def _compile(network_logic):
+    num_nodes = len(network_logic)
+    body = ast.Tuple(elts=[_compile_expr(logic, num_nodes) for logic in network_logic], ctx=ast.Load())
+    tree = ast.fix_missing_locations(ast.Expression(body=body))
+    code = compile(tree, '<network_logic>', 'eval')
+
+    def update(states):
+        """
+        다음 state 계산 (synchronous update)
+
+        Parameters:
+        -----------
+        states : numpy.ndarray
+            현재 상태 (shape: num_nodes 또는 num_states x num_nodes)
+
+        Returns:
+        --------
+        numpy.ndarray
+            다음 상태 (입력과 같은 shape, dtype uint8)
+        """
+        states = np.asarray(states)
+        batch = np.atleast_2d(states).astype(bool)
+        values = eval(code, {'__builtins__': {}, '_int': _int, '_where': _where}, {'x': batch.T})
+        next_states = np.empty(batch.shape, dtype=np.uint8)
+        for i, value in enumerate(values):
+            # 상수 로직(예: 'True')은 모든 state에 broadcast
+            next_states[:, i] = value
+        return next_states.reshape(states.shape)
+
+    return update
+
+
+def compile_logic(network_logic):
+    """
+    네트워크 로직을 컴파일 (같은 로직은 한 번만 컴파일됨)
+
+    Parameters:
+    -----------
+    network_logic : list of str
+        각 노드의 상태 전이 로직을 담은 리스트
+
+    Returns:
+    --------
+    function
+        update(states) -> 다음 states
+    """
+    return _compile(tuple(network_logic))
@@ -0,0 +1,217 @@
+"""
+큰 State Transition Graph 시각화
+
+모든 state에 spring_layout과 label을 그리면 2^14개 state만 되어도 몇 분이 걸리고 알아볼 수도 없음
+-> 두 가지 방법으로 그림
+1. basin summary: attractor마다 basin을 하나의 tree로 보고 요약
+   (basin size, attractor 길이, attractor까지의 거리 histogram, in-degree histogram)
+2. sampled graph: state 일부와 그 state들에서 attractor까지 가는 경로만 layout
+
+STG는 배열로 받음 (succ: 각 state의 다음 state index, labels: 각 state의 attractor 번호)
+save_path가 주어지면 파일로 저장만 하고 plt.show()로 멈추지 않음
+"""
+
+import numpy as np
+import networkx as nx
+import matplotlib.pyplot as plt
+
+# 이 개수 이하의 state면 전체 그래프를 그대로 그려도 충분히 빠름
+FULL_PLOT_STATES = 256
+
+
+def arrays_from_stg(stg, attractors):
+    """
+    networkx STG (state마다 다음 state 하나)와 attractor 리스트를 배열로 변환
+
+    Parameters:
+    -----------
+    stg : networkx.DiGraph
+    attractors : list of list
+        attractor마다 state 이름 리스트
+
+    Returns:
+    --------
+    tuple
+        (names, succ, labels)
+        succ: 다음 state index (다음 state를 모르는 state는 자기 자신)
+        labels: attractor 번호 (어느 attractor에도 가지 않으면 -1)
+    """
+    names = list(stg.nodes())
+    index = {name: i for i, name in enumerate(names)}
+    succ = np.arange(len(names))
+    for u, v in stg.edges():
+        succ[index[u]] = index[v]
+    labels = np.full(len(names), -1, dtype=np.int64)
+    for label, attractor in enumerate(attractors):
+        basin = nx.ancestors(stg, attractor[0]) | set(attractor)
+        labels[[index[name] for name in basin]] = label
+    return names, succ, labels
+
+
+def distance_to_attractor(succ, labels, attractor_states):
+    """
+    각 state에서 attractor까지의 update 횟수 (attractor state와 어느 attractor에도 가지 않는 state는 0)
+    attractor state에서 거꾸로 (predecessor 방향으로) 한 번의 BFS, state마다 다음 state가 하나이므로
+    한 단계의 predecessor는 서로 겹치지 않음
+    """
+    succ = np.asarray(succ)
+    labels = np.asarray(labels)
+    done = labels < 0
+    for states in attractor_states:
+        done[states] = True
+    # predecessor 목록 (CSR): order[start[x]:start[x + 1]]이 x로 가는 state들
+    indegree = np.bincount(succ, minlength=len(succ))
+    order = np.argsort(succ, kind='stable')
+    start = np.concatenate(([0], np.cumsum(indegree)))
+    depth = np.zeros(len(succ), dtype=np.int64)
+    frontier = np.flatnonzero(done)
+    level = 0
+    while frontier.size:
+        level += 1
+        counts = indegree[frontier]
+        first = np.repeat(start[frontier] - (np.cumsum(counts) - counts), counts)
+        predecessors = order[first + np.arange(counts.sum())]
+        frontier = predecessors[~done[predecessors]]
+        done[frontier] = True
+        depth[frontier] = level
+    return depth
+
+
+def basin_summary(succ, labels, attractor_states):
+    """
+    attractor마다 basin 요약
+
+    Parameters:
+    -----------
+    succ : numpy.ndarray
+        각 state의 다음 state index
+    labels : numpy.ndarray
+        각 state의 attractor 번호
+    attractor_states : list of numpy.ndarray
+        attractor마다 state index 배열
+
+    Returns:
+    --------
+    list of dict
+        'basin_size', 'length', 'depth_hist' (거리별 state 수), 'indegree_hist' (in-degree별 state 수)
+    """
+    succ = np.asarray(succ)
+    labels = np.asarray(labels)
+    indegree = np.bincount(succ, minlength=len(succ))
+    depth = distance_to_attractor(succ, labels, attractor_states)
+    # state를 attractor 번호 순으로 한 번 정렬해서 basin마다 연속된 구간으로 나눔
+    basin_sizes = np.bincount(labels[labels >= 0], minlength=len(attractor_states))
+    order = np.argsort(labels, kind='stable')[np.count_nonzero(labels < 0):]
+    bounds = np.concatenate(([0], np.cumsum(basin_sizes)))
+    summary = []
+    for label, states in enumerate(attractor_states):
+        basin = order[bounds[label]:bounds[label + 1]]
+        summary.append({
+            'basin_size': int(basin_sizes[label]),
+            'length': len(states),
+            'depth_hist': np.bincount(depth[basin]),
+            'indegree_hist': np.bincount(indegree[basin]),
+        })
+    return summary
+
+
+def finish_figure(fig, save_path, show):
+    # 파일로 저장하면 show 없이 바로 닫음
+    if save_path:
+        fig.savefig(save_path, dpi=150, bbox_inches='tight')
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+
+
+def plot_basin_summary(summary, names=None, max_attractors=12, save_path=None, show=None):
+    """
+    basin summary 그림: basin이 큰 순서로 attractor마다 한 줄
+    (왼쪽: attractor까지의 거리별 state 수, 오른쪽: in-degree별 state 수)
+
+    Parameters:
+    -----------
+    summary : output of basin_summary
+    names : list of str, optional
+        attractor 이름 (그림 제목)
+    max_attractors : int
+    save_path : str, optional
+    show : bool, optional
+        None이면 save_path가 없을 때만 plt.show()
+    """
+    show = save_path is None if show is None else show
+    order = sorted(range(len(summary)), key=lambda i: -summary[i]['basin_size'])[:max_attractors]
+    total = sum(x['basin_size'] for x in summary)
+    fig, axes = plt.subplots(len(order), 2, figsize=(10, 2.2 * len(order)), squeeze=False)
+    for row, i in zip(axes, order):
+        x = summary[i]
+        name = names[i] if names is not None else f'attractor {i + 1}'
+        title = f"{name} (length {x['length']}, basin {x['basin_size']}, {100 * x['basin_size'] / total:.1f}%)"
+        row[0].bar(np.arange(len(x['depth_hist'])), x['depth_hist'], color='tab:blue')
+        row[0].set_title(title, fontsize=9)
+        row[0].set_xlabel('distance to attractor')
+        # in-degree는 꼬리가 길어서 (최대 수천) 0이 아닌 값만 점으로 그림
+        indegree = np.flatnonzero(x['indegree_hist'])
+        row[1].plot(indegree, x['indegree_hist'][indegree], 'o', ms=3, color='tab:orange')
+        row[1].set_xscale('symlog')
+        row[1].set_yscale('log')
+        row[1].set_xlabel('in-degree')
+    fig.tight_layout()
+    finish_figure(fig, save_path, show)
+
+
+def sample_stg(succ, attractor_states, max_nodes=500, seed=None):
+    """
+    state를 무작위로 골라서, 각 state에서 attractor (또는 이미 고른 state)까지 가는 경로를 포함한 부분 그래프
+    attractor state는 모두 포함
+
+    Returns:
+    --------
+    numpy.ndarray
+        고른 state index
+    """
+    rng = np.random.default_rng(seed)
+    chosen = set(int(x) for states in attractor_states for x in states)
+    # 전체 state 수와 관계없이 시작 state는 최대 max_nodes개만 뽑음
+    for start in rng.integers(0, len(succ), size=max_nodes):
+        if len(chosen) >= max_nodes:
+            break
+        state = int(start)
+        while state not in chosen:
+            chosen.add(state)
+            state = int(succ[state])
+    return np.array(sorted(chosen))
+
+
+def plot_sampled_stg(succ, labels, attractor_states, names=None, max_nodes=500, seed=42,
+                     save_path=None, show=None):
+    """
+    sample_stg로 고른 부분 그래프만 layout해서 그림 (basin마다 색, attractor는 빨간 테두리)
+    label은 state가 FULL_PLOT_STATES개 이하이고 names가 있을 때만 그림
+    """
+    show = save_path is None if show is None else show
+    nodes = sample_stg(succ, attractor_states, max_nodes, seed)
+    node_set = set(nodes.tolist())
+    graph = nx.DiGraph()
+    graph.add_nodes_from(node_set)
+    graph.add_edges_from((int(x), int(succ[x])) for x in nodes if int(succ[x]) in node_set)
+
+    fig = plt.figure(figsize=(12, 12))
+    pos = nx.spring_layout(graph, seed=seed, iterations=50)
+    colors = [labels[x] for x in graph.nodes()]
+    nx.draw_networkx_nodes(graph, pos, node_color=colors, cmap='tab20', node_size=15)
+    attractor_nodes = [int(x) for states in attractor_states for x in states]
+    nx.draw_networkx_nodes(graph, pos, nodelist=attractor_nodes, node_color='none',
+                           edgecolors='red', node_size=40)
+    # 화살표 (FancyArrowPatch)는 edge마다 따로 그려져 느리므로 작은 그래프에서만 사용
+    small = len(nodes) <= FULL_PLOT_STATES
+    nx.draw_networkx_edges(graph, pos, arrows=small, width=0.5, **({'arrowsize': 5} if small else {}))
+    if names is not None and len(succ) <= FULL_PLOT_STATES:
+        nx.draw_networkx_labels(graph, pos, labels={x: names[x] for x in graph.nodes()}, font_size=8)
+    title = "State Transition Graph"
+    if len(nodes) < len(succ):
+        title += f" ({len(nodes)} / {len(succ)} states)"
+    plt.title(title)
+    plt.axis('off')
+    finish_figure(fig, save_path, show)
@@ -0,0 +1,5 @@
+# tests import the simulator modules next to this folder (as the scripts do)
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -0,0 +1,68 @@
+import numpy as np
+
+import V2_digital_gate_logic as v2
+from V2_digital_gate_logic import BooleanNetworkSimulation, network_logic_1, network_logic_2, run_networks
+
+
+def random_logic(num_nodes, seed):
+    rng = np.random.default_rng(seed)
+    logic = []
+    for i in range(num_nodes):
+        a, b, c = rng.choice(num_nodes, 3, replace=False)
+        logic.append(f'(x[{a}] and not x[{b}]) or x[{c}]' if i % 2 else f'not (x[{a}] and x[{b}])')
+    return logic
+
+
+def eval_successor(network_logic, index, num_nodes):
+    # the old per-state path : eval every node's logic on the state
+    x = [int(bit) for bit in format(index, f'0{num_nodes}b')]
+    return int(''.join(str(int(bool(eval(logic, {}, {'x': x})))) for logic in network_logic), 2)
+
+
+def test_exhaustive_successors_match_eval():
+    network_logic = random_logic(8, 0)
+    sim = BooleanNetworkSimulation(network_logic, 8)
+    sim.run_simulation()
+    assert np.array_equal(sim.states, np.arange(2**8))
+    assert sim.successors.tolist() == [eval_successor(network_logic, i, 8) for i in range(2**8)]
+    assert sim.basin_sizes.sum() == 2**8
+    for attractor in sim.attractors:
+        cycle = attractor.tolist()
+        assert [eval_successor(network_logic, x, 8) for x in cycle] == cycle[1:] + cycle[:1]
+
+
+def test_sampled_graph_is_closed():
+    network_logic = random_logic(14, 1)
+    sim = BooleanNetworkSimulation(network_logic, 14, max_states=500, seed=0)
+    sim.run_simulation()
+    assert len(np.unique(sim.states)) == len(sim.states) >= 500
+    # every successor is a visited state, and matches eval
+    assert np.array_equal(sim.states[sim.successors],
+                          [eval_successor(network_logic, int(x), 14) for x in sim.states])
+
+
+def test_sampled_set_matches_bitmap(monkeypatch):
+    network_logic = random_logic(14, 2)
+    bitmap = BooleanNetworkSimulation(network_logic, 14, max_states=300, seed=3)
+    bitmap.run_simulation()
+    monkeypatch.setattr(v2, 'BITMAP_NODES', 0)
+    seen = BooleanNetworkSimulation(network_logic, 14, max_states=300, seed=3)
+    seen.run_simulation()
+    assert np.array_equal(bitmap.states, seen.states)
+    assert np.array_equal(bitmap.successors, seen.successors)
+
+
+def test_instances_do_not_share_results():
+    first = BooleanNetworkSimulation(network_logic_1, 3)
+    second = BooleanNetworkSimulation(network_logic_2, 5)
+    result_1 = first.run_simulation()
+    second.run_simulation()
+    assert first.run_simulation() == result_1
+    assert sum(result_1[1]) == 2**3
+
+
+def test_run_networks_matches_single_runs():
+    networks = [network_logic_1, network_logic_2, random_logic(10, 4)]
+    expected = [BooleanNetworkSimulation(logic, len(logic)).run_simulation() for logic in networks]
+    assert run_networks(networks, use_threads=True, max_workers=2) == expected
+    assert run_networks(networks, max_workers=2) == expected
@@ -0,0 +1,62 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from logic_compiler import compile_logic
+
+
+def random_expr(rng, num_nodes, depth):
+    # random rule mixing logical, bitwise, arithmetic and comparison operators
+    if depth == 0 or rng.random() < 0.2:
+        return f'x[{rng.integers(num_nodes)}]' if rng.random() < 0.9 else str(rng.integers(2))
+    a, b = random_expr(rng, num_nodes, depth - 1), random_expr(rng, num_nodes, depth - 1)
+    kind = rng.integers(8)
+    if kind == 0:
+        return f'({a} and {b})'
+    if kind == 1:
+        return f'({a} or {b})'
+    if kind == 2:
+        return f'(not {a})'
+    if kind == 3:
+        return f'({a} ^ {b})'
+    if kind == 4:
+        return f'({a} + {b} > {rng.integers(2)})'
+    if kind == 5:
+        return f'({a} - {b})'
+    if kind == 6:
+        return f'(0 < {a} + {b} * 2 <= 2)'
+    return f'({a} == {b})'
+
+
+def eval_update(network_logic, state):
+    # the old path : eval each node's logic on one state (x[j] replaced by the Python int 0 / 1)
+    x = [int(bit) for bit in state]
+    return [int(bool(eval(logic, {}, {'x': x}))) for logic in network_logic]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_compiled_matches_eval(seed):
+    rng = np.random.default_rng(seed)
+    num_nodes = 6
+    network_logic = [random_expr(rng, num_nodes, 3) for _ in range(num_nodes)]
+    states = np.array(list(itertools.product([0, 1], repeat=num_nodes)), dtype=np.uint8)
+    expected = [eval_update(network_logic, state) for state in states]
+    update = compile_logic(network_logic)
+    assert update(states).tolist() == expected
+    # a single state (1-D) gives the same result
+    assert update(states[5]).tolist() == expected[5]
+
+
+def test_arithmetic_is_not_boolean():
+    # True + True would be True on bool arrays
+    update = compile_logic(['x[0] + x[1] > 1', 'x[0] + x[1] == 2', '1 < x[0] + x[1] + x[2]'])
+    assert update(np.array([[1, 1, 0], [1, 0, 0]])).tolist() == [[1, 1, 1], [0, 0, 0]]
+    # and / or with integers give the operand's value, as in Python : (0 - 1 or 1) - 1 is -2
+    assert compile_logic(['(x[0] - x[1] or x[1]) - 1', 'x[0] and x[0] + x[1]'])([[0, 1], [1, 0]]).tolist() == [[1, 0], [0, 1]]
+
+
+@pytest.mark.parametrize('logic', ['abs(x[0])', 'x[0] if x[1] else x[2]', 'x[0] > 0.5', 'y[0]', 'x[5]'])
+def test_unsupported_logic_raises(logic):
+    with pytest.raises(ValueError):
+        compile_logic([logic, 'x[0]', 'x[1]'])
@@ -0,0 +1,74 @@
+import networkx as nx
+import numpy as np
+
+import stg_plot
+
+
+def old_distance_to_attractor(succ, labels, attractor_states):
+    # previous implementation : relax every state until no depth changes
+    on_attractor = np.zeros(len(succ), dtype=bool)
+    for states in attractor_states:
+        on_attractor[states] = True
+    depth = np.zeros(len(succ), dtype=np.int64)
+    while True:
+        new_depth = np.where(on_attractor | (labels < 0), 0, depth[succ] + 1)
+        if (new_depth == depth).all():
+            return depth
+        depth = new_depth
+
+
+def old_basin_summary(succ, labels, attractor_states):
+    # previous implementation : one mask per attractor
+    indegree = np.bincount(succ, minlength=len(succ))
+    depth = old_distance_to_attractor(succ, labels, attractor_states)
+    summary = []
+    for label, states in enumerate(attractor_states):
+        basin = labels == label
+        summary.append({
+            'basin_size': int(basin.sum()),
+            'length': len(states),
+            'depth_hist': np.bincount(depth[basin]),
+            'indegree_hist': np.bincount(indegree[basin]),
+        })
+    return summary
+
+
+def random_stg(num_states, seed):
+    rng = np.random.default_rng(seed)
+    stg = nx.DiGraph()
+    stg.add_edges_from((i, int(j)) for i, j in enumerate(rng.integers(0, num_states, num_states)))
+    return stg
+
+
+def test_basin_summary_matches_old():
+    for seed in range(10):
+        stg = random_stg(2000, seed)
+        attractors = list(nx.simple_cycles(stg))
+        # dropping attractors leaves their basins unlabelled (-1)
+        for kept in (attractors, attractors[::2]):
+            names, succ, labels = stg_plot.arrays_from_stg(stg, kept)
+            index = {name: i for i, name in enumerate(names)}
+            attractor_states = [np.array([index[x] for x in att]) for att in kept]
+
+            assert np.array_equal(stg_plot.distance_to_attractor(succ, labels, attractor_states),
+                                  old_distance_to_attractor(succ, labels, attractor_states))
+            new = stg_plot.basin_summary(succ, labels, attractor_states)
+            old = old_basin_summary(succ, labels, attractor_states)
+            assert len(new) == len(old)
+            for x, y in zip(new, old):
+                assert x['basin_size'] == y['basin_size'] and x['length'] == y['length']
+                assert np.array_equal(x['depth_hist'], y['depth_hist'])
+                assert np.array_equal(x['indegree_hist'], y['indegree_hist'])
+
+
+def test_sample_stg_contains_paths_to_attractors():
+    stg = random_stg(5000, 0)
+    attractors = list(nx.simple_cycles(stg))
+    names, succ, labels = stg_plot.arrays_from_stg(stg, attractors)
+    index = {name: i for i, name in enumerate(names)}
+    attractor_states = [np.array([index[x] for x in att]) for att in attractors]
+    nodes = stg_plot.sample_stg(succ, attractor_states, max_nodes=300, seed=0)
+    chosen = set(nodes.tolist())
+    assert all(int(x) in chosen for states in attractor_states for x in states)
+    # every sampled state's successor is sampled too (closed under the walk to an attractor)
+    assert all(int(succ[x]) in chosen for x in nodes)
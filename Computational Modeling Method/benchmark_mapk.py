@@ -0,0 +1,92 @@
+"""
+MAPK_model 적분 속도 비교 (적분 한 번의 시간, RHS 호출 수 nfe, Jacobian 호출 수 nje)
+
+1. MAPK_model (Jacobian은 odeint가 finite difference로 계산)
+2. MAPK_model + analytic Jacobian (MAPK_jacobian)
+3. numba로 컴파일한 MAPK_model (+ Jacobian), numba가 설치되어 있을 때만
+   (점 하나씩 적분하는 continuation_sweep / mainlab_detect.detect에서만 쓰임, sweep은 odeint_batch)
+4. odeint_batch (Ki 값 여러 개를 한 번에), banded Jacobian을 finite difference / analytic으로
+   201개 전체를 한 번에, 그리고 sweep처럼 batch_size개씩 나눠서
+
+진동하는 Ki=1.5와 steady state로 가는 Ki에서 각각 측정
+LSODA는 stiff하다고 판단할 때 (BDF)만 Jacobian을 쓰므로 nje가 0이면 analytic Jacobian은 쓰이지 않음
+
+usage : python benchmark_mapk.py [repeat]
+"""
+
+import sys
+import time
+
+import numpy as np
+from scipy.integrate import odeint
+
+import mainlab_func as ref
+
+y0 = [0, 0, 0, 0, 0]
+t = np.linspace(0, 12000, 8000)
+REGIMES = {'oscillatory (Ki=1.5)': 1.5, 'steady (Ki=256)': 256}
+
+
+def time_odeint(compiled, jacobian, Ki, repeat):
+    func, Dfun = ref.model_functions(compiled, jacobian)
+    point_params = np.array(ref.params, dtype=float) if compiled else list(ref.params)
+    point_params[ref.PARAM_NAMES.index('Ki')] = Ki
+    # 첫 호출은 (numba 컴파일 시간이 들어갈 수 있으므로) 측정에서 제외
+    sol, info = odeint(func, y0, t, args=(point_params,), Dfun=Dfun, full_output=True)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        odeint(func, y0, t, args=(point_params,), Dfun=Dfun)
+        times.append(time.perf_counter() - start)
+    return min(times), info['nfe'][-1], info['nje'][-1], sol
+
+
+def time_batch(jacobian, Kis, repeat, batch_size=None):
+    # batch_size개씩 나눠서 odeint_batch (None이면 한 번에), sweep(max_workers=1)과 같은 적분
+    params_batch = np.tile(np.asarray(ref.params, dtype=float), (len(Kis), 1))
+    params_batch[:, ref.PARAM_NAMES.index('Ki')] = Kis
+    batch_size = batch_size or len(Kis)
+    chunks = [params_batch[i:i + batch_size] for i in range(0, len(Kis), batch_size)]
+    # 첫 호출은 측정에서 제외 (warm-up), 이때 chunk마다 nfe / nje를 기록
+    outputs = [ref.odeint_batch(y0, t, chunk, jacobian=jacobian, full_output=True) for chunk in chunks]
+    sol = np.concatenate([out[0] for out in outputs], axis=1)
+    nfe = [int(out[1]['nfe'][-1]) for out in outputs]
+    nje = [int(out[1]['nje'][-1]) for out in outputs]
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for chunk in chunks:
+            ref.odeint_batch(y0, t, chunk, jacobian=jacobian)
+        times.append(time.perf_counter() - start)
+    return min(times), nfe, nje, sol
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    variants = [('MAPK_model', False, False), ('MAPK_model + Jacobian', False, True)]
+    if ref.njit is not None:
+        variants += [('compiled', True, False), ('compiled + Jacobian', True, True)]
+    else:
+        print('numba가 없어서 compiled 버전은 건너뜀')
+
+    for regime, Ki in REGIMES.items():
+        print(regime)
+        base = ref_sol = None
+        for name, compiled, jacobian in variants:
+            elapsed, nfe, nje, sol = time_odeint(compiled, jacobian, Ki, repeat)
+            if base is None:
+                base, ref_sol = elapsed, sol
+            print(f'  {name:22s}: {1000 * elapsed:8.1f} ms (x{base / elapsed:.2f}), nfe {nfe:6d}, nje {nje:4d}, '
+                  f'max |diff| {np.abs(sol - ref_sol).max():.1e}')
+
+    Kis = 2 ** np.arange(-10, 10.1, 0.1)
+    for batch_size in (None, 50):
+        print(f'odeint_batch, {len(Kis)} Ki values' + (f' in chunks of {batch_size} (sweep)' if batch_size else ''))
+        base = ref_sol = None
+        for name, jacobian in [('finite difference', False), ('analytic Jacobian', True)]:
+            elapsed, nfe, nje, sol = time_batch(jacobian, Kis, repeat, batch_size)
+            if base is None:
+                base, ref_sol = elapsed, sol
+            print(f'  {name:22s}: {1000 * elapsed:8.1f} ms (x{base / elapsed:.2f}), nfe {nfe}, nje {nje}, '
+                  f'max |diff| {np.abs(sol - ref_sol).max():.1e}')
@@ -1,13 +1,16 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
 import mainlab_func as ref
+from mainlab_cache import TrajectoryCache
 
 # 초기조건: 모두 0 (인산화된 형태 없음)
 y0 = [0, 0, 0, 0, 0]
 t = np.linspace(0, 5000, 5000)
 
-sol = odeint(ref.MAPK_model, y0, t, args=(ref.params,))
+# 적분 결과 디스크 캐시 (같은 파라미터 / 초기조건 / 시간이면 다시 적분하지 않음, mainlab_cache)
+cache = TrajectoryCache()
+
+sol = ref.cached_odeint(y0, t, ref.params, cache)
 # sol은 2차원 배열임. 행: 시간 (t), 열: 각 변수 (MKKK_P 같은 것들)
 # print(sol)
 print(sol[-1, 0])
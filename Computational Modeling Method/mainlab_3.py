@@ -1,7 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
 import mainlab_func as ref
+from mainlab_cache import TrajectoryCache
 
 # 초기조건 (모두 0)
 y0 = [0, 0, 0, 0, 0]
@@ -9,6 +9,9 @@ y0 = [0, 0, 0, 0, 0]
 # 시간 (0~5000 ms)
 t = np.linspace(0, 5000, 5000)
 
+# 적분 결과 디스크 캐시 (같은 파라미터 / 초기조건 / 시간이면 다시 적분하지 않음, mainlab_cache)
+cache = TrajectoryCache()
+
 # V1 값 범위 (0부터 3까지 0.1 간격)
 V1_values = np.arange(0, 3.1, 0.1)
 
@@ -20,7 +23,7 @@ MAPK_PP_max = []
 for V1 in V1_values:
     change_v1_params = ref.params.copy()
     change_v1_params[0] = V1
-    sol = odeint(ref.MAPK_model, y0, t, args=(change_v1_params,))
+    sol = ref.cached_odeint(y0, t, change_v1_params, cache)
     # steady-state는 1500ms 이후라고 가정, 내 임의..
     MKKK_P_max.append(np.max(sol[1500:, 0]))
     MKK_PP_max.append(np.max(sol[1500:, 2]))
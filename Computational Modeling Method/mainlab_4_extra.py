@@ -1,7 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
 import mainlab_func as ref
+from mainlab_cache import TrajectoryCache
+import mainlab_detect as det
 
 y0 = [0, 0, 0, 0, 0]
 
@@ -16,54 +17,43 @@ t = np.linspace(0, 12000, 8000)
 log2_Ki_values = np.arange(-10, 10.1, 0.1)
 Ki_values = 2 ** log2_Ki_values
 
-MAPK_PP_max_Ki = []
-MAPK_PP_min_Ki = []
+# 적분 결과 디스크 캐시 (같은 파라미터 / 초기조건 / 시간이면 다시 적분하지 않음, mainlab_cache)
+cache = TrajectoryCache()
 
-for Ki in Ki_values:
-    params = ref.params.copy()
-    params[2] = Ki
-    sol = odeint(ref.MAPK_model, y0, t, args=(params,))
-    # MAPK_PP_steady = sol[steady_state_idx:, 4]
+if __name__ == '__main__':
+    # Ki 201개 값을 한 번에 적분 (mainlab_func.sweep_parameter)
     # steady-state는 1500ms 이후라고 가정, 내 임의..
-    MAPK_PP_max_Ki.append(np.max(sol[1500:, 4]))
-    MAPK_PP_min_Ki.append(np.min(sol[1500:, 4]))
-    # MAPK_PP_max_Ki.append(np.max(MAPK_PP_steady))
-    # MAPK_PP_min_Ki.append(np.min(MAPK_PP_steady))
-
-
-
-# 진동 발생 범위 찾기 (Ki 기준)
-MAPK_PP_max_Ki = np.array(MAPK_PP_max_Ki)
-MAPK_PP_min_Ki = np.array(MAPK_PP_min_Ki)
-diff_Ki = MAPK_PP_max_Ki - MAPK_PP_min_Ki
-# oscillation_indices = np.where(diff_Ki > 1e-2)[0]
-# np.where(condition)함수 -> condition이 true인 요소들의 인덱스를 찾아 튜플 형태로 반환
-# ex. diff_Ki가 [0.005, 0.02, 0.008, 0.03] 이라면,
-# diff_Ki > 1e-2는 [False, True, False, True]
-# np.where([False, True, False, True])의 결과는 (array([1, 3]),) 이 됨!
-
-oscillation_indices = np.where(diff_Ki > 1)[0] # 이 '진동'의 기준값이 뭔지 모르겠음! 일단 나는 1로 했어. GPT는 1/100이래..
-oscillation_range_Ki = (Ki_values[oscillation_indices[0]], Ki_values[oscillation_indices[-1]])
-print(f"Oscillation range of Ki: {oscillation_range_Ki}")
-
-
-
-# Ki_oscillation = oscillation_range_Ki[0] * 1.2  # 진동 구간 내 임의 값
-Ki_oscillation = 1.5 # 내가 oscillation range 출력해보고 임의로 숫자 하나 고른거임
-params_osc = ref.params.copy()
-params_osc[2] = Ki_oscillation
-
-t_long = np.linspace(0, 12000, 8000)
-sol_osc = odeint(ref.MAPK_model, y0, t_long, args=(params_osc,))
-MAPK_PP_osc = sol_osc[:, 4]
-
-
-# Figure 8 재현해보기
-plt.figure(figsize=(10, 9))
-plt.plot(t_long / 60, MAPK_PP_osc, label=f'Ki={Ki_oscillation:.2f}')
-plt.xlabel('Time (min)')
-plt.ylabel('MAPK-PP Concentration (nM)')
-plt.title('Figure 8')
-plt.legend()
-plt.grid(True)
-plt.show()
+    # 점마다 peak로 잰 진폭과 주기로 steady / damped / sustained oscillation 판정 (mainlab_detect.classify)
+    Ki_sweep, Ki_status = ref.sweep_parameter('Ki', Ki_values, y0=y0, t=t, transient=1500, cache=cache,
+                                              return_status=True)
+
+    # 진동 발생 범위 찾기 (Ki 기준)
+    # np.where(condition)함수 -> condition이 true인 요소들의 인덱스를 찾아 튜플 형태로 반환
+    # ex. Ki_status가 ['steady', 'sustained', 'damped', 'sustained'] 이라면,
+    # Ki_status == 'sustained'는 [False, True, False, True]
+    # np.where([False, True, False, True])의 결과는 (array([1, 3]),) 이 됨!
+    # (det.oscillation_range가 이렇게 처음과 마지막 index를 찾음)
+    oscillation_range_Ki = det.oscillation_range(Ki_values, Ki_status)
+    print(f"Oscillation range of Ki: {oscillation_range_Ki}")
+
+
+
+    # Ki_oscillation = oscillation_range_Ki[0] * 1.2  # 진동 구간 내 임의 값
+    Ki_oscillation = 1.5 # 내가 oscillation range 출력해보고 임의로 숫자 하나 고른거임
+    params_osc = ref.params.copy()
+    params_osc[2] = Ki_oscillation
+
+    t_long = np.linspace(0, 12000, 8000)
+    sol_osc = ref.cached_odeint(y0, t_long, params_osc, cache)
+    MAPK_PP_osc = sol_osc[:, 4]
+
+
+    # Figure 8 재현해보기
+    plt.figure(figsize=(10, 9))
+    plt.plot(t_long / 60, MAPK_PP_osc, label=f'Ki={Ki_oscillation:.2f}')
+    plt.xlabel('Time (min)')
+    plt.ylabel('MAPK-PP Concentration (nM)')
+    plt.title('Figure 8')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
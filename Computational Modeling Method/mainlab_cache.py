@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import hashlib
+
+import numpy as np
+
+# ODE 궤적 (적분 결과) 디스크 캐시
+# 궤적 하나 (파라미터 세트 하나)가 파일 하나 (.npz)이고, key는 아래 값들의 hash
+#   모델 (함수 소스 코드), 파라미터 배열, 초기조건, 시간 격자, solver 설정 (rtol, atol, 적분 방법, ...)
+#   (묶어서 적분한 궤적과 점 하나만 적분한 궤적은 허용오차 안에서만 같으므로 적분 방법도 key에 넣음, mainlab_func._key_options)
+# 격자 점마다 따로 저장하므로 Ki 격자를 넓히거나 촘촘하게 바꿔도 이미 적분한 점은 다시 계산하지 않음
+# (2 ** np.arange(-10, 10.1, 0.1)과 2 ** np.arange(-10, 12, 0.05)처럼 계산 방법에 따라 마지막 bit만 다른 값도
+#  같은 점으로 보도록 key는 mantissa를 KEY_BITS bit (유효숫자 약 10자리)로 반올림한 값으로 만듦)
+# manifest.json에 파일마다 크기와 마지막 사용 시간을 기록하고, max_bytes / max_entries를 넘으면
+# 가장 오래 안 쓴 (LRU) 궤적부터 지움
+
+# 기본 캐시 위치 (이 파일 옆의 ode_cache 폴더, 어느 폴더에서 스크립트를 실행해도 같은 캐시를 씀)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ode_cache')
+KEY_BITS = 34
+
+
+def _remove(path):
+    # 다른 process가 이미 지웠을 수 있음
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _rounded(array):
+    # mantissa를 KEY_BITS bit로 반올림 (상대오차 약 1e-10 이하의 차이는 무시)
+    mantissa, exponent = np.frexp(np.asarray(array, dtype=float))
+    return np.ldexp(np.round(mantissa * 2.0**KEY_BITS) / 2.0**KEY_BITS, exponent)
+
+
+def trajectory_key(identity, point_params, y0, t, options=None):
+    """
+    궤적 하나의 key (sha256 hex)
+
+    identity : 모델을 구분하는 문자열 (mainlab_func.model_identity, 모델 식이 바뀌면 key도 바뀜)
+    point_params : 파라미터 배열
+    y0 : 초기조건
+    t : 시간 격자
+    options : solver 설정 dict (rtol, atol, 적분 방법, Jacobian 사용 여부, ...), 결과를 바꾸는 설정은 모두 넣어야 함
+    """
+    digest = hashlib.sha256()
+    digest.update(identity.encode())
+    for array in (point_params, y0, t):
+        array = np.ascontiguousarray(_rounded(array))
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps(options or {}, sort_keys=True, default=float).encode())
+    return digest.hexdigest()
+
+
+class TrajectoryCache:
+    """
+    cache_dir 안의 궤적 캐시 (key마다 <key>.npz 하나, manifest.json에 크기와 마지막 사용 시간)
+
+    cache_dir : 캐시 폴더 (기본값 CACHE_DIR)
+    max_bytes : 전체 크기 상한 (기본값 1 GiB, None이면 무제한)
+    max_entries : 궤적 수 상한 (None이면 무제한)
+    compress : True이면 np.savez_compressed (궤적에 따라 6~25% 작아지지만 8000 x 5 궤적 하나에 약 18 ms로
+               적분보다 오래 걸림), False이면 np.savez (약 0.3 ms)
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=2**30, max_entries=None, compress=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.compress = compress
+        os.makedirs(cache_dir, exist_ok=True)
+        self.manifest_path = os.path.join(cache_dir, 'manifest.json')
+        self.manifest = self._load_manifest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def _load_manifest(self):
+        # {key: {'bytes': 파일 크기, 'last_used': 마지막 사용 시간}}
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+        # manifest에 없는 파일 (다른 process가 동시에 쓴 경우 등)은 파일 수정 시간으로 추가, 없는 파일은 제거
+        # (<key>.<pid>.tmp.npz는 쓰다 만 파일)
+        # 읽기만 할 때는 manifest 대신 파일 수정 시간을 갱신하므로 (get_many) 둘 중 나중 시간을 씀
+        files = {name[:-4] for name in os.listdir(self.cache_dir) if name.endswith('.npz') and '.' not in name[:-4]}
+        for key in files:
+            try:
+                stat = os.stat(self._path(key))
+            except FileNotFoundError:
+                continue
+            last_used = max(manifest[key]['last_used'], stat.st_mtime) if key in manifest else stat.st_mtime
+            manifest[key] = {'bytes': stat.st_size, 'last_used': last_used}
+        return {key: entry for key, entry in manifest.items() if key in files}
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def get_many(self, keys):
+        """
+        keys 순서대로 궤적 (없으면 None) 리스트, 찾은 궤적은 마지막 사용 시간을 갱신
+        (manifest.json 전체를 다시 쓰면 궤적 수에 비례해서 느려지므로 파일 수정 시간만 바꾸고,
+         manifest.json에는 다음 put / evict 때 반영)
+        """
+        now = time.time()
+        sols = []
+        for key in keys:
+            sol = None
+            if key in self.manifest:
+                path = self._path(key)
+                try:
+                    with np.load(path) as data:
+                        sol = data['sol']
+                    os.utime(path, (now, now))
+                    self.manifest[key]['last_used'] = now
+                except (FileNotFoundError, OSError, ValueError, KeyError):
+                    # 지워졌거나 쓰다 만 파일
+                    sol = None
+                    self.manifest.pop(key, None)
+            sols.append(sol)
+        return sols
+
+    def get(self, key):
+        return self.get_many([key])[0]
+
+    def put_many(self, items):
+        """
+        {key: 궤적 배열}을 저장하고, 상한을 넘으면 오래 안 쓴 궤적부터 지움
+        """
+        now = time.time()
+        for key, sol in items.items():
+            path = self._path(key)
+            tmp_path = path + f'.{os.getpid()}.tmp.npz'
+            (np.savez_compressed if self.compress else np.savez)(tmp_path, sol=sol)
+            os.replace(tmp_path, path)
+            self.manifest[key] = {'bytes': os.path.getsize(path), 'last_used': now}
+        self.evict()
+
+    def put(self, key, sol):
+        self.put_many({key: sol})
+
+    def entries(self):
+        # [(key, 크기, 마지막 사용 시간)], 오래 안 쓴 순서
+        return sorted(((key, entry['bytes'], entry['last_used']) for key, entry in self.manifest.items()),
+                      key=lambda x: x[2])
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        remaining = len(entries)
+        for key, size, _ in entries:
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            over_entries = self.max_entries is not None and remaining > self.max_entries
+            if not (over_bytes or over_entries):
+                break
+            _remove(self._path(key))
+            del self.manifest[key]
+            total -= size
+            remaining -= 1
+        self._save_manifest()
+
+    def clear(self):
+        for key in list(self.manifest):
+            _remove(self._path(key))
+        self.manifest = {}
+        self._save_manifest()
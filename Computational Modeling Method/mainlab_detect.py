@@ -0,0 +1,221 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+import mainlab_func as ref
+
+# MAPK_model 적분 결과가 steady / damped / sustained oscillation 중 무엇인지 판정
+# 고정된 구간 (sol[1500:])의 max - min을 임의의 임계값 (1e-2 또는 1)과 비교하는 대신,
+# 적분하는 동안 solve_ivp event로 peak (극대)와 trough (극소)를 찾아서 cycle마다 진폭과 주기를 재고
+# k cycle 연속으로 진폭이 일정하면 (sustained) 또는 줄어들면 (damped) 바로 적분을 멈춤
+# 이미 적분한 궤적 (mainlab_func.sweep 등)은 classify로 같은 기준 (_status)을 써서 판정
+#
+# status
+#   'steady'    : peak 없이 수렴 (segment 동안 모든 species의 변화폭이 atol + rtol * |평균| 이하)
+#   'damped'    : peak가 있었지만 진폭이 cycle마다 줄어듦 (결국 steady state로 수렴)
+#   'sustained' : 진폭과 주기가 k cycle 동안 rtol 이내로 일정 (limit cycle)
+#   'unsettled' : t_max까지 판정이 안 됨 (Hopf 분기점 근처처럼 진폭이 아주 천천히 변하는 경우)
+
+STATUSES = ['steady', 'damped', 'sustained', 'unsettled']
+
+
+def _extremum_event(func, species, direction, point_params, deadband):
+    # d(species)/dt = 0 인 지점, direction -1이면 극대 (+ -> -), +1이면 극소 (- -> +)
+    # steady state 근처에서는 미분값이 반올림 오차 수준이라 step 끝과 dense output의 부호가 달라질 수 있음
+    # (brentq가 'f(a) and f(b) must have different signs'로 실패) -> deadband 이하는 0으로 취급
+    def event(t, y):
+        value = func(y, t, point_params)[species]
+        return value if abs(value) > deadband else 0.0
+    event.direction = direction
+    return event
+
+
+def _add_events(events, times, values):
+    # deadband 안에서는 event 값이 0이라 같은 시간의 event가 여러 번 (step 끝, segment 경계) 잡힐 수 있음
+    for t, x in zip(times, values):
+        if not events or t > events[-1][0]:
+            events.append((t, x))
+
+
+def _cycles(peaks, troughs):
+    # peak마다 (시간, 높이, 진폭), 진폭은 그 peak 바로 앞 trough와의 차이 (앞 trough가 없는 첫 peak는 제외)
+    # (peaks, troughs는 시간 순서)
+    if not peaks or not troughs:
+        return []
+    trough_times, trough_values = np.array(troughs).T
+    before = np.searchsorted(trough_times, [t_peak for t_peak, _ in peaks]) - 1
+    return [(t_peak, height, height - trough_values[j]) for (t_peak, height), j in zip(peaks, before) if j >= 0]
+
+
+def _classify(cycles, k, rtol, atol):
+    # 마지막 k+1개 peak (k cycle)로 판정, 판정할 수 없으면 None
+    # 진폭이 atol 이하인 cycle은 수치 오차로 생긴 peak로 보고 판정에 쓰지 않음
+    large = [c for c in cycles if c[2] > atol]
+    if large and cycles[-1][2] <= atol:
+        return 'damped'
+    if len(large) < k + 1:
+        return None
+    times, _, amplitudes = np.array(large[-(k + 1):]).T
+    ratios = amplitudes[1:] / amplitudes[:-1]
+    periods = np.diff(times)
+    if np.all(np.abs(ratios - 1) <= rtol) and np.ptp(periods) <= rtol * periods.mean():
+        return 'sustained'
+    if np.all(ratios < 1 - rtol):
+        # 진폭이 줄어드는 것만으로는 부족함 (y0에서 limit cycle로 위에서부터 다가가는 경우도 줄어듦)
+        # Aitken 외삽으로 구한 진폭의 극한이 0에 가까울 때만 damped
+        a1, a2, a3 = amplitudes[-3:]
+        denominator = (a3 - a2) - (a2 - a1)
+        limit = a3 - (a3 - a2) ** 2 / denominator if denominator != 0 else a3
+        if limit < 0.1 * a3:
+            return 'damped'
+    return None
+
+
+def _status(cycles, block, k, rtol, atol):
+    # cycle로 판정이 안 되면 (peak가 없거나 진폭이 atol 이하) block (마지막 segment) 동안 수렴했는지 확인
+    status = _classify(cycles, k, rtol, atol)
+    if status is None:
+        spread = block.max(axis=0) - block.min(axis=0)
+        if np.all(spread <= atol + rtol * np.abs(block.mean(axis=0))):
+            status = 'damped' if any(c[2] > atol for c in cycles) else 'steady'
+    return status
+
+
+def _sampled_extrema(t, x, direction):
+    # 시간 격자 위의 극대 (direction -1) / 극소 (+1), 이웃한 세 점을 지나는 포물선의 꼭짓점으로 시간과 높이를 보정
+    x = -direction * np.asarray(x)
+    i = np.flatnonzero((x[1:-1] > x[:-2]) & (x[1:-1] >= x[2:])) + 1
+    left, center, right = x[i - 1], x[i], x[i + 1]
+    curvature = left - 2 * center + right
+    shift = np.divide(0.5 * (left - right), curvature, out=np.zeros(len(i)), where=curvature != 0)
+    times = t[i] + shift * (t[i + 1] - t[i - 1]) / 2
+    values = center - 0.25 * (left - right) * shift
+    return list(zip(times, -direction * values))
+
+
+def classify(t, sol, species=None, k=3, rtol=1e-3, atol=1e-3, segment=1000):
+    """
+    이미 적분한 궤적을 detect와 같은 기준으로 판정 (peak / trough를 event 대신 시간 격자에서 찾음)
+
+    t, sol : 시간 격자와 궤적 (len(t), len(species)), transient를 뺀 구간
+    species : peak를 찾는 species의 index (None이면 마지막 species, MAPK_model은 MAPK_PP)
+    k, rtol, atol : detect 참고
+    segment : 수렴 여부를 확인하는 마지막 구간의 길이 (초)
+
+    반환 : STATUSES 중 하나 (t의 끝까지 판정이 안 되면 'unsettled')
+    """
+    t = np.asarray(t, dtype=float)
+    x = sol[:, -1 if species is None else species]
+    cycles = _cycles(_sampled_extrema(t, x, -1), _sampled_extrema(t, x, 1))
+    return _status(cycles, sol[t >= t[-1] - segment], k, rtol, atol) or 'unsettled'
+
+
+def detect(point_params, y0=None, species=None, k=3, rtol=1e-3, atol=1e-3, segment=1000, t_max=12000,
+           method='LSODA', ode_rtol=1e-6, ode_atol=1e-6, deadband=1e-9, compiled=False, jacobian=False, model=None):
+    """
+    MAPK_model (또는 model)을 segment 초씩 적분하면서 peak / trough event로 진폭과 주기를 재고, 판정되면 바로 멈춤
+
+    point_params : 파라미터 (MAPK_model은 22개)
+    y0 : 초기조건 (기본값 모두 0)
+    species : peak를 찾는 species 이름 (None이면 마지막 species, MAPK_model은 MAPK_PP)
+    k : 판정에 필요한 연속 cycle 수
+    rtol, atol : cycle 사이 진폭 / 주기의 상대 허용오차, steady로 보는 진폭 (농도 단위)
+    segment, t_max : 한 번에 적분하는 시간, 최대 적분 시간 (초)
+    method, ode_rtol, ode_atol : solve_ivp 설정 (peak 높이를 rtol보다 훨씬 정확하게 재야 함)
+    deadband : 이 값 이하의 미분값 (농도 / 초)은 0으로 보고 event를 찾음
+    compiled, jacobian : mainlab_func.model_functions 참고 (MAPK_model에서만, jacobian은 method가 LSODA, BDF, Radau일 때만 쓰임)
+    model : mainlab_model에 등록된 모델 이름 또는 ODEModel (None이면 MAPK_model)
+
+    반환 : dict
+        'status' : STATUSES 중 하나
+        'amplitude', 'period' : 진폭이 atol보다 큰 마지막 cycle의 진폭 / 주기 (그런 cycle이 2개 미만이면 0 / nan)
+        'decay' : 마지막 k cycle의 cycle당 평균 진폭 비 (1이면 일정, 1보다 작으면 감쇠, cycle이 부족하면 nan)
+        'summary' : 마지막 cycle (cycle이 없으면 마지막 segment) 동안 species별 max / min / mean,
+                    shape (len(species), len(STATS)), sweep 결과의 한 점과 같은 형식
+        't_end', 'y_end' : 적분을 멈춘 시간과 그때의 state (다음 적분의 초기조건으로 사용)
+    """
+    model, _, species_names, _ = ref.resolve_model(model)
+    if model is not None and (compiled or jacobian):
+        raise ValueError("compiled, jacobian은 MAPK_model (model=None)에서만 쓸 수 있습니다")
+    y = np.zeros(len(species_names)) if y0 is None else np.asarray(y0, dtype=float)
+    point_params = np.array(point_params, dtype=float) if compiled else [float(p) for p in point_params]
+    detect_index = len(species_names) - 1 if species is None else species_names.index(species)
+    func, Dfun = ref.model_functions(compiled, jacobian) if model is None else (model.rhs_point, None)
+    fun = lambda t, y: func(y, t, point_params)
+    jac = (lambda t, y: Dfun(y, t, point_params)) if Dfun is not None else None
+    events = [_extremum_event(func, detect_index, direction, point_params, deadband) for direction in (-1, 1)]
+
+    peaks, troughs, cycles = [], [], []
+    ts, ys = [np.zeros(1)], [y[None, :]]
+    t0 = 0.0
+    status = None
+    while status is None and t0 < t_max:
+        t1 = min(t0 + segment, t_max)
+        sol = solve_ivp(fun, (t0, t1), y, method=method, events=events, rtol=ode_rtol, atol=ode_atol, jac=jac)
+        _add_events(peaks, sol.t_events[0], sol.y_events[0][:, detect_index] if len(sol.t_events[0]) else [])
+        _add_events(troughs, sol.t_events[1], sol.y_events[1][:, detect_index] if len(sol.t_events[1]) else [])
+        cycles = _cycles(peaks, troughs)
+        ts.append(sol.t[1:])
+        ys.append(sol.y[:, 1:].T)
+        t0, y = t1, sol.y[:, -1]
+
+        status = _status(cycles, sol.y.T, k, rtol, atol)
+
+    t_all, y_all = np.concatenate(ts), np.concatenate(ys)
+    large = [c for c in cycles if c[2] > atol]
+    if len(large) >= 2:
+        # 마지막 두 peak 사이 (한 주기)
+        window = y_all[(t_all >= large[-2][0]) & (t_all <= large[-1][0])]
+    else:
+        window = y_all[t_all >= t0 - segment]
+    times = np.array([c[0] for c in large])
+    amplitudes = np.array([c[2] for c in large])
+    last = amplitudes[-(k + 1):]
+    return {
+        'status': status or 'unsettled',
+        'amplitude': amplitudes[-1] if len(amplitudes) >= 2 else 0.0,
+        'period': times[-1] - times[-2] if len(times) >= 2 else np.nan,
+        'decay': np.exp(np.mean(np.log(last[1:] / last[:-1]))) if len(last) >= 2 else np.nan,
+        'summary': np.stack([window.max(axis=0), window.min(axis=0), window.mean(axis=0)], axis=-1),
+        't_end': t0,
+        'y_end': y,
+    }
+
+
+def detect_sweep(name, values, y0=None, base_params=None, continuation=True, model=None, **kwargs):
+    """
+    파라미터 하나를 values로 바꾸면서 점마다 detect
+    continuation=True이면 각 점을 바로 앞 점의 마지막 state에서 시작 (transient가 짧아짐)
+
+    name, values : 바꿀 파라미터 이름과 값 배열
+    y0 : (첫) 점의 초기조건 (기본값 모두 0)
+    base_params : 바꾸지 않는 파라미터 (기본값 params 또는 모델의 기본 파라미터)
+    model : mainlab_model에 등록된 모델 이름 또는 ODEModel (None이면 MAPK_model)
+    kwargs : detect에 넘길 설정 (k, rtol, atol, segment, t_max, ...)
+
+    반환 : dict
+        'status' : 점마다 status (문자열 배열)
+        'amplitude', 'period', 'decay', 't_end' : 점마다 detect 결과 (배열)
+        'summary' : shape (len(values), len(species), len(STATS)), sweep_parameter와 같은 형식
+    """
+    model, param_names, _, base_params = ref.resolve_model(model, base_params)
+    column = param_names.index(name)
+    y = y0
+    results = []
+    for value in values:
+        point_params = list(base_params)
+        point_params[column] = value
+        result = detect(point_params, y, model=model, **kwargs)
+        results.append(result)
+        if continuation:
+            y = result['y_end']
+    return {key: np.array([result[key] for result in results])
+            for key in ['status', 'amplitude', 'period', 'decay', 't_end', 'summary']}
+
+
+def oscillation_range(values, status):
+    """
+    status가 'sustained'인 가장 작은 값과 가장 큰 값 (Hopf 분기점 추정), 없으면 None
+    """
+    oscillating = np.flatnonzero(np.asarray(status) == 'sustained')
+    if len(oscillating) == 0:
+        return None
+    return values[oscillating[0]], values[oscillating[-1]]
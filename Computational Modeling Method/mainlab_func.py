@@ -1,6 +1,17 @@
+import inspect
+import itertools
 import numpy as np
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 from scipy.integrate import odeint
+from scipy.signal import find_peaks
+from mainlab_model import get_model
+from mainlab_cache import trajectory_key
+
+try:
+    from numba import njit
+except ImportError:  # numba는 선택 사항, 없으면 compiled=True여도 Python 함수를 그대로 씀
+    njit = None
 
 def MAPK_model(y, t, params):
     # 파라미터 언팩
@@ -51,6 +62,212 @@ def MAPK_model(y, t, params):
 
     return [dMKKK_P, dMKK_P, dMKK_PP, dMAPK_P, dMAPK_PP]
 
+def MAPK_jacobian(y, t, params):
+    # MAPK_model의 analytic Jacobian, J[i, j] = d(dy_i/dt) / dy_j (odeint의 Dfun)
+    # 없으면 odeint가 RHS를 변수 수만큼 더 불러서 finite difference로 계산함
+    V1, n, Ki, K1 = params[0], params[1], params[2], params[3]
+    V2, K2 = params[4], params[5]
+    k3, K3 = params[6], params[7]
+    k4, K4 = params[8], params[9]
+    V5, K5 = params[10], params[11]
+    V6, K6 = params[12], params[13]
+    k7, K7 = params[14], params[15]
+    k8, K8 = params[16], params[17]
+    V9, K9 = params[18], params[19]
+    V10, K10 = params[20], params[21]
+
+    MKKK_P, MKK_P, MKK_PP, MAPK_P, MAPK_PP = y[0], y[1], y[2], y[3], y[4]
+    MKKK = 100 - MKKK_P
+    MKK = 300 - MKK_P - MKK_PP
+    MAPK = 300 - MAPK_P - MAPK_PP
+
+    # 각 reaction rate의 편미분 (dv1_dMKKK_P = d(v1) / d(MKKK_P), ...)
+    # MKKK, MKK, MAPK는 conservation으로 정해지므로 d(MKKK)/d(MKKK_P) = -1 등
+    inhibition = 1 + (MAPK_PP / Ki) ** n
+    dv1_dMKKK_P = -V1 * K1 / ((K1 + MKKK) ** 2 * inhibition)
+    dv1_dMAPK_PP = -V1 * MKKK / (K1 + MKKK) * n * (MAPK_PP / Ki) ** (n - 1) / (Ki * inhibition ** 2)
+    dv2_dMKKK_P = V2 * K2 / (K2 + MKKK_P) ** 2
+    dv3_dMKKK_P = k3 * MKK / (K3 + MKK)
+    dv3_dMKK = k3 * MKKK_P * K3 / (K3 + MKK) ** 2  # d(v3)/d(MKK_P) = d(v3)/d(MKK_PP) = -dv3_dMKK
+    dv4_dMKKK_P = k4 * MKK_P / (K4 + MKK_P)
+    dv4_dMKK_P = k4 * MKKK_P * K4 / (K4 + MKK_P) ** 2
+    dv5_dMKK_PP = V5 * K5 / (K5 + MKK_PP) ** 2
+    dv6_dMKK_P = V6 * K6 / (K6 + MKK_P) ** 2
+    dv7_dMKK_PP = k7 * MAPK / (K7 + MAPK)
+    dv7_dMAPK = k7 * MKK_PP * K7 / (K7 + MAPK) ** 2  # d(v7)/d(MAPK_P) = d(v7)/d(MAPK_PP) = -dv7_dMAPK
+    dv8_dMKK_PP = k8 * MAPK_P / (K8 + MAPK_P)
+    dv8_dMAPK_P = k8 * MKK_PP * K8 / (K8 + MAPK_P) ** 2
+    dv9_dMAPK_PP = V9 * K9 / (K9 + MAPK_PP) ** 2
+    dv10_dMAPK_P = V10 * K10 / (K10 + MAPK_P) ** 2
+
+    J = np.zeros((5, 5))
+    # dMKKK_P = v1 - v2
+    J[0, 0] = dv1_dMKKK_P - dv2_dMKKK_P
+    J[0, 4] = dv1_dMAPK_PP
+    # dMKK_P = v3 + v5 - v4 - v6
+    J[1, 0] = dv3_dMKKK_P - dv4_dMKKK_P
+    J[1, 1] = -dv3_dMKK - dv4_dMKK_P - dv6_dMKK_P
+    J[1, 2] = -dv3_dMKK + dv5_dMKK_PP
+    # dMKK_PP = v4 - v5
+    J[2, 0] = dv4_dMKKK_P
+    J[2, 1] = dv4_dMKK_P
+    J[2, 2] = -dv5_dMKK_PP
+    # dMAPK_P = v7 + v9 - v8 - v10
+    J[3, 2] = dv7_dMKK_PP - dv8_dMKK_PP
+    J[3, 3] = -dv7_dMAPK - dv8_dMAPK_P - dv10_dMAPK_P
+    J[3, 4] = -dv7_dMAPK + dv9_dMAPK_PP
+    # dMAPK_PP = v8 - v9
+    J[4, 2] = dv8_dMKK_PP
+    J[4, 3] = dv8_dMAPK_P
+    J[4, 4] = -dv9_dMAPK_PP
+    return J
+
+
+# numba가 있으면 MAPK_model / MAPK_jacobian을 기계어로 컴파일 (params는 float numpy 배열로 넘겨야 함)
+# 처음 호출할 때 컴파일 시간이 들고, cache=True라서 다음 실행부터는 __pycache__에서 불러옴
+MAPK_model_compiled = njit(cache=True)(MAPK_model) if njit is not None else MAPK_model
+MAPK_jacobian_compiled = njit(cache=True)(MAPK_jacobian) if njit is not None else MAPK_jacobian
+
+
+def model_functions(compiled=False, jacobian=False):
+    """
+    odeint에 넘길 (func, Dfun)
+    compiled : True이면 numba로 컴파일한 함수 (numba가 없으면 Python 함수 그대로)
+               점 하나씩 적분하는 continuation_sweep / mainlab_detect.detect에서만 쓰임 (sweep은 MAPK_model_batch)
+    jacobian : True이면 analytic Jacobian (False면 Dfun=None, odeint가 finite difference로 계산)
+               LSODA는 stiff한 구간 (BDF)에서만 Jacobian을 쓰므로 이 모델에서는 효과가 작음 (benchmark_mapk.py)
+    """
+    func, Dfun = (MAPK_model_compiled, MAPK_jacobian_compiled) if compiled else (MAPK_model, MAPK_jacobian)
+    return func, Dfun if jacobian else None
+
+
+def MAPK_model_batch(y, t, params):
+    # MAPK_model을 여러 파라미터 세트에 대해 한 번에 계산 (NumPy broadcasting)
+    # y : (m, 5) 또는 길이 m*5로 펼친 배열, params : (m, 22) 배열 (행마다 파라미터 한 세트)
+    # 반환 : y와 같은 shape
+    params = np.asarray(params)
+    Y = np.reshape(y, (-1, 5))
+    V1, n, Ki, K1 = params[:, 0], params[:, 1], params[:, 2], params[:, 3]
+    V2, K2 = params[:, 4], params[:, 5]
+    k3, K3 = params[:, 6], params[:, 7]
+    k4, K4 = params[:, 8], params[:, 9]
+    V5, K5 = params[:, 10], params[:, 11]
+    V6, K6 = params[:, 12], params[:, 13]
+    k7, K7 = params[:, 14], params[:, 15]
+    k8, K8 = params[:, 16], params[:, 17]
+    V9, K9 = params[:, 18], params[:, 19]
+    V10, K10 = params[:, 20], params[:, 21]
+
+    MKKK_P, MKK_P, MKK_PP, MAPK_P, MAPK_PP = Y.T
+
+    MKKK = 100 - MKKK_P
+    MKK = 300 - MKK_P - MKK_PP
+    MAPK = 300 - MAPK_P - MAPK_PP
+
+    v1 = V1 * MKKK / ((1 + (MAPK_PP / Ki) ** n) * (K1 + MKKK))
+    v2 = V2 * MKKK_P / (K2 + MKKK_P)
+    v3 = k3 * MKKK_P * MKK / (K3 + MKK)
+    v4 = k4 * MKKK_P * MKK_P / (K4 + MKK_P)
+    v5 = V5 * MKK_PP / (K5 + MKK_PP)
+    v6 = V6 * MKK_P / (K6 + MKK_P)
+    v7 = k7 * MKK_PP * MAPK / (K7 + MAPK)
+    v8 = k8 * MKK_PP * MAPK_P / (K8 + MAPK_P)
+    v9 = V9 * MAPK_PP / (K9 + MAPK_PP)
+    v10 = V10 * MAPK_P / (K10 + MAPK_P)
+
+    dY = np.empty_like(Y, dtype=float)
+    dY[:, 0] = v1 - v2
+    dY[:, 1] = v3 + v5 - v4 - v6
+    dY[:, 2] = v4 - v5
+    dY[:, 3] = v7 + v9 - v8 - v10
+    dY[:, 4] = v8 - v9
+    return dY.reshape(np.shape(y))
+
+
+def MAPK_jacobian_batch(y, t, params):
+    # MAPK_jacobian을 여러 파라미터 세트에 대해 한 번에 계산 (MAPK_model_batch와 같은 입력)
+    # 반환 : (m, 5, 5) 배열
+    params = np.asarray(params)
+    Y = np.reshape(y, (-1, 5))
+    V1, n, Ki, K1 = params[:, 0], params[:, 1], params[:, 2], params[:, 3]
+    V2, K2 = params[:, 4], params[:, 5]
+    k3, K3 = params[:, 6], params[:, 7]
+    k4, K4 = params[:, 8], params[:, 9]
+    V5, K5 = params[:, 10], params[:, 11]
+    V6, K6 = params[:, 12], params[:, 13]
+    k7, K7 = params[:, 14], params[:, 15]
+    k8, K8 = params[:, 16], params[:, 17]
+    V9, K9 = params[:, 18], params[:, 19]
+    V10, K10 = params[:, 20], params[:, 21]
+
+    MKKK_P, MKK_P, MKK_PP, MAPK_P, MAPK_PP = Y.T
+    MKKK = 100 - MKKK_P
+    MKK = 300 - MKK_P - MKK_PP
+    MAPK = 300 - MAPK_P - MAPK_PP
+
+    inhibition = 1 + (MAPK_PP / Ki) ** n
+    dv1_dMKKK_P = -V1 * K1 / ((K1 + MKKK) ** 2 * inhibition)
+    dv1_dMAPK_PP = -V1 * MKKK / (K1 + MKKK) * n * (MAPK_PP / Ki) ** (n - 1) / (Ki * inhibition ** 2)
+    dv2_dMKKK_P = V2 * K2 / (K2 + MKKK_P) ** 2
+    dv3_dMKKK_P = k3 * MKK / (K3 + MKK)
+    dv3_dMKK = k3 * MKKK_P * K3 / (K3 + MKK) ** 2
+    dv4_dMKKK_P = k4 * MKK_P / (K4 + MKK_P)
+    dv4_dMKK_P = k4 * MKKK_P * K4 / (K4 + MKK_P) ** 2
+    dv5_dMKK_PP = V5 * K5 / (K5 + MKK_PP) ** 2
+    dv6_dMKK_P = V6 * K6 / (K6 + MKK_P) ** 2
+    dv7_dMKK_PP = k7 * MAPK / (K7 + MAPK)
+    dv7_dMAPK = k7 * MKK_PP * K7 / (K7 + MAPK) ** 2
+    dv8_dMKK_PP = k8 * MAPK_P / (K8 + MAPK_P)
+    dv8_dMAPK_P = k8 * MKK_PP * K8 / (K8 + MAPK_P) ** 2
+    dv9_dMAPK_PP = V9 * K9 / (K9 + MAPK_PP) ** 2
+    dv10_dMAPK_P = V10 * K10 / (K10 + MAPK_P) ** 2
+
+    J = np.zeros((len(Y), 5, 5))
+    J[:, 0, 0] = dv1_dMKKK_P - dv2_dMKKK_P
+    J[:, 0, 4] = dv1_dMAPK_PP
+    J[:, 1, 0] = dv3_dMKKK_P - dv4_dMKKK_P
+    J[:, 1, 1] = -dv3_dMKK - dv4_dMKK_P - dv6_dMKK_P
+    J[:, 1, 2] = -dv3_dMKK + dv5_dMKK_PP
+    J[:, 2, 0] = dv4_dMKKK_P
+    J[:, 2, 1] = dv4_dMKK_P
+    J[:, 2, 2] = -dv5_dMKK_PP
+    J[:, 3, 2] = dv7_dMKK_PP - dv8_dMKK_PP
+    J[:, 3, 3] = -dv7_dMAPK - dv8_dMAPK_P - dv10_dMAPK_P
+    J[:, 3, 4] = -dv7_dMAPK + dv9_dMAPK_PP
+    J[:, 4, 2] = dv8_dMKK_PP
+    J[:, 4, 3] = dv8_dMAPK_P
+    J[:, 4, 4] = -dv9_dMAPK_PP
+    return J
+
+
+def _banded_jacobian_batch(y, t, params):
+    # odeint_batch의 Dfun : block-diagonal Jacobian을 odeint의 banded 형식 (ml = mu = 4)으로
+    # band[i - j + 4, j] = J[i, j] (i, j는 m*5개 변수 전체의 index)
+    J = MAPK_jacobian_batch(y, t, params)
+    m = len(J)
+    row, col = np.indices((5, 5))
+    band = np.zeros((9, 5 * m))
+    band[row - col + 4, 5 * np.arange(m)[:, None, None] + col] = J
+    return band
+
+
+def odeint_batch(y0, t, params_batch, jacobian=False, full_output=False, **kwargs):
+    # 파라미터 세트 m개를 (m*5)개 변수의 ODE 하나로 묶어서 한 번에 적분
+    # 세트끼리는 서로 영향이 없으므로 Jacobian은 5x5 block-diagonal -> 띠 폭 4 (ml = mu = 4)로 알려줘서
+    # odeint가 Jacobian을 m*5번이 아니라 9번의 RHS 계산으로 구하게 함
+    # jacobian=True이면 그 9번의 RHS 계산 대신 MAPK_jacobian_batch (analytic)를 씀
+    # y0 : 길이 5 (모든 세트 공통) 또는 (m, 5), params_batch : (m, 22)
+    # 반환 : (len(t), m, 5) 배열 (full_output=True이면 odeint처럼 (배열, infodict))
+    params_batch = np.asarray(params_batch, dtype=float)
+    m = len(params_batch)
+    Y0 = np.broadcast_to(np.asarray(y0, dtype=float), (m, 5)).ravel()
+    Dfun = _banded_jacobian_batch if jacobian else None
+    out = odeint(MAPK_model_batch, Y0, t, args=(params_batch,), Dfun=Dfun, ml=4, mu=4, full_output=full_output,
+                 **kwargs)
+    if full_output:
+        return out[0].reshape(len(t), m, 5), out[1]
+    return out.reshape(len(t), m, 5)
+
 # Parameters
 params = [
     2.5, 1, 9, 10,        # V1, n, Ki, K1
@@ -63,4 +280,334 @@ params = [
     0.025, 15,            # k8, K8
     0.5, 15,              # V9, K9
     0.5, 15               # V10, K10
-]
\ No newline at end of file
+]
+
+# 파라미터 / 변수 이름 (params, y 순서)
+PARAM_NAMES = [
+    'V1', 'n', 'Ki', 'K1',
+    'V2', 'K2',
+    'k3', 'K3',
+    'k4', 'K4',
+    'V5', 'K5',
+    'V6', 'K6',
+    'k7', 'K7',
+    'k8', 'K8',
+    'V9', 'K9',
+    'V10', 'K10'
+]
+SPECIES = ['MKKK_P', 'MKK_P', 'MKK_PP', 'MAPK_P', 'MAPK_PP']
+STATS = ['max', 'min', 'mean']
+
+
+def resolve_model(model, base_params=None):
+    """
+    sweep 함수들의 model 인자 해석
+    None이면 MAPK_model (PARAM_NAMES, SPECIES, params), 아니면 mainlab_model에 등록된 모델 이름 또는 ODEModel
+
+    반환 : (model 또는 None, 파라미터 이름 리스트, species 이름 리스트, base_params (기본값은 모델의 기본 파라미터))
+    """
+    if model is None:
+        return None, PARAM_NAMES, SPECIES, params if base_params is None else base_params
+    model = get_model(model)
+    return model, model.param_names, model.species, model.defaults if base_params is None else base_params
+
+
+def model_identity(model=None):
+    """
+    궤적 캐시 key에 쓰는 모델 식별 문자열 (모델의 식이 바뀌면 달라짐)
+    None이면 MAPK_model / MAPK_model_batch의 소스 코드, ODEModel이면 컴파일한 코드
+    """
+    if model is None:
+        return 'MAPK_model\n' + inspect.getsource(MAPK_model) + inspect.getsource(MAPK_model_batch)
+    model = get_model(model)
+    return f'ODEModel {model.name}\n' + model.source
+
+
+def _key_options(kwargs, batch, jacobian=False):
+    # cache key의 solver 설정 : odeint 설정 + 적분 방법
+    # 여러 세트를 묶어서 적분한 궤적 (odeint_batch, 오차를 묶은 ODE 전체에 대해 조절)은 점 하나만 적분한 궤적 (odeint)과
+    # solver 허용오차 안에서만 (기본 rtol / atol에서 약 1e-4) 같으므로 key를 따로 씀, analytic Jacobian 사용 여부도 마찬가지
+    # (묶음의 구성은 key에 넣지 않음 : 격자를 넓히면 묶음이 달라지므로, 묶어서 적분한 궤적끼리는 허용오차 안에서만 같음)
+    return {**kwargs, 'integrator': 'odeint_batch' if batch else 'odeint', 'jacobian': bool(jacobian)}
+
+
+def cached_odeint_batch(y0, t, params_batch, cache, model=None, jacobian=False, **kwargs):
+    """
+    odeint_batch (또는 model.odeint_batch)와 같지만, 파라미터 세트마다 cache에서 먼저 찾고
+    없는 세트만 함께 적분해서 cache에 저장
+
+    y0 : 길이 len(species) (모든 세트 공통) 또는 (m, len(species))
+    params_batch : (m, 파라미터 수)
+    cache : mainlab_cache.TrajectoryCache
+    model, jacobian : sweep 참고
+    kwargs : odeint 설정 (rtol, atol, ...), cache key에 포함됨
+    sweep과 같은 key를 쓰고, cached_odeint (점 하나씩 적분)와는 key가 다름 (_key_options)
+
+    반환 : (len(t), m, len(species)) 배열
+    """
+    model, _, species, _ = resolve_model(model)
+    params_batch = np.atleast_2d(np.asarray(params_batch, dtype=float))
+    Y0 = np.broadcast_to(np.asarray(y0, dtype=float), (len(params_batch), len(species)))
+    identity = model_identity(model)
+    options = _key_options(kwargs, batch=True, jacobian=jacobian and model is None)
+    keys = [trajectory_key(identity, p, y, t, options) for p, y in zip(params_batch, Y0)]
+    sols = cache.get_many(keys)
+    missing = [i for i, sol in enumerate(sols) if sol is None]
+    if missing:
+        if model is None:
+            new = odeint_batch(Y0[missing], t, params_batch[missing], jacobian=jacobian, **kwargs)
+        else:
+            new = model.odeint_batch(Y0[missing], t, params_batch[missing], **kwargs)
+        cache.put_many({keys[i]: new[:, j] for j, i in enumerate(missing)})
+        for j, i in enumerate(missing):
+            sols[i] = new[:, j]
+    return np.stack(sols, axis=1)
+
+
+def cached_odeint(y0, t, point_params, cache, model=None, **kwargs):
+    """
+    파라미터 세트 하나의 odeint (MAPK_model 또는 model.odeint)를 cache와 함께
+    sweep / cached_odeint_batch에서 묶어서 적분한 궤적과는 key가 다르므로 (_key_options), cache에서 가져온 궤적은
+    항상 이 함수로 적분한 것과 같음
+
+    반환 : (len(t), len(species)) 배열
+    """
+    model, _, _, _ = resolve_model(model)
+    key = trajectory_key(model_identity(model), point_params, y0, t, _key_options(kwargs, batch=False))
+    sol = cache.get(key)
+    if sol is None:
+        if model is None:
+            sol = odeint(MAPK_model, y0, t, args=(list(map(float, point_params)),), **kwargs)
+        else:
+            sol = model.odeint(y0, t, point_params, **kwargs)
+        cache.put(key, sol)
+    return sol
+
+
+def _reduce(sol, t, transient, return_status):
+    # 궤적 (len(t), m, len(species))을 점마다 한 줄로 요약, shape (m, len(species) * len(STATS) (+ 1))
+    # transient 이후 구간의 species별 max / min / mean, return_status=True이면 마지막 열은 STATUSES의 index
+    # (판정 기준은 mainlab_detect.classify 하나, mainlab_detect가 이 모듈을 import하므로 여기서 import)
+    tail = sol[transient:]
+    out = _summary(tail).reshape(tail.shape[1], -1)
+    if return_status:
+        from mainlab_detect import STATUSES, classify
+        status = [STATUSES.index(classify(t[transient:], tail[:, j])) for j in range(tail.shape[1])]
+        out = np.column_stack([out, status])
+    return out
+
+
+def _sweep_chunk(args):
+    # 파라미터 세트 여러 개를 odeint_batch로 함께 적분하고 점마다 _reduce
+    # return_trajectory=True이면 (캐시에 저장하도록) 요약 대신 궤적 전체를 돌려줌
+    params_batch, y0, t, transient, jacobian, model, return_status, return_trajectory = args
+    if model is None:
+        sol = odeint_batch(y0, t, params_batch, jacobian=jacobian)
+    else:
+        sol = model.odeint_batch(y0, t, params_batch)
+    if return_trajectory:
+        return sol
+    return _reduce(sol, t, transient, return_status)
+
+
+def _run_chunks(tasks, max_workers):
+    # _sweep_chunk 결과를 tasks 순서대로 하나씩 (끝나는 대로) 돌려줌
+    if max_workers == 1 or len(tasks) <= 1:
+        yield from map(_sweep_chunk, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            yield from pool.map(_sweep_chunk, tasks)
+
+
+def sweep(grid, y0=None, t=None, base_params=None, transient=1500, max_workers=None, batch_size=50, jacobian=False,
+          model=None, cache=None, return_status=False):
+    """
+    여러 파라미터를 동시에 바꾸면서 (격자) MAPK_model (또는 model)을 process pool에서 병렬로 적분
+
+    grid : {파라미터 이름: 값 배열} (예: {'Ki': Kis, 'V1': V1s} -> Ki x V1 격자)
+    y0 : 초기조건 (기본값 모두 0)
+    t : 시간 (기본값 np.linspace(0, 12000, 8000))
+    base_params : 바꾸지 않는 파라미터 (기본값 params 또는 모델의 기본 파라미터)
+    transient : 앞에서부터 버리는 시간 점 개수 (steady-state 이전 구간)
+    max_workers : process 수 (None이면 CPU 수, 1이면 process pool 없이 순서대로)
+    batch_size : 한 번에 묶어서 적분하는 격자 점 개수 (odeint_batch, 1이면 점마다 따로)
+    jacobian : True이면 analytic Jacobian 사용 (odeint_batch, MAPK_model에서만)
+               (LSODA가 stiff하다고 판단한 chunk에서만 쓰이고, 201개 Ki sweep에서 약 5% 빨라짐, benchmark_mapk.py)
+    model : mainlab_model에 등록된 모델 이름 또는 ODEModel (None이면 MAPK_model)
+    cache : mainlab_cache.TrajectoryCache이면 격자 점마다 요약 (transient 이후 max / min / mean)을 캐시에서 찾고,
+            없으면 궤적을 찾아서 요약, 둘 다 없는 점만 적분해서 저장 (격자를 넓히거나 transient만 바꿔서
+            다시 실행하면 새 점만 적분)
+            궤적은 batch_size개씩 읽고 적분 chunk가 끝날 때마다 바로 요약하므로 한꺼번에 메모리에 두지 않음
+            새 궤적 전체가 cache 상한 (max_bytes / max_entries)보다 크면 저장해도 같은 sweep 안에서 지워지므로
+            요약만 저장함 (201 x 201 격자의 궤적은 약 13 GB, 요약은 약 5 MB)
+    return_status : True이면 점마다 transient 이후 궤적을 mainlab_detect.classify로 판정한 status도 반환
+                    ('steady' / 'damped' / 'sustained' / 'unsettled', 마지막 species의 peak로 판정)
+
+    반환 : shape (len(값 배열 1), len(값 배열 2), ..., len(species), len(STATS)) 배열
+           예: result[i, j, SPECIES.index('MAPK_PP'), STATS.index('max')]
+           return_status=True이면 (위 배열, shape (len(값 배열 1), len(값 배열 2), ...)의 status 문자열 배열)
+    """
+    model, param_names, species, base_params = resolve_model(model, base_params)
+    if model is not None and jacobian:
+        raise ValueError("jacobian은 MAPK_model (model=None)에서만 쓸 수 있습니다")
+    y0 = np.zeros(len(species)) if y0 is None else y0
+    t = np.linspace(0, 12000, 8000) if t is None else t
+    names = list(grid)
+    index = [param_names.index(name) for name in names]
+    values = [np.asarray(grid[name], dtype=float) for name in names]
+    shape = tuple(len(v) for v in values)
+
+    points = np.tile(np.asarray(base_params, dtype=float), (int(np.prod(shape)), 1))
+    for column, point in zip(index, np.array(list(itertools.product(*values))).reshape(-1, len(names)).T):
+        points[:, column] = point
+    if cache is None:
+        tasks = [(points[i:i + batch_size], y0, t, transient, jacobian, model, return_status, False)
+                 for i in range(0, len(points), batch_size)]
+        return _split(np.concatenate(list(_run_chunks(tasks, max_workers))), shape, len(species), return_status)
+
+    identity = model_identity(model)
+    options = _key_options({}, batch=True, jacobian=jacobian)
+    summary_options = {**options, 'summary': int(transient), 'status': True} if return_status else \
+        {**options, 'summary': int(transient)}
+    summary_keys = [trajectory_key(identity, p, y0, t, summary_options) for p in points]
+    result = np.empty((len(points), len(species) * len(STATS) + return_status))
+    pending = {}  # 아직 저장하지 않은 요약 {key: 요약}
+    missing = []
+    for i, summary in enumerate(cache.get_many(summary_keys)):
+        if summary is None:
+            missing.append(i)
+        else:
+            result[i] = np.ravel(summary)
+
+    # 요약이 없는 점은 궤적을 batch_size개씩 찾아서 바로 요약
+    keys = {i: trajectory_key(identity, points[i], y0, t, options) for i in missing}
+    todo = []
+    for start in range(0, len(missing), batch_size):
+        chunk = missing[start:start + batch_size]
+        found = [(i, sol) for i, sol in zip(chunk, cache.get_many([keys[i] for i in chunk])) if sol is not None]
+        todo.extend(sorted(set(chunk) - {i for i, _ in found}))
+        if found:
+            out = _reduce(np.stack([sol for _, sol in found], axis=1), t, transient, return_status)
+            for (i, _), row in zip(found, out):
+                result[i] = pending[summary_keys[i]] = row
+
+    # 둘 다 없는 점만 적분, chunk마다 요약하고 (궤적을 저장하면) 저장 / evict
+    store = ((cache.max_bytes is None or len(todo) * len(t) * len(species) * 8 <= cache.max_bytes)
+             and (cache.max_entries is None or len(todo) + len(points) <= cache.max_entries))
+    tasks = [(points[todo[i:i + batch_size]], y0, t, transient, jacobian, model, return_status, store)
+             for i in range(0, len(todo), batch_size)]
+    for start, out in zip(range(0, len(todo), batch_size), _run_chunks(tasks, max_workers)):
+        chunk = todo[start:start + batch_size]
+        if store:
+            trajectories = {keys[i]: out[:, j] for j, i in enumerate(chunk)}
+            out = _reduce(out, t, transient, return_status)
+        for j, i in enumerate(chunk):
+            result[i] = pending[summary_keys[i]] = out[j]
+        if store:
+            cache.put_many({**pending, **trajectories})
+            pending = {}
+    if pending:
+        cache.put_many(pending)
+    return _split(result, shape, len(species), return_status)
+
+
+def _split(result, shape, num_species, return_status):
+    # _reduce 결과 (점 수, ...)를 sweep의 반환 형식으로
+    summary = result[:, :num_species * len(STATS)].reshape(shape + (num_species, len(STATS)))
+    if not return_status:
+        return summary
+    from mainlab_detect import STATUSES
+    return summary, np.array(STATUSES)[result[:, -1].astype(int)].reshape(shape)
+
+
+def sweep_parameter(name, values, continuation=False, **kwargs):
+    """
+    파라미터 하나를 values로 바꾸면서 적분 (sweep의 1-D 버전)
+    continuation=True이면 continuation_sweep 사용 (앞 점의 마지막 state에서 시작, 정착하면 멈춤)
+
+    반환 : shape (len(values), len(species), len(STATS)) 배열 (return_status=True이면 sweep / continuation_sweep 참고)
+    """
+    if continuation:
+        return continuation_sweep(name, values, **kwargs)
+    return sweep({name: values}, **kwargs)
+
+
+def _summary(sol):
+    # species별 max / min / mean, shape (len(species), len(STATS))
+    return np.stack([sol.max(axis=0), sol.min(axis=0), sol.mean(axis=0)], axis=-1)
+
+
+def _settled(window, last_chunk, detect, rtol, atol):
+    # steady state : 마지막 chunk 동안 모든 species의 변화폭이 atol + rtol * |평균| 이하
+    spread = last_chunk.max(axis=0) - last_chunk.min(axis=0)
+    if np.all(spread <= atol + rtol * np.abs(last_chunk.mean(axis=0))):
+        return 'steady', _summary(last_chunk)
+
+    # periodic orbit : detect species의 마지막 peak 3개 (2주기)의 주기와 높이가 (rtol * 10 이내로) 같음
+    x = window[:, detect]
+    amplitude = x.max() - x.min()
+    peaks, _ = find_peaks(x, prominence=0.1 * amplitude)
+    if len(peaks) >= 3:
+        periods = np.diff(peaks[-3:])
+        heights = x[peaks[-3:]]
+        if np.ptp(periods) <= max(1, 10 * rtol * periods.mean()) and np.ptp(heights) <= 10 * rtol * amplitude:
+            # 마지막 peak 3개 사이 (정확히 2주기) 구간으로 통계 계산
+            return 'periodic', _summary(window[peaks[-3]:peaks[-1]])
+    return None, None
+
+
+def continuation_sweep(name, values, y0=None, base_params=None, dt=1.5, chunk=500, t_max=12000,
+                       rtol=1e-3, atol=1e-3, detect=None, return_status=False, compiled=False, jacobian=False,
+                       model=None):
+    """
+    continuation 방식의 1-D sweep : 각 격자 점을 y0 = 0 대신 바로 앞 점의 마지막 state에서 시작하고,
+    chunk 초씩 적분하다가 steady state 또는 periodic orbit이 확인되면 바로 다음 점으로 넘어감
+    (이웃한 점의 attractor는 서로 가까우므로 transient가 거의 없음)
+    values 순서대로 진행하므로 bistable 구간에서는 앞 점과 같은 branch를 따라감
+
+    name, values : 바꿀 파라미터 이름과 값 배열 (촘촘하고 정렬되어 있을수록 효과가 큼)
+    y0 : 첫 점의 초기조건 (기본값 모두 0)
+    base_params : 바꾸지 않는 파라미터 (기본값 params 또는 모델의 기본 파라미터)
+    dt, chunk, t_max : 출력 간격, 한 번에 적분하는 시간, 한 점에서 적분하는 최대 시간 (초)
+    rtol, atol : steady / periodic 판정 기준
+    detect : periodic orbit 판정에 쓰는 species 이름 (None이면 마지막 species, MAPK_model은 MAPK_PP)
+    return_status : True이면 점마다 'steady' / 'periodic' / 'unsettled'와 적분한 시간도 반환
+    compiled, jacobian : model_functions 참고 (MAPK_model에서만)
+    model : mainlab_model에 등록된 모델 이름 또는 ODEModel (None이면 MAPK_model)
+
+    반환 : sweep_parameter와 같은 (len(values), len(species), len(STATS)) 배열
+           (steady면 마지막 chunk, periodic이면 마지막 2주기, 끝까지 판정이 안 되면 마지막 chunk 기준)
+    """
+    model, param_names, species, base_params = resolve_model(model, base_params)
+    if model is not None and (compiled or jacobian):
+        raise ValueError("compiled, jacobian은 MAPK_model (model=None)에서만 쓸 수 있습니다")
+    y = np.zeros(len(species)) if y0 is None else np.asarray(y0, dtype=float)
+    column = param_names.index(name)
+    detect = len(species) - 1 if detect is None else species.index(detect)
+    func, Dfun = model_functions(compiled, jacobian) if model is None else (model.rhs_point, None)
+    t_chunk = np.arange(0, chunk + dt / 2, dt)
+    window_chunks = int(np.ceil(4000 / chunk))  # periodic 판정에 쓰는 구간 (약 4000초, 주기 1000~1300초의 peak 3개 이상)
+
+    results, status, t_used = [], [], []
+    for value in values:
+        point_params = np.array(base_params, dtype=float) if compiled else [float(p) for p in base_params]
+        point_params[column] = value
+        window = []
+        t_done = 0
+        while True:
+            sol = odeint(func, y, t_chunk, args=(point_params,), Dfun=Dfun)
+            y = sol[-1]
+            t_done += chunk
+            window = (window + [sol[1:]])[-window_chunks:]
+            state, summary = _settled(np.concatenate(window), sol[1:], detect, rtol, atol)
+            if state is not None or t_done >= t_max:
+                break
+        results.append(summary if state is not None else _summary(sol[1:]))
+        status.append(state or 'unsettled')
+        t_used.append(t_done)
+
+    results = np.array(results)
+    if return_status:
+        return results, status, np.array(t_used)
+    return results
+
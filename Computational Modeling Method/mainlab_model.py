@@ -0,0 +1,221 @@
+import ast
+import math
+
+import numpy as np
+from scipy.integrate import odeint
+
+# ODE 모델 정의 레이어
+# species 이름, 파라미터 이름 (기본값), 중간 변수 (conservation, reaction rate), species별 미분식을
+# 문자열로 선언하면 한 번만 Python 코드로 만들어서 컴파일함
+#   rhs(y, t, p)       : 여러 파라미터 세트를 한 번에 (NumPy broadcasting, odeint_batch용)
+#   rhs_point(y, t, p) : 한 세트 (float 계산, odeint에 바로 넘기는 MAPK_model과 같은 형식)
+# 새 모델을 스크립트마다 복사해서 만들지 않고 register로 등록해두면 sweep / continuation_sweep / detect에서
+# 이름 (또는 ODEModel)으로 골라서 쓸 수 있음
+
+# 식에서 쓸 수 있는 함수 (rhs에는 NumPy, rhs_point에는 math 버전)
+FUNCTIONS = ['exp', 'log', 'sqrt', 'abs']
+_VECTOR_FUNCTIONS = {'exp': np.exp, 'log': np.log, 'sqrt': np.sqrt, 'abs': np.abs}
+_POINT_FUNCTIONS = {'exp': math.exp, 'log': math.log, 'sqrt': math.sqrt, 'abs': abs}
+
+
+def _check_expr(expr, known, where):
+    # 식에 나오는 이름이 이미 정의된 species / 파라미터 / 중간 변수 / t / FUNCTIONS인지 확인
+    try:
+        tree = ast.parse(expr.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"{where}: 식을 해석할 수 없습니다: {expr!r}") from e
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id not in known and node.id not in FUNCTIONS:
+            raise ValueError(f"{where}: 정의되지 않은 이름입니다: {node.id}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS):
+            raise ValueError(f"{where}: {FUNCTIONS} 외의 함수는 쓸 수 없습니다: {expr!r}")
+        if isinstance(node, (ast.Attribute, ast.Subscript, ast.Lambda)):
+            raise ValueError(f"{where}: 식에는 이름, 숫자, 연산자와 함수 호출만 쓸 수 있습니다: {expr!r}")
+    return expr.strip()
+
+
+class ODEModel:
+    """
+    이름으로 선언한 ODE 모델
+
+    name : 모델 이름 (registry key)
+    species : species 이름 리스트 (y 순서)
+    params : {파라미터 이름: 기본값} (p 순서)
+    odes : {species 이름: d(species)/dt 식}, 모든 species에 대해 하나씩
+    assignments : {중간 변수 이름: 식}, 순서대로 계산 (앞에서 정의한 중간 변수를 뒤에서 쓸 수 있음)
+    description : 설명 (선택)
+
+    식은 Python 문법 (**, /, ...)이고 species, 파라미터, 중간 변수, 시간 t와 FUNCTIONS를 쓸 수 있음
+    """
+    def __init__(self, name, species, params, odes, assignments=None, description=''):
+        self.name = name
+        self.species = list(species)
+        self.param_names = list(params)
+        self.defaults = np.array([params[p] for p in self.param_names], dtype=float)
+        self.assignments = dict(assignments or {})
+        self.odes = dict(odes)
+        self.description = description
+        self._compile()
+
+    def _compile(self):
+        names = self.species + self.param_names + list(self.assignments)
+        for x in names:
+            if not x.isidentifier() or x.startswith('_') or x == 't' or x in FUNCTIONS:
+                raise ValueError(f"{self.name}: 사용할 수 없는 이름입니다: {x!r}")
+        if len(set(names)) != len(names):
+            raise ValueError(f"{self.name}: species / 파라미터 / 중간 변수 이름이 겹칩니다")
+        if set(self.odes) != set(self.species):
+            raise ValueError(f"{self.name}: odes에는 모든 species ({self.species})의 식이 하나씩 있어야 합니다")
+
+        known = set(self.species) | set(self.param_names) | {'t'}
+        assignments = []
+        for x, expr in self.assignments.items():
+            assignments.append((x, _check_expr(expr, known, f"{self.name}.{x}")))
+            known.add(x)
+        odes = [_check_expr(self.odes[s], known, f"{self.name}.d{s}") for s in self.species]
+        n, k = len(self.species), len(self.param_names)
+
+        # 여러 세트를 한 번에 : y (m, n) 또는 길이 m*n, p (k,) 또는 (m, k)
+        # 반환은 y와 같은 shape (y가 한 세트이고 p가 m개면 (m, n))
+        vector = ['def rhs(_y, t, _p):',
+                  f'    _Y = _np.reshape(_y, (-1, {n}))',
+                  f'    _P = _np.reshape(_np.asarray(_p, dtype=float), (-1, {k}))']
+        vector += [f'    {s} = _Y[:, {i}]' for i, s in enumerate(self.species)]
+        vector += [f'    {p} = _P[:, {i}]' for i, p in enumerate(self.param_names)]
+        vector += [f'    {x} = {expr}' for x, expr in assignments]
+        vector += [f'    _dY = _np.empty((max(len(_Y), len(_P)), {n}))']
+        vector += [f'    _dY[:, {i}] = {expr}' for i, expr in enumerate(odes)]
+        vector += ['    return _dY.reshape(_np.shape(_y)) if _dY.size == _np.size(_y) else _dY']
+
+        # 한 세트 : float 계산 (NumPy 배열 연산보다 작은 문제에서 훨씬 빠름)
+        point = ['def rhs_point(_y, t, _p):',
+                 f'    {", ".join(self.species)}, = _y',
+                 f'    {", ".join(self.param_names)}, = _p']
+        point += [f'    {x} = {expr}' for x, expr in assignments]
+        point += [f'    return [{", ".join(odes)}]']
+
+        self.source = '\n'.join(vector) + '\n\n\n' + '\n'.join(point) + '\n'
+        namespace = {'_np': np, **_VECTOR_FUNCTIONS}
+        exec(compile('\n'.join(vector), f'<{self.name}.rhs>', 'exec'), namespace)
+        self.rhs = namespace['rhs']
+        namespace = dict(_POINT_FUNCTIONS)
+        exec(compile('\n'.join(point), f'<{self.name}.rhs_point>', 'exec'), namespace)
+        self.rhs_point = namespace['rhs_point']
+
+    # 컴파일된 함수는 pickle할 수 없으므로 정의만 넘기고 (ProcessPoolExecutor) 받는 쪽에서 다시 컴파일
+    def __getstate__(self):
+        return {'name': self.name, 'species': self.species,
+                'params': dict(zip(self.param_names, self.defaults.tolist())),
+                'odes': self.odes, 'assignments': self.assignments, 'description': self.description}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return f"ODEModel({self.name!r}, species={self.species}, params={self.param_names})"
+
+    def param_vector(self, base=None, **values):
+        """
+        파라미터 배열 (base 또는 기본값에서 values만 바꿈), 예: model.param_vector(Ki=1.5)
+        """
+        p = np.array(self.defaults if base is None else base, dtype=float)
+        for name, value in values.items():
+            p[self.param_names.index(name)] = value
+        return p
+
+    def odeint(self, y0, t, params=None, **kwargs):
+        """
+        한 파라미터 세트로 적분 (rhs_point), params 기본값은 defaults
+        반환 : (len(t), len(species)) 배열
+        """
+        p = self.defaults if params is None else params
+        return odeint(self.rhs_point, np.asarray(y0, dtype=float), t, args=(list(map(float, p)),), **kwargs)
+
+    def odeint_batch(self, y0, t, params_batch, **kwargs):
+        """
+        파라미터 세트 m개를 (m * len(species))개 변수의 ODE 하나로 묶어서 한 번에 적분 (rhs)
+        세트끼리는 서로 영향이 없으므로 Jacobian은 block-diagonal (띠 폭 len(species) - 1)
+
+        y0 : 길이 len(species) (모든 세트 공통) 또는 (m, len(species))
+        반환 : (len(t), m, len(species)) 배열
+        """
+        params_batch = np.atleast_2d(np.asarray(params_batch, dtype=float))
+        m, n = len(params_batch), len(self.species)
+        Y0 = np.broadcast_to(np.asarray(y0, dtype=float), (m, n)).ravel()
+        sol = odeint(self.rhs, Y0, t, args=(params_batch,), ml=n - 1, mu=n - 1, **kwargs)
+        return sol.reshape(len(t), m, n)
+
+
+# 등록된 모델 {이름: ODEModel}
+MODELS = {}
+
+
+def register(model):
+    """
+    모델을 MODELS에 등록 (같은 이름이 있으면 덮어씀), 등록한 모델을 그대로 반환
+    """
+    MODELS[model.name] = model
+    return model
+
+
+def get_model(model):
+    """
+    ODEModel이면 그대로, 문자열이면 MODELS에서 찾아서 반환
+    """
+    if isinstance(model, ODEModel):
+        return model
+    if model not in MODELS:
+        raise ValueError(f"등록되지 않은 모델입니다: {model!r} (등록된 모델: {list(MODELS)})")
+    return MODELS[model]
+
+
+# MAPK cascade (mainlab_func.MAPK_model과 같은 식), conservation total도 파라미터로
+MAPK = register(ODEModel(
+    'MAPK',
+    species=['MKKK_P', 'MKK_P', 'MKK_PP', 'MAPK_P', 'MAPK_PP'],
+    params={
+        'V1': 2.5, 'n': 1, 'Ki': 9, 'K1': 10,
+        'V2': 0.25, 'K2': 8,
+        'k3': 0.025, 'K3': 15,
+        'k4': 0.025, 'K4': 15,
+        'V5': 0.75, 'K5': 15,
+        'V6': 0.75, 'K6': 15,
+        'k7': 0.025, 'K7': 15,
+        'k8': 0.025, 'K8': 15,
+        'V9': 0.5, 'K9': 15,
+        'V10': 0.5, 'K10': 15,
+        'MKKK_total': 100, 'MKK_total': 300, 'MAPK_total': 300,
+    },
+    assignments={
+        'MKKK': 'MKKK_total - MKKK_P',
+        'MKK': 'MKK_total - MKK_P - MKK_PP',
+        'MAPK': 'MAPK_total - MAPK_P - MAPK_PP',
+        'v1': 'V1 * MKKK / ((1 + (MAPK_PP / Ki) ** n) * (K1 + MKKK))',  # allosteric inhibition : negative feedback
+        'v2': 'V2 * MKKK_P / (K2 + MKKK_P)',
+        'v3': 'k3 * MKKK_P * MKK / (K3 + MKK)',
+        'v4': 'k4 * MKKK_P * MKK_P / (K4 + MKK_P)',
+        'v5': 'V5 * MKK_PP / (K5 + MKK_PP)',
+        'v6': 'V6 * MKK_P / (K6 + MKK_P)',
+        'v7': 'k7 * MKK_PP * MAPK / (K7 + MAPK)',
+        'v8': 'k8 * MKK_PP * MAPK_P / (K8 + MAPK_P)',
+        'v9': 'V9 * MAPK_PP / (K9 + MAPK_PP)',
+        'v10': 'V10 * MAPK_P / (K10 + MAPK_P)',
+    },
+    odes={
+        'MKKK_P': 'v1 - v2',
+        'MKK_P': 'v3 + v5 - v4 - v6',
+        'MKK_PP': 'v4 - v5',
+        'MAPK_P': 'v7 + v9 - v8 - v10',
+        'MAPK_PP': 'v8 - v9',
+    },
+    description='Kholodenko (2000) MAPK cascade with negative feedback',
+))
+
+# prelab 3.3.4 : X <-> X-P Michaelis-Menten (전체 X = 1, kinetic constant는 모두 1)
+PRELAB_334 = register(ODEModel(
+    'prelab_3.3.4',
+    species=['XP'],
+    params={'I': 1, 'Y': 1, 'k1': 1, 'k2': 1, 'Km1': 1, 'Km2': 1},
+    odes={'XP': 'k1 * I * (1 - XP) / (Km1 + (1 - XP)) - k2 * Y * XP / (Km2 + XP)'},
+    description='X-P Michaelis-Menten (prelab 3.3.4)',
+))
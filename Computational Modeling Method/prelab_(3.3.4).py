@@ -1,16 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
+from mainlab_model import get_model
 
 # X-P의 Michaelis-Menten equation
 # Assume all the kinetic constant parameter values (k) as 1
-def dXdt(XP, t, I, Y):
-    k1 = 1
-    k2 = 1
-    Km1 = 1
-    Km2 = 1
-    dXP = k1 * I * (1 - XP) / (Km1 + (1 - XP)) - k2 * Y * XP / (Km2 + XP)
-    return dXP
+# (식과 파라미터는 mainlab_model의 'prelab_3.3.4' 모델에 선언되어 있음)
+model = get_model('prelab_3.3.4')
 
 # 초기조건 필요, XP는 처음에는 없을 테니까 (X로부터 만들어질 거니까) 0으로
 XP0 = 0.0
@@ -22,9 +17,10 @@ t = np.linspace(0, 20, 200)
 params = [(0.5, 1), (1, 1), (2, 1), (1, 0.5), (1, 2)]
 
 plt.figure(figsize=(8,6))
-for I_val, Y_val in params:
-    XP = odeint(dXdt, XP0, t, args=(I_val, Y_val))
-    plt.plot(t, XP, label=f'I={I_val}, Y={Y_val}')
+# 다섯 세트를 odeint_batch로 한 번에 적분, XP의 shape (len(t), len(params), 1)
+XP = model.odeint_batch(XP0, t, [model.param_vector(I=I_val, Y=Y_val) for I_val, Y_val in params])
+for i, (I_val, Y_val) in enumerate(params):
+    plt.plot(t, XP[:, i, 0], label=f'I={I_val}, Y={Y_val}')
 
 # 그래프 그리기
 plt.title('Michaelis-Menton (Prelab 3.3.4)')
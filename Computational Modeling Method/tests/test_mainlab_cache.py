@@ -0,0 +1,77 @@
+import numpy as np
+
+import mainlab_func as ref
+from mainlab_cache import TrajectoryCache, trajectory_key
+
+t = np.linspace(0, 3000, 1000)
+y0 = np.zeros(5)
+
+
+def test_hit_returns_stored_array(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    sol = np.random.default_rng(0).random((10, 5))
+    cache.put('a', sol)
+    assert np.array_equal(cache.get('a'), sol)
+    assert cache.get('b') is None
+    # a new instance reads the same files through the manifest
+    assert np.array_equal(TrajectoryCache(str(tmp_path)).get('a'), sol)
+
+
+def test_lru_eviction(tmp_path):
+    cache = TrajectoryCache(str(tmp_path), max_entries=2)
+    for key in 'abc':
+        cache.put(key, np.full((4, 5), ord(key), dtype=float))
+    assert cache.get('a') is None
+    assert [key for key, _, _ in cache.entries()] == ['b', 'c']
+
+    # reading 'b' makes 'c' the least recently used
+    cache.get('b')
+    cache.put('d', np.zeros((4, 5)))
+    assert sorted(key for key, _, _ in cache.entries()) == ['b', 'd']
+
+    size = cache.entries()[0][1]
+    cache = TrajectoryCache(str(tmp_path), max_bytes=size)
+    cache.evict()
+    assert len(cache.entries()) == 1
+
+
+def test_key_rounding_and_options():
+    identity = ref.model_identity()
+    p = np.asarray(ref.params, dtype=float)
+    # the same Ki computed two ways differs only in the last bit
+    p1, p2 = p.copy(), p.copy()
+    p1[2], p2[2] = 2 ** np.arange(-10, 10.1, 0.1)[103], 2 ** np.arange(-10, 12, 0.05)[206]
+    assert trajectory_key(identity, p1, y0, t) == trajectory_key(identity, p2, y0, t)
+    p2[2] *= 1 + 1e-6
+    assert trajectory_key(identity, p1, y0, t) != trajectory_key(identity, p2, y0, t)
+
+    # batched and single-point integration agree only within tolerance, so their keys differ
+    single = trajectory_key(identity, p, y0, t, ref._key_options({}, batch=False))
+    batch = trajectory_key(identity, p, y0, t, ref._key_options({}, batch=True))
+    batch_jacobian = trajectory_key(identity, p, y0, t, ref._key_options({}, batch=True, jacobian=True))
+    assert len({single, batch, batch_jacobian}) == 3
+
+
+def test_cached_integration_matches_uncached(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    params_batch = np.tile(np.asarray(ref.params, dtype=float), (3, 1))
+    params_batch[:, 2] = [0.5, 3, 20]
+
+    batch = ref.cached_odeint_batch(y0, t, params_batch, cache)
+    assert np.array_equal(batch, ref.odeint_batch(y0, t, params_batch))
+    assert np.array_equal(ref.cached_odeint_batch(y0, t, params_batch, cache), batch)
+
+    # the single-point path never returns a trajectory integrated inside a batch
+    single = ref.cached_odeint(y0, t, params_batch[1], cache)
+    assert np.array_equal(single, ref.odeint(ref.MAPK_model, y0, t, args=(list(params_batch[1]),)))
+    assert len(cache.entries()) == 4
+
+
+def test_sweep_with_cache_matches_uncached(tmp_path):
+    grid = {'Ki': [0.5, 3, 20]}
+    expected, status = ref.sweep(grid, t=t, transient=500, max_workers=1, return_status=True)
+    for _ in range(2):
+        cache = TrajectoryCache(str(tmp_path))
+        result, cached_status = ref.sweep(grid, t=t, transient=500, max_workers=1, cache=cache, return_status=True)
+        assert np.array_equal(result, expected)
+        assert np.array_equal(cached_status, status)
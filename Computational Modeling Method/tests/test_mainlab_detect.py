@@ -0,0 +1,36 @@
+import numpy as np
+from scipy.integrate import odeint
+
+import mainlab_detect as det
+import mainlab_func as ref
+
+t = np.linspace(0, 12000, 8000)
+
+
+def point(log2_Ki):
+    point_params = ref.params.copy()
+    point_params[2] = 2 ** log2_Ki
+    return point_params
+
+
+def test_classify_agrees_with_detect():
+    # classify (peaks on the time grid of a finished run) uses the same criterion as detect (peak events)
+    for log2_Ki in (-2, 0.585, 3, 6):
+        sol = odeint(ref.MAPK_model, [0] * 5, t, args=(point(log2_Ki),))
+        sustained = det.classify(t[1500:], sol[1500:]) == 'sustained'
+        assert sustained == (det.detect(point(log2_Ki))['status'] == 'sustained')
+    assert det.classify(t[1500:], sol[1500:]) == 'steady'
+
+
+def test_sweep_status_is_classify():
+    Kis = 2 ** np.array([-8, -2, 0.585, 6])
+    summary, status = ref.sweep_parameter('Ki', Kis, t=t, max_workers=1, return_status=True)
+    assert np.array_equal(summary, ref.sweep_parameter('Ki', Kis, t=t, max_workers=1))
+
+    sol = ref.odeint_batch(np.zeros(5), t, np.array([point(np.log2(Ki)) for Ki in Kis]))
+    assert status.tolist() == [det.classify(t[1500:], sol[1500:, j]) for j in range(len(Kis))]
+    assert det.oscillation_range(Kis, status) == (Kis[1], Kis[2])
+
+
+def test_oscillation_range_none():
+    assert det.oscillation_range(np.arange(3), ['steady', 'damped', 'unsettled']) is None
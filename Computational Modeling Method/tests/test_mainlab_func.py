@@ -0,0 +1,45 @@
+import numpy as np
+
+import mainlab_func as ref
+
+t = np.linspace(0, 12000, 8000)
+
+
+def central_difference(func, y, point_params, h=1e-6):
+    columns = []
+    for j in range(len(y)):
+        step = np.zeros(len(y))
+        step[j] = h
+        columns.append((np.asarray(func(y + step, 0, point_params)) - np.asarray(func(y - step, 0, point_params))) / (2 * h))
+    return np.array(columns).T
+
+
+def test_analytic_jacobian_matches_finite_difference():
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        y = rng.uniform(1, 90, 5)
+        point_params = list(ref.params)
+        point_params[2] = 2 ** rng.uniform(-5, 5)
+        expected = central_difference(ref.MAPK_model, y, point_params)
+        assert np.allclose(ref.MAPK_jacobian(y, 0, point_params), expected, rtol=1e-6, atol=1e-8)
+
+    # batch version : one 5x5 block per parameter set, and the banded layout odeint expects
+    params_batch = np.tile(np.asarray(ref.params, dtype=float), (3, 1))
+    params_batch[:, 2] = [0.5, 1.5, 9]
+    Y = rng.uniform(1, 90, (3, 5))
+    J = ref.MAPK_jacobian_batch(Y.ravel(), 0, params_batch)
+    band = ref._banded_jacobian_batch(Y.ravel(), 0, params_batch)
+    for k in range(3):
+        assert np.allclose(J[k], ref.MAPK_jacobian(Y[k], 0, list(params_batch[k])))
+        for i in range(5):
+            for j in range(5):
+                assert band[i - j + 4, 5 * k + j] == J[k, i, j]
+
+
+def test_jacobian_does_not_change_trajectories():
+    params_batch = np.tile(np.asarray(ref.params, dtype=float), (4, 1))
+    params_batch[:, 2] = 2 ** np.array([-4, 0.585, 3, 8])
+    plain, info = ref.odeint_batch(np.zeros(5), t, params_batch, full_output=True)
+    analytic = ref.odeint_batch(np.zeros(5), t, params_batch, jacobian=True)
+    assert np.allclose(plain, analytic, rtol=1e-3, atol=1e-3)
+    assert info['nfe'][-1] > 0
@@ -1,7 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
 import mainlab_func as ref
+from mainlab_cache import TrajectoryCache
 
 # 이전에 작성한 MAPK_model 함수는 생략
 
@@ -21,6 +21,9 @@ base_params = [
 
 y0 = [0, 0, 0, 0, 0]
 
+# 적분 결과 디스크 캐시 (같은 파라미터 / 초기조건 / 시간이면 다시 적분하지 않음, mainlab_cache)
+cache = TrajectoryCache()
+
 # 시간 (0~12000초 = 200분)
 t = np.linspace(0, 12000, 4000)
 # t = np.linspace(0, 5000, 5000)
@@ -41,7 +44,7 @@ MAPK_PP_min_Ki = []
 for Ki in Ki_values:
     params = base_params.copy()
     params[2] = Ki  # Ki 값 변경
-    sol = odeint(ref.MAPK_model, y0, t, args=(params,))
+    sol = ref.cached_odeint(y0, t, params, cache)
     MAPK_PP_steady = sol[steady_state_idx:, 4]
     MAPK_PP_max_Ki.append(np.max(MAPK_PP_steady))
     MAPK_PP_min_Ki.append(np.min(MAPK_PP_steady))
@@ -57,7 +60,7 @@ MAPK_PP_min_V1 = []
 for V1 in V1_values:
     params = base_params.copy()
     params[0] = V1  # V1 값 변경
-    sol = odeint(ref.MAPK_model, y0, t, args=(params,))
+    sol = ref.cached_odeint(y0, t, params, cache)
     MAPK_PP_steady = sol[steady_state_idx:, 4]
     MAPK_PP_max_V1.append(np.max(MAPK_PP_steady))
     MAPK_PP_min_V1.append(np.min(MAPK_PP_steady))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for modules/attractorSim on network/EMT_Network.bnet
+
+usage : python benchmark.py [num_of_state]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import networkx as nx
+from pyboolnet.file_exchange import bnet2primes
+from pyboolnet.prime_implicants import create_constants
+from pyboolnet.state_transition_graphs import primes2stg
+
+from modules.attractorSim import rand_initial_states, compute_attractor_from_primes, compute_attractor_stg, int2str
+from modules.functionalGraph import functional_graph_attractors, successor_array
+
+model_file = './network/EMT_Network.bnet'
+fix_dict = {'RAS': 1}
+
+
+def basins_shortest_path(stg):
+    # previous implementation : one nx.shortest_path per (stg node, attractor)
+    basins = []
+    for att in nx.simple_cycles(stg):
+        size = 0
+        for node in stg.nodes:
+            try:
+                nx.shortest_path(stg, node, att[0])
+                size += 1
+            except nx.NetworkXNoPath:
+                continue
+        basins.append((tuple(sorted(att)), size))
+    return sorted(basins)
+
+
+def basins_reverse_bfs(stg):
+    return sorted((tuple(sorted(att)), len(nx.ancestors(stg, att[0])) + 1) for att in nx.simple_cycles(stg))
+
+
+def landscape(attrs_dict):
+    return sorted((tuple(sorted(v['attractors'])), v['basinsizes']) for v in attrs_dict.values())
+
+
+def bench_basins(primes, initState):
+    start = time.time()
+    stg = primes2stg(primes, 'synchronous', int2str(initState, len(primes)))
+    t_stg = time.time() - start
+
+    start = time.time()
+    old = basins_shortest_path(stg)
+    t_old = time.time() - start
+
+    start = time.time()
+    new = basins_reverse_bfs(stg)
+    t_new = time.time() - start
+
+    assert old == new
+    assert landscape(compute_attractor_stg(primes, 'synchronous', initState)) == new
+    assert landscape(compute_attractor_from_primes(primes, 'synchronous', initState)) == new
+    print(f'[basins] primes2stg : {t_stg:.2f} s ({stg.number_of_nodes()} states)')
+    print(f'[basins] shortest_path : {t_old:.2f} s, reverse BFS : {t_new:.2f} s, speedup x{t_old / t_new:.1f}')
+
+
+def bench_cycles(primes, initState):
+    # nx.simple_cycles vs the functional-graph finder on the same synchronous stg
+    stg = primes2stg(primes, 'synchronous', int2str(initState, len(primes)))
+
+    start = time.time()
+    old = sorted(tuple(sorted(att)) for att in nx.simple_cycles(stg))
+    t_old = time.time() - start
+
+    start = time.time()
+    states, succ = successor_array(stg.edges())
+    cycles, labels = functional_graph_attractors(succ)
+    t_new = time.time() - start
+
+    assert old == sorted(tuple(sorted(states[x] for x in cycle)) for cycle in cycles)
+    print(f'[cycles] simple_cycles : {t_old:.2f} s, functional graph : {t_new:.2f} s, speedup x{t_old / t_new:.1f}')
+
+
+def bench_sync_fast(primes, initState):
+    start = time.time()
+    ref = compute_attractor_stg(primes, 'synchronous', initState)
+    t_ref = time.time() - start
+
+    start = time.time()
+    fast = compute_attractor_from_primes(primes, 'synchronous', initState)
+    t_fast = time.time() - start
+
+    assert landscape(ref) == landscape(fast)
+    print(f'[engine] pyboolnet stg : {t_ref:.2f} s, packed engine : {t_fast:.2f} s, speedup x{t_ref / t_fast:.1f}')
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.time()
+    func(*args)
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def bench_packed_states(primes, initState):
+    # '0101...' strings through the pyboolnet stg (the previous 'synchronous' default)
+    # vs packed uint64 states through the default 'synchronous' engine
+    init_str = int2str(initState, len(primes))
+    t_str, m_str = measure(compute_attractor_stg, primes, 'synchronous', init_str)
+    t_int, m_int = measure(compute_attractor_from_primes, primes, 'synchronous', initState)
+    print(f'[states] strings : {t_str:.2f} s, peak {m_str:.1f} MiB (+{sys.getsizeof(init_str[0]) * len(init_str) / 2**20:.1f} MiB of input strings)')
+    print(f'[states] packed  : {t_int:.2f} s, peak {m_int:.1f} MiB (+{initState.nbytes / 2**20:.1f} MiB of input states)')
+
+
+if __name__ == '__main__':
+    num_of_state = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    primes = bnet2primes(model_file)
+    primes_new = create_constants(primes, fix_dict, copy=True)
+    initState = rand_initial_states(num_of_state, len(primes), seed=0)
+    print(f'EMT network : {len(primes)} nodes, {num_of_state} initial states, fixed {fix_dict}')
+    bench_basins(primes_new, initState)
+    bench_cycles(primes_new, initState)
+    bench_sync_fast(primes_new, initState)
+    bench_packed_states(primes_new, initState)
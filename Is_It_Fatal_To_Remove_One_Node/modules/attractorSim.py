@@ -11,16 +11,24 @@ Created on Tue Sep  8 15:25:04 2020
 
 import os
 import time
+import inspect
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
 from collections import defaultdict
+from dataclasses import dataclass, field
 import networkx as nx
 from typing import List, Dict
-import random
+from scipy.sparse import csr_matrix, identity
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import spsolve
 
 from pyboolnet.prime_implicants import create_constants
 from pyboolnet.state_transition_graphs import primes2stg
 
+from .landscapeCache import landscape_key
+from .functionalGraph import functional_graph_attractors, successor_array
+
 my_env = os.environ.copy()
 my_env["PATH"]
 Vector1 = Dict[str, str]
@@ -30,57 +38,554 @@ Vector2 = List[str]
 #===========================================================
 # Random sampling
 #===========================================================
-def rand_initial_states(num_of_state, num_of_nodes):
+def rand_initial_states(num_of_state, num_of_nodes, seed=None, mode='random'):
     """
-    # generate random Boolean initial states
-    
+    # generate unique Boolean initial states
+    # returns packed states (np.uint64, see 'str2int') for up to 64 nodes
+    # and a (states x nodes) uint8 bit array for larger networks
+
+    Parameters
+    ----------
+    num_of_state : int (ignored in 'exhaustive' mode)
+    num_of_nodes : int
+    seed : int or None (same seed -> same initial states)
+    mode : str ('random' : uniform sampling without replacement
+                'stratified' : one state from each of num_of_state (nearly) equal blocks of the state space
+                'exhaustive' : all 2**num_of_nodes states)
+    """
+    rng = np.random.default_rng(seed)
+    num_of_packed = min(num_of_nodes, 64)
+    space = 2**num_of_packed
+
+    if mode == 'exhaustive':
+        if num_of_nodes > 32:
+            raise ValueError(f"exhaustive enumeration of 2**{num_of_nodes} states is not supported")
+        return np.arange(space, dtype=np.uint64)
+    if num_of_state > 2**num_of_nodes:
+        raise ValueError(f"cannot draw {num_of_state} unique states from 2**{num_of_nodes}")
+
+    if mode == 'stratified':
+        # the remainder of space / num_of_state is spread over the first strata (one state each),
+        # so the strata cover the whole state space (width - 1 fits in uint64 even for one 2**64 stratum)
+        width, extra = divmod(space, num_of_state)
+        strata = np.arange(num_of_state, dtype=np.uint64)
+        offsets = strata * np.uint64(width - 1) + strata + np.minimum(strata, np.uint64(extra))
+        highs = np.uint64(width - 1) + (strata < extra).astype(np.uint64)
+        states = offsets + rng.integers(0, highs, dtype=np.uint64, endpoint=True)
+    elif mode != 'random':
+        raise ValueError(f"unknown sampling mode '{mode}'")
+    elif num_of_nodes > 64:
+        states = np.empty((0, num_of_nodes), dtype=np.uint8)
+        while len(states) < num_of_state:
+            draw = rng.integers(0, 1, (num_of_state - len(states), num_of_nodes), dtype=np.uint8, endpoint=True)
+            states = np.unique(np.vstack([states, draw]), axis=0)
+        return rng.permutation(states)
+    elif num_of_state * 4 > space:
+        # dense sampling : a permutation of the (small) state space
+        states = rng.permutation(space)[:num_of_state].astype(np.uint64)
+    else:
+        # sparse sampling : rejection of duplicates, no range of size 2**num_of_nodes is built
+        states = np.empty(0, dtype=np.uint64)
+        while len(states) < num_of_state:
+            draw = rng.integers(0, space - 1, num_of_state - len(states), dtype=np.uint64, endpoint=True)
+            states = np.union1d(states, draw)
+        states = rng.permutation(states)
+
+    if num_of_nodes > 64:
+        # stratified over the first 64 nodes, remaining nodes drawn uniformly
+        rest = rng.integers(0, 1, (num_of_state, num_of_nodes - 64), dtype=np.uint8, endpoint=True)
+        return np.hstack([int2array(states, 64), rest])
+    return states
+
+#===========================================================
+# Packed states
+#===========================================================
+def str2int(states):
+    """
+    # pack states into np.uint64 : node i of sorted(primes) is bit (n-1-i),
+    # i.e. a packed state equals int(state_str, 2) of the pyboolnet state string
+
+    Parameters
+    ----------
+    states : List of '0101...' strings, a (states x nodes) bit array,
+             or packed states (returned as np.uint64)
+    """
+    if isinstance(states, np.ndarray) and states.ndim == 2:
+        if states.shape[1] > 64:
+            raise ValueError(f"packed states support up to 64 nodes, got {states.shape[1]}")
+        shifts = np.arange(states.shape[1] - 1, -1, -1, dtype=np.uint64)
+        return np.bitwise_or.reduce(states.astype(np.uint64) << shifts, axis=1)
+    if isinstance(states, np.ndarray):
+        return states.astype(np.uint64, copy=False)
+    if isinstance(states, str):
+        states = [states]
+    return np.array([int(x, 2) for x in states], dtype=np.uint64)
+
+def int2str(states, num_of_nodes):
+    """
+    # '0101...' strings of packed states (output boundary / pyboolnet input)
+
+    Parameters
+    ----------
+    states : np.ndarray (uint64, or a (states x nodes) bit array)
+    num_of_nodes : int
+    """
+    if states.ndim == 2:
+        return [''.join(map(str, x)) for x in states.tolist()]
+    return [format(int(x), f'0{num_of_nodes}b') for x in states]
+
+def int2array(states, num_of_nodes):
+    """
+    # unpack packed states into a (states x nodes) 0/1 array in sorted(primes) order
+
+    Parameters
+    ----------
+    states : np.ndarray (uint64)
+    num_of_nodes : int
+    """
+    shifts = np.arange(num_of_nodes - 1, -1, -1, dtype=np.uint64)
+    return ((np.asarray(states, dtype=np.uint64)[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+def str2states(states, num_of_nodes):
+    """
+    # states of a network : packed np.uint64 (see 'str2int') for up to 64 nodes,
+    # a (states x nodes) uint8 bit array for larger networks
+
     Parameters
     ----------
-    num_of_state : int
-    num_of_nodes : int     
+    states : List of '0101...' strings
+    num_of_nodes : int
     """
-    if (num_of_nodes <= 32) | (num_of_state*10000 > (2**num_of_nodes)) :     
-        rand_int = random.sample(range(2**num_of_nodes), num_of_state)
-    else :
-        range_num = num_of_state*100000
-        rand_int = random.sample(range(range_num), num_of_state)
-        print("WARNING : Out of memory!")
-        
-    s = [bin(x)[2:] for x in list(rand_int)]
-    initset = [('0'*(num_of_nodes-len(x))+x) for x in list(s)]   
+    if num_of_nodes <= 64:
+        return str2int(states)
+    return np.array([[int(y) for y in x] for x in states], dtype=np.uint8).reshape(-1, num_of_nodes)
 
-    return initset
+def states2array(states, num_of_nodes):
+    """
+    # (states x nodes) 0/1 array of packed states or of a bit array (returned as it is)
+    """
+    if isinstance(states, np.ndarray) and states.ndim == 2:
+        return states
+    return int2array(states, num_of_nodes)
 
 #===========================================================
 # Basins of attraction
 #===========================================================
-def compute_attractor_from_primes(primes, update_mode, initState):
+def compute_attractor_from_primes(primes, update_mode, initState, cache=None, engine_options=None):
+    """
+    # compute attractors and basin sizes of the stg reached from initState
+    # up to 64 nodes 'synchronous' and 'synchronous-fast' both run the packed-state engine
+    # ('compute_attractor_sync_fast') and 'asynchronous' the terminal-SCC engine ('compute_attractor_async') ;
+    # larger synchronous networks go through the pyboolnet stg ('compute_attractor_stg')
+
+    Parameters
+    ----------
+    primes : primes (@pyboolnet)
+    update_mode : str ('synchronous', 'synchronous-fast' or 'asynchronous')
+    initState : List or np.ndarray (random sampling)
+    cache : LandscapeCache or None (@modules.landscapeCache)
+    engine_options : Dict or None (keyword arguments of 'compute_attractor_async', e.g.
+                     {'seed': 0, 'max_attractor_states': 4000000} ; 'asynchronous' only)
+                     the random walks of an unseeded asynchronous run are not reproducible,
+                     so such runs bypass the cache
+
+    Returns
+    -------
+    attrs_fromSTG : {idx: {'attractors': tuple of state strings,
+                           'states': packed states (np.uint64, a bit array above 64 nodes, see 'str2states'),
+                           'basinsizes': int, 'perc': float}}
+    """
+    options = None
+    if update_mode == 'asynchronous':
+        # every engine parameter (with its default) is part of the cache key
+        defaults = {name: p.default for name, p in inspect.signature(compute_attractor_async).parameters.items()
+                    if p.default is not inspect.Parameter.empty}
+        options = {**defaults, **(engine_options or {})}
+        if options['seed'] is None:
+            cache = None
+    if cache is not None:
+        key = landscape_key(primes, update_mode, initState, options)
+        attrs_fromSTG = cache.get(key)
+        if attrs_fromSTG is None:
+            attrs_fromSTG = compute_attractor_from_primes(primes, update_mode, initState, engine_options=engine_options)
+            cache.put(key, attrs_fromSTG)
+        return attrs_fromSTG
+
+    if update_mode == 'synchronous-fast' or (update_mode == 'synchronous' and len(primes) <= 64):
+        return compute_attractor_sync_fast(primes, initState)
+    if update_mode == 'asynchronous':
+        return compute_attractor_async(primes, initState, **(engine_options or {}))
+    return compute_attractor_stg(primes, update_mode, initState)
+
+
+def compute_attractor_stg(primes, update_mode, initState):
     """
     # compute basin sizes from stg computed by (@pyboolnet)
-    # using pyboolnet.state_transition_graphs.primes2stg
-    
+    # using pyboolnet.state_transition_graphs.primes2stg (state strings in and out,
+    # the default for synchronous networks above 64 nodes)
+    # synchronous stg : cycles and basins of the functional graph (@modules.functionalGraph)
+    # otherwise basin of an attractor = every stg node with a path to it,
+    # collected by one reverse BFS (nx.ancestors) per attractor
+
     Parameters
     ----------
     primes : primes (@pyboolnet)
     update_mode : str ('synchronous' or 'asynchronous')
-    initState : List (random sampling)
+    initState : List or np.ndarray (random sampling)
     """
+    if isinstance(initState, np.ndarray):
+        # pyboolnet takes state strings
+        initState = int2str(initState, len(primes))
     stg = primes2stg(primes, update_mode, initState)
-    
+    num_of_stg_nodes = stg.number_of_nodes()
+
     attrs_fromSTG = defaultdict()
+    if update_mode == 'synchronous':
+        # one successor per state: cycles and basins from the successor array
+        states, succ = successor_array(stg.edges())
+        cycles, labels = functional_graph_attractors(succ)
+        basinsizes = np.bincount(labels, minlength=len(cycles))
+        for idx, cycle in enumerate(cycles):
+            attrs_fromSTG[idx] = defaultdict()
+            attrs_fromSTG[idx]['attractors'] = tuple(str(states[x]) for x in cycle)
+            attrs_fromSTG[idx]['states'] = str2states(attrs_fromSTG[idx]['attractors'], len(primes))
+            attrs_fromSTG[idx]['basinsizes'] = int(basinsizes[idx])
+            attrs_fromSTG[idx]['perc'] = attrs_fromSTG[idx]['basinsizes'] / num_of_stg_nodes
+        return attrs_fromSTG
+
     for idx, att in enumerate(nx.simple_cycles(stg)):
         attrs_fromSTG[idx] = defaultdict()
         attrs_fromSTG[idx]['attractors'] = tuple(str(x) for x in att)
-        attrs_fromSTG[idx]['basinsizes'] = 0
-        
-        for node in stg.nodes:
-            try:
-                nx.shortest_path(stg, node, att[0])
-                attrs_fromSTG[idx]['basinsizes'] += 1
-            except: # there is no path
-                continue
-            
-        attrs_fromSTG[idx]['perc'] = attrs_fromSTG[idx]['basinsizes'] / len(stg.nodes())
+        attrs_fromSTG[idx]['states'] = str2states(attrs_fromSTG[idx]['attractors'], len(primes))
+        # ancestors() excludes the attractor state itself
+        attrs_fromSTG[idx]['basinsizes'] = len(nx.ancestors(stg, att[0])) + 1
+        attrs_fromSTG[idx]['perc'] = attrs_fromSTG[idx]['basinsizes'] / num_of_stg_nodes
+    return attrs_fromSTG
+
+
+#===========================================================
+# Synchronous update engine (packed uint64 states)
+#===========================================================
+def compile_primes(primes):
+    """
+    # compile the ON-prime implicants of every node into bit masks
+    # node i of sorted(primes) is stored at bit (n-1-i) of a uint64 state,
+    # so a packed state equals int(state_str, 2) of the pyboolnet state string
+    # an implicant holds for a state s iff (s & mask) == value
+
+    Parameters
+    ----------
+    primes : primes (@pyboolnet)
+    """
+    nodeList = sorted(primes)
+    num_of_nodes = len(nodeList)
+    if num_of_nodes > 64:
+        raise ValueError(f"packed states support up to 64 nodes, got {num_of_nodes}")
+    bit = {node: num_of_nodes - 1 - i for i, node in enumerate(nodeList)}
+
+    program = []
+    for node in nodeList:
+        masks, values = [], []
+        for implicant in primes[node][1]:
+            mask, value = 0, 0
+            for m, v in implicant.items():
+                mask |= 1 << bit[m]
+                value |= v << bit[m]
+            masks.append(mask)
+            values.append(value)
+        program.append((np.uint64(bit[node]), np.array(masks, dtype=np.uint64), np.array(values, dtype=np.uint64)))
+    return program
+
+
+def sync_update(program, states):
+    """
+    # synchronous successors of all packed states at once
+
+    Parameters
+    ----------
+    program : the output of 'compile_primes'
+    states : np.ndarray (uint64)
+    """
+    next_states = np.zeros_like(states)
+    for bit, masks, values in program:
+        active = np.zeros(states.shape, dtype=bool)
+        for mask, value in zip(masks, values):
+            active |= (states & mask) == value
+        next_states |= active.astype(np.uint64) << bit
+    return next_states
+
+
+def compute_attractor_sync_fast(primes, initState):
+    """
+    # synchronous attractors and basin sizes without building the networkx stg
+    # all sampled states are advanced together until no new state is reached,
+    # so the explored states are the nodes of primes2stg(primes, 'synchronous', initState)
+
+    Parameters
+    ----------
+    primes : primes (@pyboolnet)
+    initState : List or np.ndarray (random sampling)
+    """
+    num_of_nodes = len(primes)
+    program = compile_primes(primes)
+
+    frontier = np.unique(str2int(initState))
+    states = [frontier]
+    successors = []
+    seen = frontier
+    while frontier.size:
+        next_states = sync_update(program, frontier)
+        successors.append(next_states)
+        frontier = np.setdiff1d(next_states, seen)
+        if frontier.size:
+            states.append(frontier)
+            seen = np.union1d(seen, frontier)
+
+    states = np.concatenate(states)
+    successors = np.concatenate(successors)
+    order = np.argsort(states)
+    states, successors = states[order], successors[order]
+    succ = np.searchsorted(states, successors)
+
+    cycles, labels = functional_graph_attractors(succ)
+    basinsizes = np.bincount(labels, minlength=len(cycles))
+
+    attrs_fromSTG = defaultdict()
+    for idx, cycle in enumerate(cycles):
+        attrs_fromSTG[idx] = defaultdict()
+        attrs_fromSTG[idx]['states'] = states[cycle]
+        attrs_fromSTG[idx]['attractors'] = tuple(int2str(states[cycle], num_of_nodes))
+        attrs_fromSTG[idx]['basinsizes'] = int(basinsizes[idx])
+        attrs_fromSTG[idx]['perc'] = attrs_fromSTG[idx]['basinsizes'] / len(states)
+    return attrs_fromSTG
+
+
+#===========================================================
+# Asynchronous update engine (terminal SCCs)
+#===========================================================
+def async_successors(program, states):
+    """
+    # asynchronous stg edges of packed states : one successor per node whose
+    # update changes its value, a self-loop for steady states (as in primes2stg)
+
+    Parameters
+    ----------
+    program : the output of 'compile_primes'
+    states : np.ndarray (uint64)
+
+    Returns
+    -------
+    (source index, successor state) arrays
+    """
+    diff = states ^ sync_update(program, states)
+    sources, successors = [np.flatnonzero(diff == 0)], [states[diff == 0]]
+    for bit, _, _ in program:
+        flip = np.uint64(1) << bit
+        idx = np.flatnonzero(diff & flip)
+        sources.append(idx)
+        successors.append(states[idx] ^ flip)
+    return np.concatenate(sources), np.concatenate(successors)
+
+
+def async_random_step(program, states, rng):
+    """
+    # one asynchronous update per state : a node whose update changes its value
+    # is chosen uniformly at random and flipped (steady states stay)
+
+    Parameters
+    ----------
+    program : the output of 'compile_primes'
+    states : np.ndarray (uint64)
+    rng : np.random.Generator
+    """
+    num_of_nodes = len(program)
+    unstable = int2array(states ^ sync_update(program, states), num_of_nodes)
+    choice = np.argmax(rng.random(unstable.shape) * unstable, axis=1)
+    flip = np.uint64(1) << (num_of_nodes - 1 - choice).astype(np.uint64)
+    return np.where(unstable.any(axis=1), states ^ flip, states)
+
+
+def _async_reachable(program, states, max_states):
+    # stg reachable from states, or None when it has more than max_states states
+    frontier = np.unique(states)
+    chunks, sources, successors = [], [], []
+    seen = frontier
+    offset = 0
+    while frontier.size:
+        if offset + frontier.size > max_states:
+            return None
+        src, succ = async_successors(program, frontier)
+        chunks.append(frontier)
+        sources.append(src + offset)
+        successors.append(succ)
+        offset += len(frontier)
+        frontier = np.setdiff1d(succ, seen)
+        seen = np.union1d(seen, frontier)
+
+    reachable = np.concatenate(chunks)
+    order = np.argsort(reachable)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    reachable = reachable[order]
+    src = rank[np.concatenate(sources)]
+    dst = np.searchsorted(reachable, np.concatenate(successors))
+    return reachable, src, dst
+
+
+def _terminal_sccs(num_of_states, src, dst):
+    # strongly connected components (scipy csgraph, linear time) and the terminal ones
+    graph = csr_matrix((np.ones(len(src)), (src, dst)), shape=(num_of_states, num_of_states))
+    num_of_scc, scc = connected_components(graph, directed=True, connection='strong')
+    terminal = np.ones(num_of_scc, dtype=bool)
+    leaves = scc[src] != scc[dst]
+    terminal[scc[src[leaves]]] = False
+    return scc, terminal
+
+
+def _scc_levels(scc, terminal, src, dst):
+    # level of every SCC = longest path (in SCCs) to an attractor : terminal SCCs are level 0
+    # and every edge between two SCCs goes to a lower level (SCCs are peeled from the
+    # attractors backwards, layer by layer as in @modules.functionalGraph)
+    num_of_scc = len(terminal)
+    between = scc[src] != scc[dst]
+    edges = np.unique(np.stack([scc[src[between]], scc[dst[between]]], axis=1), axis=0)
+    out_degree = np.bincount(edges[:, 0], minlength=num_of_scc)
+    predecessors = csr_matrix((np.ones(len(edges)), (edges[:, 1], edges[:, 0])), shape=(num_of_scc, num_of_scc))
+    level = np.zeros(num_of_scc, dtype=np.int64)
+    frontier = np.flatnonzero(terminal)
+    depth = 0
+    while frontier.size:
+        level[frontier] = depth
+        sources = predecessors[frontier].indices
+        np.subtract.at(out_degree, sources, 1)
+        sources = np.unique(sources)
+        frontier = sources[out_degree[sources] == 0]
+        depth += 1
+    return level
+
+
+def _absorption(reachable, src, dst):
+    # attractors (terminal SCCs) of a closed stg and the probability that an asynchronous
+    # walk from each state ends in each of them, solved level by level from the attractors :
+    # absorbed = transition @ absorbed only couples the states of one SCC, so a level of
+    # single-state SCCs is one sparse product and other SCCs need a small sparse solve
+    num_of_states = len(reachable)
+    scc, terminal = _terminal_sccs(num_of_states, src, dst)
+    members = [np.flatnonzero(scc == c) for c in np.flatnonzero(terminal)]
+    absorbed = np.zeros((num_of_states, len(members)))
+    for idx, m in enumerate(members):
+        absorbed[m, idx] = 1
+
+    out_degree = np.bincount(src, minlength=num_of_states)
+    transition = csr_matrix((1 / out_degree[src], (src, dst)), shape=(num_of_states, num_of_states))
+    state_level = _scc_levels(scc, terminal, src, dst)[scc]
+    for depth in range(1, state_level.max(initial=0) + 1):
+        states = np.flatnonzero(state_level == depth)
+        rows = transition[states]
+        # absorbed[states] is still 0 : rhs only holds the exits to lower levels
+        rhs = rows @ absorbed
+        inner = rows[:, states]
+        if inner.nnz:
+            rhs = spsolve(identity(len(states), format='csc') - inner.tocsc(), rhs).reshape(rhs.shape)
+        absorbed[states] = rhs
+    return [reachable[m] for m in members], absorbed
+
+
+def compute_attractor_async(primes, initState, max_states=100000, max_attractor_states=2000000,
+                            walk_length=None, max_rounds=20, seed=None):
+    """
+    # asynchronous attractors = terminal strongly connected components of the stg
+    # basin membership is probabilistic : each asynchronous successor is chosen with
+    # equal probability, and 'perc' is the probability that a sampled state ends in
+    # the attractor (states leading to several attractors are shared, perc sums to 1)
+    #
+    # - reachable stg up to max_states : exact terminal SCCs and absorption probabilities
+    # - larger (e.g. the 31-node EMT network) : all samples take random asynchronous walks
+    #   together ; then the stg reachable from one unresolved walker is built (up to
+    #   max_attractor_states) and every walker inside it gets its exact absorption
+    #   probabilities, until all walkers are resolved (with RAS=1 the EMT network has a
+    #   complex attractor of 229376 states, so only the closed subspaces around attractors are built)
+
+    Parameters
+    ----------
+    primes : primes (@pyboolnet)
+    initState : List or np.ndarray (random sampling)
+    max_states : int (budget of the exact stg built from the samples)
+    max_attractor_states : int (budget of the stg built from one walker)
+    walk_length : int (random steps before each round of attractor checks, default : 4 x number of nodes)
+    max_rounds : int (rounds before giving up)
+    seed : int or None (random walks)
+    """
+    num_of_nodes = len(primes)
+    program = compile_primes(primes)
+    samples = str2int(initState)
+
+    reach = _async_reachable(program, samples, max_states)
+    if reach is not None:
+        reachable = reach[0]
+        attractors, absorbed = _absorption(*reach)
+        weights = absorbed[np.searchsorted(reachable, samples)].sum(axis=0)
+    else:
+        rng = np.random.default_rng(seed)
+        walk_length = walk_length or 4 * num_of_nodes
+        walkers = samples.copy()
+        active = np.arange(len(walkers))
+        # states of the attractors found so far (sorted) and their attractor index
+        known_states = np.empty(0, dtype=np.uint64)
+        known_labels = np.empty(0, dtype=np.int64)
+        attractors = []
+        weights = np.zeros(0)
+        for _ in range(max_rounds):
+            for _ in range(walk_length):
+                walkers[active] = async_random_step(program, walkers[active], rng)
+
+            while active.size:
+                # walkers already sitting in a known attractor
+                if len(known_states):
+                    pos = np.minimum(np.searchsorted(known_states, walkers[active]), len(known_states) - 1)
+                    found = known_states[pos] == walkers[active]
+                    np.add.at(weights, known_labels[pos[found]], 1)
+                    active = active[~found]
+                    if not active.size:
+                        break
+
+                # closed stg reachable from one walker : exact absorption of every walker inside it
+                reach = _async_reachable(program, walkers[rng.choice(active, 1)], max_attractor_states)
+                if reach is None:
+                    break
+                reachable = reach[0]
+                members, absorbed = _absorption(*reach)
+                labels = []
+                for states in members:
+                    pos = np.searchsorted(known_states, states[0])
+                    if pos < len(known_states) and known_states[pos] == states[0]:
+                        labels.append(known_labels[pos])
+                        continue
+                    labels.append(len(attractors))
+                    attractors.append(states)
+                    weights = np.append(weights, 0)
+                    known_states = np.concatenate([known_states, states])
+                    known_labels = np.concatenate([known_labels, np.full(len(states), labels[-1])])
+                    order = np.argsort(known_states)
+                    known_states, known_labels = known_states[order], known_labels[order]
+                pos = np.minimum(np.searchsorted(reachable, walkers[active]), len(reachable) - 1)
+                inside = reachable[pos] == walkers[active]
+                weights[labels] += absorbed[pos[inside]].sum(axis=0)
+                active = active[~inside]
+            if not active.size:
+                break
+        else:
+            raise RuntimeError(f"{len(active)} random walks did not reach an attractor whose reachable stg has at "
+                               f"most {max_attractor_states} states ; increase 'max_attractor_states' (or "
+                               f"'walk_length' / 'max_rounds') in engine_options of 'compute_attractor_from_primes'")
+
+    attrs_fromSTG = defaultdict()
+    for idx, states in enumerate(attractors):
+        attrs_fromSTG[idx] = defaultdict()
+        attrs_fromSTG[idx]['states'] = states
+        attrs_fromSTG[idx]['attractors'] = tuple(int2str(states, num_of_nodes))
+        attrs_fromSTG[idx]['basinsizes'] = weights[idx]
+        attrs_fromSTG[idx]['perc'] = weights[idx] / len(samples)
     return attrs_fromSTG
 
 
@@ -104,10 +609,84 @@ def str2array(x):
         for idx, x0 in enumerate(x):
             array[idx,:] = np.array([int(x) for x in x0])
     return array
+
+def attractor_means(attrs_fromSTG, num_of_nodes):
+    """
+    # (attractors x nodes) matrix of mean node activities, nodes in sorted(primes) order
+
+    Parameters
+    ----------
+    attrs_fromSTG : the output of 'compute_attractor_from_primes'
+    num_of_nodes : int
+    """
+    states = [value['states'] for value in attrs_fromSTG.values()]
+    if not states:
+        return np.zeros((0, num_of_nodes))
+    lengths = np.array([len(x) for x in states])
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    bits = np.concatenate([states2array(x, num_of_nodes) for x in states])
+    return np.add.reduceat(bits, offsets, axis=0, dtype=np.float64) / lengths[:, None]
+
+def compile_phenotype(nodeList, phenotype, phenotypeAnnot):
+    """
+    # marker-index / expected-value table of a phenotype definition
+
+    Parameters
+    ----------
+    nodeList : List (column order of the attractor-mean matrix, e.g. sorted(primes))
+    phenotype : Dict ({phenotype:phenotype markers})
+    phenotypeAnnot : Dict (simple annotation of phenotype)
+
+    Returns
+    -------
+    Dict with (phenotypes x markers) 'index', 'expected' and 'valid' arrays
+    and the 'annot' of every phenotype
+    """
+    num_of_markers = max([len(marker) for marker in phenotype.values()], default=0)
+    shape = (len(phenotype), num_of_markers)
+    table = {'index': np.zeros(shape, dtype=np.int64),
+             'expected': np.zeros(shape, dtype=bool),
+             'valid': np.zeros(shape, dtype=bool),
+             'annot': np.array([phenotypeAnnot[name] for name in phenotype])}
+    node_index = {node: i for i, node in enumerate(nodeList)}
+    for p, marker in enumerate(phenotype.values()):
+        for k, (m, v) in enumerate(marker.items()):
+            table['index'][p, k] = node_index[m]
+            table['expected'][p, k] = bool(v)
+            table['valid'][p, k] = True
+    return table
+
+def classify_attractors(att_means, tables, default=10):
+    """
+    # phenotype annotation of every attractor for one or many phenotype definitions
+    # a node counts as active when its attractor mean is >= 0.5 ;
+    # when several phenotypes match, the last one wins (as in 'define_phenotype_from_att')
+
+    Parameters
+    ----------
+    att_means : np.ndarray (attractors x nodes, see 'attractor_means')
+    tables : the output of 'compile_phenotype', or a List of them
+    default : annotation of attractors matching no phenotype
+
+    Returns
+    -------
+    np.ndarray (attractors,) for one table, (attractors x tables) for a List
+    """
+    active = np.rint(np.nextafter(att_means, att_means + 1)) == 1
+    single = isinstance(tables, dict)
+    annots = []
+    for table in ([tables] if single else tables):
+        if len(table['annot']) == 0:
+            annots.append(np.full(len(att_means), default))
+            continue
+        match = ((active[:, table['index']] == table['expected']) | ~table['valid']).all(axis=2)
+        last = match.shape[1] - 1 - np.argmax(match[:, ::-1], axis=1)
+        annots.append(np.where(match.any(axis=1), table['annot'][last], default))
+    return annots[0] if single else np.stack(annots, axis=1)
     
 def compute_phenotype(primes, attrs_fromSTG, phenotype, phenotypeAnnot):
     """
-    # determine phenotype of an attractor 
+    # determine phenotype of every attractor in one classification call
 
     Parameters
     ----------    
@@ -116,9 +695,11 @@ def compute_phenotype(primes, attrs_fromSTG, phenotype, phenotypeAnnot):
     phenotype : Dict ({phenotype:phenotype markers})
     phenotypeAnnot : Dict (simple annotation of phenotype)
     """    
-    for idx in range(len(attrs_fromSTG)):
-        att = str2array(attrs_fromSTG[idx]['attractors'])
-        attrs_fromSTG[idx]['phenotype'] = define_phenotype_from_att(primes, phenotype, phenotypeAnnot, att)
+    nodeList = sorted(primes)
+    table = compile_phenotype(nodeList, phenotype, phenotypeAnnot)
+    annots = classify_attractors(attractor_means(attrs_fromSTG, len(nodeList)), table)
+    for idx, annot in zip(attrs_fromSTG, annots):
+        attrs_fromSTG[idx]['phenotype'] = annot.item()
 
     return attrs_fromSTG
 
@@ -127,87 +708,246 @@ def compute_phenotype(primes, attrs_fromSTG, phenotype, phenotypeAnnot):
 #===========================================================
 # Attractor simulation
 #===========================================================
+def _annot2name(phenotypeAnnot):
+    # reverse lookup of phenotypeAnnot (the first phenotype of an annotation names it)
+    annot2name = {}
+    for pheno, phenoIdx in phenotypeAnnot.items():
+        annot2name.setdefault(phenoIdx, pheno)
+    return annot2name
+
 def makePhenotypeDF(attrs_dict, phenotypeAnnot):
-    df = pd.DataFrame({'phenotype':[[pheno for pheno, phenoIdx in phenotypeAnnot.items() if phenoIdx == x][0] for x in [x['phenotype'] for x in attrs_dict.values()]],
+    annot2name = _annot2name(phenotypeAnnot)
+    df = pd.DataFrame({'phenotype':[annot2name.get(x['phenotype'], 'unclassified') for x in attrs_dict.values()],
                                      'Ratio':[x['perc'] for x in attrs_dict.values()]})
     pheno_df = df.groupby('phenotype').sum()
     return(pheno_df)
 
-def Simulation(constantDict, primes, update_mode, initState, phenotype, phenotypeAnnot):
+def basin_weighted_activity(attrs_dict, num_of_nodes):
+    """
+    # average node activity weighted by basin fractions (sorted(primes) order)
+    """
+    perc = np.array([value['perc'] for value in attrs_dict.values()])
+    return perc @ attractor_means(attrs_dict, num_of_nodes)
+
+def aggregate_landscapes(landscapes, nodeList, phenotypeAnnot):
+    """
+    # phenotype ratios and average node activities of many perturbations at once
+
+    Parameters
+    ----------
+    landscapes : Dict ({perturbation label: attrs_dict after 'compute_phenotype'})
+    nodeList : List (sorted(primes))
+    phenotypeAnnot : Dict (simple annotation of phenotype)
+
+    Returns
+    -------
+    tidy pd.DataFrame with columns 'perturbation', 'kind' ('phenotype' or 'activity'),
+    'name' (phenotype or node) and 'value'
+    """
+    labels = list(landscapes)
+    attrs = [value for attrs_dict in landscapes.values() for value in attrs_dict.values()]
+    owner = np.repeat(np.arange(len(labels)), [len(attrs_dict) for attrs_dict in landscapes.values()])
+    perc = np.array([value['perc'] for value in attrs], dtype=np.float64)
+
+    annot2name = _annot2name(phenotypeAnnot)
+    pheno = pd.DataFrame({'perturbation': owner,
+                          'name': [annot2name.get(value['phenotype'], 'unclassified') for value in attrs],
+                          'value': perc})
+    pheno = pheno.groupby(['perturbation', 'name'], sort=False, as_index=False)['value'].sum()
+    pheno.insert(1, 'kind', 'phenotype')
+
+    weighted = attractor_means(dict(enumerate(attrs)), len(nodeList)) * perc[:, None]
+    activity = np.zeros((len(labels), len(nodeList)))
+    np.add.at(activity, owner, weighted)
+    activity = pd.DataFrame({'perturbation': np.repeat(np.arange(len(labels)), len(nodeList)),
+                             'kind': 'activity',
+                             'name': np.tile(nodeList, len(labels)),
+                             'value': activity.ravel()})
+
+    tidy = pd.concat([pheno, activity], ignore_index=True).sort_values('perturbation', kind='stable', ignore_index=True)
+    tidy['perturbation'] = pd.Series(labels, dtype=object).iloc[tidy['perturbation']].to_numpy()
+    return tidy
+
+@dataclass
+class SimulationResult:
+    """
+    # structured output of 'simulate'
+
+    primes : primes (@pyboolnet) with the constants of the perturbation
+    attrs_dict : the output of 'compute_phenotype'
+    pheno_df : pd.DataFrame (basin ratio per phenotype)
+    att_ave_pd : pd.DataFrame (basin-weighted average node activities)
+    timings : Dict (seconds spent in 'attractors', 'phenotype', 'activity' and 'total')
+    """
+    primes: dict
+    attrs_dict: dict
+    pheno_df: pd.DataFrame
+    att_ave_pd: pd.DataFrame
+    timings: dict = field(default_factory=dict)
+
+    @property
+    def attractor_states(self):
+        # packed states (np.uint64, a bit array above 64 nodes) of every attractor
+        return [value['states'] for value in self.attrs_dict.values()]
+
+    @property
+    def basin_fractions(self):
+        return np.array([value['perc'] for value in self.attrs_dict.values()])
+
+
+def print_attractors(attrs_dict):
+    """
+    # print every attractor state and cycle step of an attrs_dict
+    """
+    print("\n--- [Simulation Function] Detected Attractors for Current Perturbation ---")
+    for att_id, att_info in attrs_dict.items():
+        states_in_attractor = att_info['attractors'] # '11100...' 형태의 문자열
+        basin_perc = att_info['perc']
+
+        if len(states_in_attractor) == 1:
+            # 고정점 (Steady State)
+            print(f"  > Attractor ID {att_id} (Steady State, Basin {basin_perc:.2%})")
+            print(f"    State Str:  {states_in_attractor[0]}")
+
+        elif len(states_in_attractor) > 1:
+            # 사이클 (Cyclic Attractor)
+            print(f"  > Attractor ID {att_id} (Cyclic, Length {len(states_in_attractor)}, Basin {basin_perc:.2%})")
+            print(f"    Cycle Start Str:  {states_in_attractor[0]}")
+            for j, state_str in enumerate(states_in_attractor):
+                print(f"       Step {j+1} Str:  {state_str}")
+
+        else:
+            print(f"  > Attractor ID {att_id} (Empty/Unknown Type, Basin {basin_perc:.2%})")
+    print("--- End of Attractor Listing ---")
+
+
+def simulate(constantDict, primes, update_mode, initState, phenotype, phenotypeAnnot, cache=None, verbose=False,
+             engine_options=None):
     """
     # compute average node activites based on basin sizes
-    
+    # nothing is formatted or printed unless verbose=True
+
     Parameters
     ----------
     constantDict : Dict
     primes : primes (@pyboolnet)
-    update_mode : str ('synchronous' or 'asynchronous')
-    initState : List (random sampling)
+    update_mode : str ('synchronous', 'synchronous-fast' or 'asynchronous')
+    initState : List or np.ndarray (random sampling)
     phenotype : Dict ({phenotype:phenotype markers})
     phenotypeAnnot : Dict (simple annotation of phenotype)
+    cache : LandscapeCache or None (@modules.landscapeCache)
+    verbose : bool (print attractors, phenotype ratios and simulation time)
+    engine_options : Dict or None (see 'compute_attractor_from_primes')
+
+    Returns
+    -------
+    SimulationResult
     """
+    timings = {}
     start = time.time()
     primes_new = create_constants(primes, constantDict,  copy=True)
-    attrs_dict = compute_attractor_from_primes(primes_new, update_mode, initState)
-
-    # ----------------------------------------------------
-    # !!!! ---- 수정된 코드: attrs_dict 내용 상세 출력 (상태 문자열 포함) ---- !!!!
-    
-    # pyboolnet.state_space.state2dict import (PyBoolNet 3.x 호환성)
-    from pyboolnet.state_space import state2dict as pybn_state2dict
-    # stgs.state2str import (노드 순서에 따른 문자열 변환용)
-    from pyboolnet.state_transition_graphs import state2str as stgs_state2str # 별칭 사용
-
-    print("\n--- [Simulation Function] Detected Attractors for Current Perturbation ---")
-    if isinstance(attrs_dict, dict) and all(isinstance(v, dict) and 'attractors' in v and 'perc' in v for v in attrs_dict.values()):
-        for att_id, att_info in attrs_dict.items():
-            raw_states_tuple = att_info['attractors'] # (tuple of state_strs,)
-            basin_perc = att_info['perc']
-            
-            states_in_attractor = []
-            for s_str_raw in raw_states_tuple: # '11100...' 형태의 문자열
-                states_in_attractor.append(pybn_state2dict(primes, s_str_raw))
-                
-            if len(states_in_attractor) == 1:
-                # 고정점 (Steady State)
-                state_dict = states_in_attractor[0]
-                state_str = stgs_state2str(state_dict) # 상태 딕셔너리를 다시 문자열로 변환
-                print(f"  > Attractor ID {att_id} (Steady State, Basin {basin_perc:.2%})")
-                # print(f"    State Dict: {state_dict}")
-                print(f"    State Str:  {state_str}") # 추가된 부분
-                
-            elif len(states_in_attractor) > 1:
-                # 사이클 (Cyclic Attractor)
-                print(f"  > Attractor ID {att_id} (Cyclic, Length {len(states_in_attractor)}, Basin {basin_perc:.2%})")
-                # print(f"    Cycle Start Dict: {states_in_attractor[0]}")
-                print(f"    Cycle Start Str:  {stgs_state2str(states_in_attractor[0])}") # 추가된 부분
-                # (옵션) 모든 사이클 상태를 문자열로 출력 (길면 비추)
-                for j, s_dict in enumerate(states_in_attractor):
-                   # print(f"       Step {j+1} Dict: {s_dict}")
-                   print(f"       Step {j+1} Str:  {stgs_state2str(s_dict)}") # 추가된 부분
-
-            else:
-                print(f"  > Attractor ID {att_id} (Empty/Unknown Type, Basin {basin_perc:.2%})")
-                
-    else:
-        print("  (Warning: Unexpected attrs_dict structure. Raw content below.)")
-        print("  Raw attrs_dict content (partial):", str(attrs_dict)[:200])
-        
-    print("--- End of Attractor Listing ---")
-    # !!!! ---- 수정된 코드 끝 ---- !!!!
-    # ----------------------------------------------------
+    attrs_dict = compute_attractor_from_primes(primes_new, update_mode, initState, cache, engine_options)
+    timings['attractors'] = time.time() - start
+    if verbose:
+        print_attractors(attrs_dict)
 
+    tic = time.time()
     attrs_dict = compute_phenotype(primes_new, attrs_dict, phenotype, phenotypeAnnot)
-    print('Attractor simulation time :', time.time()-start)
     pheno_df = makePhenotypeDF(attrs_dict, phenotypeAnnot)
-    print(makePhenotypeDF(attrs_dict, phenotypeAnnot))
-    
-    att_all = []
-    for idx, value in enumerate(attrs_dict.values()):
-        state01 = value['attractors']
-        state_np = np.array([[int(x) for x in state] for state in state01])
-        att1_mean = np.mean(state_np, axis=0) * value['perc']
-        att_all.append(att1_mean)
-    att_ave_pd = pd.DataFrame(np.sum(np.array(att_all),axis=0), index=list(primes.keys()))
-    return primes_new, pheno_df, att_ave_pd, attrs_dict
+    timings['phenotype'] = time.time() - tic
+    if verbose:
+        print('Attractor simulation time :', time.time()-start)
+        print(pheno_df)
+
+    tic = time.time()
+    att_ave_pd = pd.DataFrame(basin_weighted_activity(attrs_dict, len(primes)), index=sorted(primes))
+    timings['activity'] = time.time() - tic
+    timings['total'] = time.time() - start
+    return SimulationResult(primes_new, attrs_dict, pheno_df, att_ave_pd, timings)
+
+
+def Simulation(constantDict, primes, update_mode, initState, phenotype, phenotypeAnnot, cache=None, verbose=True,
+               engine_options=None):
+    """
+    # compute average node activites based on basin sizes
+    # (tuple interface of 'simulate')
+
+    Parameters
+    ----------
+    constantDict : Dict
+    primes : primes (@pyboolnet)
+    update_mode : str ('synchronous', 'synchronous-fast' or 'asynchronous')
+    initState : List or np.ndarray (random sampling)
+    phenotype : Dict ({phenotype:phenotype markers})
+    phenotypeAnnot : Dict (simple annotation of phenotype)
+    cache : LandscapeCache or None (@modules.landscapeCache)
+    verbose : bool (print attractors, phenotype ratios and simulation time)
+    engine_options : Dict or None (see 'compute_attractor_from_primes')
+    """
+    result = simulate(constantDict, primes, update_mode, initState, phenotype, phenotypeAnnot, cache, verbose,
+                      engine_options)
+    return result.primes, result.pheno_df, result.att_ave_pd, result.attrs_dict
+
+
+#===========================================================
+# Single-node perturbation sweep
+#===========================================================
+_sweep_context = {}
+
+def _init_sweep_worker(primes, update_mode, initState, phenotype, phenotypeAnnot, cache, engine_options):
+    # runs once per worker process : the shared inputs are not re-sent with every task
+    _sweep_context.update(primes=primes, update_mode=update_mode, initState=initState,
+                          phenotype=phenotype, phenotypeAnnot=phenotypeAnnot, cache=cache,
+                          engine_options=engine_options)
+
+def _run_sweep_task(constantDict, node, value):
+    ctx = _sweep_context
+    result = simulate(constantDict, ctx['primes'], ctx['update_mode'], ctx['initState'],
+                      ctx['phenotype'], ctx['phenotypeAnnot'], ctx['cache'], engine_options=ctx['engine_options'])
+    return node, value, result.pheno_df['Ratio'].to_dict(), result.att_ave_pd[0].to_dict()
+
+def sweep_single_perturbations(primes, nodes, values, update_mode, initState, phenotype, phenotypeAnnot,
+                               constantDict=None, max_workers=None, cache=None, engine_options=None):
+    """
+    # run 'simulate' for every single-node perturbation {node: value} on a process pool
+    # primes and initState are sent to each worker once (pool initializer)
+
+    Parameters
+    ----------
+    primes : primes (@pyboolnet)
+    nodes : List (nodes to perturb, e.g. nodes_order)
+    values : List (fixed values, e.g. [1, 0] for ON and OFF)
+    update_mode : str ('synchronous', 'synchronous-fast' or 'asynchronous')
+    initState : List or np.ndarray (random sampling)
+    phenotype : Dict ({phenotype:phenotype markers})
+    phenotypeAnnot : Dict (simple annotation of phenotype)
+    constantDict : Dict (background constants kept in every run, e.g. {'RAS':1})
+    max_workers : int (default : os.cpu_count())
+    cache : LandscapeCache or None (@modules.landscapeCache)
+    engine_options : Dict or None (see 'compute_attractor_from_primes')
+
+    Returns
+    -------
+    pd.DataFrame indexed by (node, value) with ('phenotype', name) ratio columns
+    and ('activity', node) average activity columns
+    """
+    constantDict = constantDict or {}
+    rows = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sweep_worker,
+                             initargs=(primes, update_mode, initState, phenotype, phenotypeAnnot, cache,
+                                       engine_options)) as pool:
+        futures = [pool.submit(_run_sweep_task, {**constantDict, node: value}, node, value)
+                   for node in nodes for value in values]
+        for future in as_completed(futures):
+            node, value, ratios, activities = future.result()
+            row = {('phenotype', name): ratio for name, ratio in ratios.items()}
+            row.update({('activity', name): act for name, act in activities.items()})
+            rows[(node, value)] = row
+
+    result = pd.DataFrame.from_dict(rows, orient='index')
+    result.index = pd.MultiIndex.from_tuples(result.index, names=['node', 'value'])
+    result.columns = pd.MultiIndex.from_tuples(result.columns)
+    result = result[['phenotype', 'activity']]
+    result['phenotype'] = result['phenotype'].fillna(0)
+    return result.loc[[(node, value) for node in nodes for value in values]]
 
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Attractors of functional graphs (every state has exactly one successor),
+i.e. of synchronous state transition graphs
+
+@ states are integer indices 0..N-1 and the graph is the successor array succ
+
+"""
+
+import os
+import numpy as np
+
+
+def functional_graph_attractors(succ):
+    """
+    # every cycle and the attractor label of every state in O(states)
+    # states without predecessors are peeled layer by layer until only cycles are left
+    # (the transient states are coloured by the layer they were peeled in),
+    # each remaining cycle is walked once from its first unvisited state,
+    # then attractor labels are handed back along the peeled layers in reverse order
+
+    Parameters
+    ----------
+    succ : np.ndarray (successor index of every state)
+
+    Returns
+    -------
+    cycles : list of np.ndarray (state indices in update order)
+    labels : np.ndarray (index of the attractor reached from every state)
+    """
+    succ = np.asarray(succ, dtype=np.int64)
+    num_of_states = len(succ)
+    indegree = np.bincount(succ, minlength=num_of_states)
+    on_cycle = np.ones(num_of_states, dtype=bool)
+    layers = []
+    frontier = np.flatnonzero(indegree == 0)
+    while frontier.size:
+        on_cycle[frontier] = False
+        layers.append(frontier)
+        targets = succ[frontier]
+        np.subtract.at(indegree, targets, 1)
+        targets = np.unique(targets)
+        frontier = targets[(indegree[targets] == 0) & on_cycle[targets]]
+
+    labels = np.full(num_of_states, -1, dtype=np.int64)
+    cycles = []
+    for start in np.flatnonzero(on_cycle):
+        if labels[start] >= 0:
+            continue
+        cycle = [start]
+        labels[start] = len(cycles)
+        state = succ[start]
+        while state != start:
+            cycle.append(state)
+            labels[state] = len(cycles)
+            state = succ[state]
+        cycles.append(np.array(cycle))
+
+    for layer in reversed(layers):
+        labels[layer] = labels[succ[layer]]
+    return cycles, labels
+
+
+def successor_array(transitions):
+    """
+    # index a {state: next state} mapping (any hashable states) as a successor array
+    # the mapping must be closed: every next state needs a transition of its own
+
+    Parameters
+    ----------
+    transitions : dict or iterable of (state, next state) pairs
+
+    Returns
+    -------
+    states : list (state of every index)
+    succ : np.ndarray (successor index of every state)
+    """
+    if isinstance(transitions, dict):
+        transitions = transitions.items()
+    index = {}
+    pairs = []
+    for state, next_state in transitions:
+        pairs.append((index.setdefault(state, len(index)), index.setdefault(next_state, len(index))))
+    succ = np.full(len(index), -1, dtype=np.int64)
+    for i, j in pairs:
+        succ[i] = j
+    if (succ < 0).any():
+        missing = [state for state, j in zip(index, succ) if j < 0]
+        raise ValueError(f"no transition from {len(missing)} states, e.g. {missing[0]!r}")
+    states = list(index)
+    return states, succ
+
+
+def _work_array(work_dir, name, size, dtype):
+    # in-memory array, or a memory-mapped file in work_dir
+    if work_dir is None:
+        return np.zeros(size, dtype=dtype)
+    return np.lib.format.open_memmap(os.path.join(work_dir, name + '.npy'), mode='w+', dtype=dtype, shape=(size,))
+
+
+def functional_graph_attractors_chunked(succ, work_dir=None, chunk_size=2**22):
+    """
+    # same result as 'functional_graph_attractors' for successor arrays too large for memory
+    # succ may be a np.memmap; every pass reads it chunk_size states at a time and the
+    # work arrays (indegree, peeling order, labels) are memory-mapped files in work_dir
+    # (uint32 for up to 2^32 states, so 2^28 states need about 1 GiB per array)
+
+    Parameters
+    ----------
+    succ : np.ndarray or np.memmap (successor index of every state)
+    work_dir : str or None (None keeps the work arrays in memory)
+    chunk_size : int
+
+    Returns
+    -------
+    cycles : list of np.ndarray (state indices in update order)
+    labels : np.ndarray or np.memmap (index of the attractor reached from every state)
+    basinsizes : np.ndarray (number of states in the basin of every attractor)
+    """
+    num_of_states = len(succ)
+    index_dtype = np.uint32 if num_of_states <= 2**32 else np.uint64
+    chunks = range(0, num_of_states, chunk_size)
+
+    indegree = _work_array(work_dir, 'indegree', num_of_states, index_dtype)
+    for start in chunks:
+        targets, counts = np.unique(succ[start:start + chunk_size], return_counts=True)
+        indegree[targets] += counts.astype(index_dtype)
+
+    # peeling order: every transient state, layer by layer
+    order = _work_array(work_dir, 'order', num_of_states, index_dtype)
+    end = 0
+    for start in chunks:
+        frontier = start + np.flatnonzero(indegree[start:start + chunk_size] == 0)
+        order[end:end + len(frontier)] = frontier
+        end += len(frontier)
+    layers = [0]
+    while end > layers[-1]:
+        layer_start, layer_end = layers[-1], end
+        layers.append(layer_end)
+        for start in range(layer_start, layer_end, chunk_size):
+            targets, counts = np.unique(succ[order[start:min(start + chunk_size, layer_end)]], return_counts=True)
+            indegree[targets] -= counts.astype(index_dtype)
+            # a target reaches zero in exactly one chunk, the one holding its last predecessor
+            frontier = targets[indegree[targets] == 0]
+            order[end:end + len(frontier)] = frontier
+            end += len(frontier)
+
+    # remaining states with predecessors are exactly the cycle states
+    labels = _work_array(work_dir, 'labels', num_of_states, np.int64 if num_of_states > 2**31 else np.int32)
+    cycle_states = []
+    for start in chunks:
+        block = indegree[start:start + chunk_size]
+        labels[start:start + len(block)] = -1
+        cycle_states.append(start + np.flatnonzero(block > 0))
+    cycles = []
+    for start in np.concatenate(cycle_states):
+        if labels[start] >= 0:
+            continue
+        cycle = [start]
+        labels[start] = len(cycles)
+        state = int(succ[start])
+        while state != start:
+            cycle.append(state)
+            labels[state] = len(cycles)
+            state = int(succ[state])
+        cycles.append(np.array(cycle))
+
+    for layer_start, layer_end in zip(reversed(layers[:-1]), reversed(layers[1:])):
+        for start in range(layer_start, layer_end, chunk_size):
+            states = order[start:min(start + chunk_size, layer_end)]
+            labels[states] = labels[succ[states]]
+
+    basinsizes = np.zeros(len(cycles), dtype=np.int64)
+    for start in chunks:
+        basinsizes += np.bincount(labels[start:start + chunk_size], minlength=len(cycles))
+    return cycles, labels, basinsizes
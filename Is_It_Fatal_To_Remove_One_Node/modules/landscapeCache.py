@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of attractor landscapes (the output of 'compute_attractor_from_primes')
+
+@ an entry is keyed by a canonical hash of the primes (after create_constants),
+  the update mode, the set of initial states and the engine options (asynchronous mode)
+
+"""
+
+import os
+import json
+import time
+import pickle
+import hashlib
+import numpy as np
+
+
+def _canonical_primes(primes):
+    # implicant lists are sorted so that equal Boolean rules give equal keys
+    return {node: [sorted(json.dumps(implicant, sort_keys=True) for implicant in rules)
+                   for rules in primes[node]]
+            for node in sorted(primes)}
+
+
+def _remove(path):
+    # another process may have evicted the entry already
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def landscape_key(primes, update_mode, initState, engine_options=None):
+    """
+    # content hash of an attractor computation
+
+    Parameters
+    ----------
+    primes : primes (@pyboolnet) after create_constants
+    update_mode : str
+    initState : List or np.ndarray (random sampling)
+    engine_options : Dict or None (engine parameters and random seed the result depends on)
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(_canonical_primes(primes), sort_keys=True).encode())
+    digest.update(update_mode.encode())
+    if engine_options:
+        digest.update(json.dumps(engine_options, sort_keys=True, default=str).encode())
+    if isinstance(initState, np.ndarray):
+        states = np.unique(initState, axis=0) if initState.ndim == 2 else np.unique(initState)
+        digest.update(str(states.dtype).encode())
+        digest.update(np.ascontiguousarray(states).tobytes())
+    else:
+        digest.update('\n'.join(sorted(initState)).encode())
+    return digest.hexdigest()
+
+
+class LandscapeCache:
+    """
+    # pickled attractor landscapes in cache_dir, one file per key
+
+    Parameters
+    ----------
+    cache_dir : str
+    max_bytes : int or None (least recently used entries are evicted above this size)
+    max_age : float or None (seconds since last use before an entry is evicted)
+    """
+    def __init__(self, cache_dir='./cache', max_bytes=None, max_age=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                attrs_fromSTG = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        try:
+            if self.max_age is not None and time.time() - os.path.getmtime(path) > self.max_age:
+                _remove(path)
+                return None
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            pass
+        return attrs_fromSTG
+
+    def put(self, key, attrs_fromSTG):
+        tmp_path = self._path(key) + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(attrs_fromSTG, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def entries(self):
+        # [(path, size, last use)], least recently used first
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda x: x[2])
+
+    def evict(self):
+        entries = self.entries()
+        if self.max_age is not None:
+            now = time.time()
+            for path, _, used in entries:
+                if now - used > self.max_age:
+                    _remove(path)
+            entries = [x for x in entries if now - x[2] <= self.max_age]
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                _remove(path)
+                total -= size
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            _remove(path)
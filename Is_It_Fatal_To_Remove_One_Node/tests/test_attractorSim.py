@@ -0,0 +1,146 @@
+import os
+
+import networkx as nx
+import numpy as np
+from pyboolnet.file_exchange import bnet2primes
+from pyboolnet.prime_implicants import create_constants
+from pyboolnet.state_transition_graphs import primes2stg
+
+from modules.attractorSim import (Simulation, compute_attractor_async, compute_attractor_from_primes,
+                                  compute_attractor_stg, int2str, rand_initial_states)
+from modules.landscapeCache import LandscapeCache
+
+phenotype = {'ON': {'n69': 1}, 'OFF': {'n69': 0}}
+phenotypeAnnot = {'ON': 1, 'OFF': 0}
+
+
+def chain_primes(num_of_nodes):
+    # n00 keeps its value and every other node copies the previous one :
+    # two steady states (all 0 / all 1), reached according to n00 of the initial state
+    names = [f'n{i:02d}' for i in range(num_of_nodes)]
+    rules = [f'{names[0]}, {names[0]}'] + [f'{x}, {y}' for y, x in zip(names, names[1:])]
+    return bnet2primes('\n'.join(rules))
+
+
+def test_simulation_above_64_nodes():
+    primes = chain_primes(70)
+    initState = rand_initial_states(20, 70, seed=0)
+    assert initState.shape == (20, 70)
+
+    for init in (initState, int2str(initState, 70)):
+        _, pheno_df, att_ave_pd, attrs_dict = Simulation({}, primes, 'synchronous', init,
+                                                         phenotype, phenotypeAnnot, verbose=False)
+        assert len(attrs_dict) == 2
+        steady = sorted(tuple(value['states'][0]) for value in attrs_dict.values())
+        assert steady == [(0,) * 70, (1,) * 70]
+        assert np.isclose(pheno_df['Ratio'].sum(), 1)
+        assert 0 < pheno_df.loc['ON', 'Ratio'] < 1
+        # basin-weighted activity of every node = basin of the all-1 steady state
+        assert np.allclose(att_ave_pd[0], pheno_df.loc['ON', 'Ratio'])
+
+
+def test_simulation_above_64_nodes_with_constants():
+    primes = chain_primes(70)
+    initState = rand_initial_states(10, 70, seed=1)
+    _, pheno_df, att_ave_pd, attrs_dict = Simulation({'n00': 1}, primes, 'synchronous', initState,
+                                                     phenotype, phenotypeAnnot, verbose=False)
+    assert len(attrs_dict) == 1
+    assert np.isclose(pheno_df.loc['ON', 'Ratio'], 1)
+    assert np.allclose(att_ave_pd[0], 1)
+
+
+def test_stratified_covers_state_space():
+    # 2**3 states in 5 strata : the 3 remaining states go to the first strata
+    drawn = set()
+    for seed in range(100):
+        states = rand_initial_states(5, 3, seed=seed, mode='stratified')
+        assert len(np.unique(states)) == 5
+        drawn.update(states.tolist())
+    assert drawn == set(range(8))
+    assert sorted(rand_initial_states(8, 3, seed=0, mode='stratified').tolist()) == list(range(8))
+
+
+def test_stratified_above_64_nodes():
+    primes = chain_primes(70)
+    initState = rand_initial_states(6, 70, seed=0, mode='stratified')
+    assert initState.shape == (6, 70) and initState.dtype == np.uint8
+    _, pheno_df, _, _ = Simulation({}, primes, 'synchronous', initState, phenotype, phenotypeAnnot, verbose=False)
+    assert np.isclose(pheno_df['Ratio'].sum(), 1)
+
+
+
+def emt_primes(constants):
+    primes = bnet2primes(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'network', 'EMT_Network.bnet'))
+    return create_constants(primes, constants, copy=True)
+
+
+def landscape(attrs_dict):
+    return sorted((tuple(sorted(value['attractors'])), value['basinsizes'], value['perc']) for value in attrs_dict.values())
+
+
+def test_stg_basins_match_shortest_path():
+    # previous basin count : one nx.shortest_path per (stg node, attractor)
+    primes = emt_primes({node: 0 for node in sorted(emt_primes({}))[:24]})
+    initState = rand_initial_states(30, len(primes) - 24, seed=0)
+    stg = primes2stg(primes, 'asynchronous', int2str(initState, len(primes)))
+    expected = []
+    for att in nx.simple_cycles(stg):
+        size = sum(nx.has_path(stg, node, att[0]) for node in stg.nodes)
+        expected.append((tuple(sorted(att)), size, size / stg.number_of_nodes()))
+    assert landscape(compute_attractor_stg(primes, 'asynchronous', initState)) == sorted(expected)
+
+
+def test_synchronous_default_matches_pyboolnet_stg():
+    # the packed engine explores exactly the nodes of primes2stg(primes, 'synchronous', initState)
+    primes = emt_primes({'RAS': 1})
+    initState = rand_initial_states(2000, len(primes), seed=0)
+    expected = landscape(compute_attractor_stg(primes, 'synchronous', initState))
+    for init in (initState, int2str(initState, len(primes))):
+        attrs_dict = compute_attractor_from_primes(primes, 'synchronous', init)
+        assert landscape(attrs_dict) == expected
+        for value in attrs_dict.values():
+            assert value['states'].dtype == np.uint64
+            assert int2str(value['states'], len(primes)) == list(value['attractors'])
+
+
+def test_async_exact_and_random_walk():
+    # the 18 leading nodes (the leading bits of a packed state) fixed to 0 : the reachable stg
+    # of initial states agreeing with the constants has about 7000 states (exact engine)
+    primes = emt_primes({node: 0 for node in sorted(emt_primes({}))[:18]})
+    initState = rand_initial_states(200, len(primes) - 18, seed=0)
+
+    exact = compute_attractor_async(primes, initState)
+    assert np.isclose(sum(value['perc'] for value in exact.values()), 1, rtol=0, atol=1e-12)
+
+    # max_states=1 forces the random-walk engine
+    walk = compute_attractor_async(primes, initState, max_states=1, seed=0)
+    assert sorted(value['attractors'] for value in walk.values()) == sorted(value['attractors'] for value in exact.values())
+    assert np.isclose(sum(value['perc'] for value in walk.values()), 1, rtol=0, atol=1e-12)
+
+
+def test_async_emt_complex_attractor():
+    # RAS=1 : a complex attractor of 229376 states, far larger than the exact stg budget
+    primes = emt_primes({})
+    initState = rand_initial_states(50, len(primes), seed=0)
+    _, pheno_df, _, attrs_dict = Simulation({'RAS': 1}, primes, 'asynchronous', initState,
+                                            {'E': {'Ecadherin': 1}}, {'E': 1}, verbose=False,
+                                            engine_options={'seed': 0})
+    assert sorted(len(value['states']) for value in attrs_dict.values()) == [1, 256, 229376]
+    assert np.isclose(pheno_df['Ratio'].sum(), 1)
+
+
+def test_async_cache_key(tmp_path):
+    primes = emt_primes({node: 0 for node in sorted(emt_primes({}))[:18]})
+    initState = rand_initial_states(50, len(primes) - 18, seed=0)
+    cache = LandscapeCache(str(tmp_path))
+
+    # unseeded random walks are not cached
+    compute_attractor_from_primes(primes, 'asynchronous', initState, cache, {'max_states': 1})
+    assert cache.entries() == []
+
+    # engine parameters and seed are part of the key
+    for options in ({'max_states': 1, 'seed': 0}, {'max_states': 1, 'seed': 1}, {'seed': 0}):
+        compute_attractor_from_primes(primes, 'asynchronous', initState, cache, options)
+    assert len(cache.entries()) == 3
+    compute_attractor_from_primes(primes, 'asynchronous', initState, cache, {'seed': 0, 'walk_length': None})
+    assert len(cache.entries()) == 3